@@ -2,9 +2,21 @@ import sys
 import json
 import jsonlines
 import random
+import argparse
+import multiprocessing
+import os
+import time
+import urllib.parse
+import urllib.request
+import uuid
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
 from faker import Faker
 
+import chdb
+import numpy as np
+import pyarrow as pa
+
 fake = Faker()
 
 def generate_log(timestamp, service, logLevel, correlation_id, message):
@@ -89,11 +101,248 @@ def generate_journey_logs(num_users):
 
     return logs
 
+# Fast generator: the same journeys and messages as generate_journey_logs,
+# built for driving the Null table and its materialized views at high rates.
+# Cities and ids are generated once per process as vocabularies. Each batch
+# draws every random choice with NumPy and holds only indexes into them; chDB
+# then builds the message strings and encodes the batch as JSON lines or
+# Native, so no Python code runs per event.
+ROOM_WEIGHTS = [0.6, 0.3, 0.1]
+EVENTS_PER_USER = 11  # 9.5 searches + 0.8 bookings + 0.72 payments on average
+ROOM_PRICES = np.array([(100, 200), (150, 400), (300, 1000)])
+
+FORMAT_BATCH = """
+SELECT
+    ts AS timestamp,
+    arrayElement(['Search', 'Booking', 'Payment'], kind + 1) AS service,
+    if(ok, 'INFO', 'ERROR') AS logLevel,
+    correlationId AS `X-Correlation-ID`,
+    multiIf(
+        kind = 0, concat('User ', userId, ' searching available hotels with criteria: {"location":"',
+                         location, '", "checkin":"', toString(checkin), '", "checkout":"',
+                         toString(checkout), '", "guests":', toString(guests), '}.'),
+        kind = 1, concat('User ', userId, ' selected a hotel room with details: {"roomType":"',
+                         roomType, '", "price":', toString(price), ',  "checkin":"',
+                         toString(checkin), '", "checkout":"', toString(checkout), '"}.'),
+        ok, concat('Processing payment for user ID ', userId, ', amount: ', toString(price),
+                   ' USD, payment method: ', paymentMethod, '.'),
+        concat('Payment failed for user ID ', userId, ', amount: ', toString(price),
+               ' USD, reason: Insufficient funds.')
+    ) AS message
+FROM Python(batch)
+"""
+
+# JSON lines keep the isoformat() timestamps of the original generator.
+FORMAT_BATCH_JSON = FORMAT_BATCH.replace(
+    "ts AS timestamp", "formatDateTime(ts, '%Y-%m-%dT%H:%i:%S.%f') AS timestamp")
+
+
+def build_vocabularies(size, num_cities, seed):
+    """Correlation ids, user ids and cities, the same in every process for the same seed."""
+    rng = random.Random(seed)
+    Faker.seed(seed)
+    fake = Faker()
+    correlation_ids = [str(uuid.UUID(int=rng.getrandbits(128), version=4)) for _ in range(size)]
+    # Distinct: chDB reads these as dictionaries, which must not repeat values.
+    user_ids = [f"{n:08x}" for n in rng.sample(range(2**32), size)]
+    cities = sorted({fake.city() for _ in range(num_cities)})
+    return {
+        "correlationId": pa.array(correlation_ids),
+        "userId": pa.array(user_ids),
+        "location": pa.array(cities),
+        "roomType": pa.array(["Standard", "Deluxe", "Suite"]),
+        "paymentMethod": pa.array(["Credit Card", "PayPal", "Bank Transfer"]),
+    }
+
+
+def journey_batch(users, start_ms, horizon_s, vocab, rng):
+    """All events of the given users (global user numbers) as a pyarrow Table, one row per log."""
+    n_users = len(users)
+    searches = rng.integers(1, 21, n_users) - 1  # len(range(1, randint(1, 20)))
+    books = rng.random(n_users) >= 0.2
+    pays = books & (rng.random(n_users) >= 0.1)
+    paid = rng.random(n_users) >= 0.1
+    user_start = start_ms + rng.integers(0, horizon_s + 1, n_users) * 1000
+
+    # Each user's rows are its searches, then the booking, then the payment:
+    # kind 0, 1, 2, spaced 5 seconds apart as in generate_journey_logs.
+    per_user = searches + books + pays
+    user = np.repeat(np.arange(n_users), per_user)
+    step = np.arange(len(user)) - np.repeat(np.cumsum(per_user) - per_user, per_user)
+    kind = np.minimum(np.maximum(step - searches[user] + 1, 0), 2).astype(np.uint8)
+    n = len(user)
+
+    room = rng.choice(3, size=n, p=ROOM_WEIGHTS)
+    price = np.where(kind == 1,
+                     rng.integers(ROOM_PRICES[room, 0], ROOM_PRICES[room, 1] + 1),
+                     rng.integers(100, 1001, n))
+    today = start_ms // 86_400_000  # days since the epoch
+    checkin = today + np.where(kind == 0, rng.integers(0, 31, n), rng.integers(30, 61, n))
+    checkout = checkin + rng.integers(0, 11, n)
+    ids = (users % len(vocab["correlationId"])).astype(np.int32)[user]
+
+    def pick(name, indexes):
+        return pa.DictionaryArray.from_arrays(indexes.astype(np.int32), vocab[name])
+
+    table = pa.table({
+        "ts": pa.array(user_start[user] + 5000 * kind.astype(np.int64), pa.timestamp("ms")),
+        "kind": kind,
+        "ok": ((kind < 2) | paid[user]).astype(np.uint8),
+        "correlationId": pick("correlationId", ids),
+        "userId": pick("userId", ids),
+        "location": pick("location", rng.integers(0, len(vocab["location"]), n)),
+        "guests": rng.integers(1, 5, n).astype(np.uint8),
+        "checkin": pa.array(checkin.astype(np.int32), pa.date32()),
+        "checkout": pa.array(checkout.astype(np.int32), pa.date32()),
+        "roomType": pick("roomType", room),
+        "price": price.astype(np.uint16),
+        "paymentMethod": pick("paymentMethod", rng.integers(0, 3, n)),
+    })
+    return table.cast(pa.schema([f.with_nullable(False) for f in table.schema]))
+
+
+class Sink:
+    """Where a worker's batches go: a file, stdout, a ClickHouse server or a chDB path."""
+
+    def __init__(self, out=None, fmt="jsonl", clickhouse_url=None, chdb_path=None, table="logs"):
+        self.fmt, self.table, self.url = fmt, table, clickhouse_url
+        self.file = self.session = None
+        if chdb_path:
+            from chdb.session import Session
+            self.session = Session(path=chdb_path)
+        elif not clickhouse_url:
+            self.file = sys.stdout.buffer if out in (None, "-") else open(out, "wb")
+
+    def write(self, batch):
+        if self.session is not None:
+            self.session.query(f"INSERT INTO {self.table} {FORMAT_BATCH}")
+            return
+        if self.url:
+            data = chdb.query(FORMAT_BATCH, "Native").bytes()
+            query = urllib.parse.urlencode({"query": f"INSERT INTO {self.table} FORMAT Native"})
+            urllib.request.urlopen(urllib.request.Request(f"{self.url}/?{query}", data=data)).read()
+            return
+        sql, fmt = (FORMAT_BATCH, "Native") if self.fmt == "native" else (FORMAT_BATCH_JSON, "JSONEachRow")
+        self.file.write(chdb.query(sql, fmt).bytes())
+
+    def close(self):
+        if self.session is not None:
+            self.session.close()
+        elif self.file is not None and self.file is not sys.stdout.buffer:
+            self.file.close()
+        elif self.file is not None:
+            self.file.flush()
+
+
+def run_shard(shard, options):
+    """Generate the users numbered shard, shard + workers, ... and send their events to a sink.
+
+    Sleeps between batches to hold this worker's share of the target rate.
+    Returns (users, events, seconds).
+    """
+    o = options
+    rng = np.random.default_rng([o["seed"] or 0, shard])
+    vocab = build_vocabularies(o["vocab"], o["cities"], o["seed"])
+    sink = Sink(o["out"], o["format"], o["clickhouse_url"], o["chdb"], o["table"])
+    rate = o["rate"] / o["workers"] if o["rate"] else None
+    batch_users = o["batch_users"]
+    if rate:
+        # About ten batches a second, so the rate holds over short windows too.
+        batch_users = max(1, min(batch_users, int(rate / 10 / EVENTS_PER_USER)))
+    started = time.perf_counter()
+    deadline = started + o["duration"] if o["duration"] else None
+    run_start_ms = int(time.time() * 1000)
+    next_user, users_done, events = shard, 0, 0
+    try:
+        while True:
+            if deadline is not None:
+                if time.perf_counter() >= deadline:
+                    break
+                count = batch_users
+                # Live load: events start now, spread over the next second.
+                start_ms, horizon_s = int(time.time() * 1000), 1
+            else:
+                remaining = len(range(next_user, o["users"], o["workers"]))
+                if remaining == 0:
+                    break
+                count = min(batch_users, remaining)
+                start_ms, horizon_s = run_start_ms, o["users"] * 10
+            users = next_user + o["workers"] * np.arange(count, dtype=np.int64)
+            batch = journey_batch(users, start_ms, horizon_s, vocab, rng)
+            sink.write(batch)
+            next_user += o["workers"] * count
+            users_done += count
+            events += batch.num_rows
+            if rate:
+                ahead = events / rate - (time.perf_counter() - started)
+                if deadline is not None:
+                    ahead = min(ahead, deadline - time.perf_counter())
+                if ahead > 0:
+                    time.sleep(ahead)
+    finally:
+        sink.close()
+    return users_done, events, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Generate hotel search/booking/payment logs as JSON lines or Native.")
+    parser.add_argument("--users", type=int, default=100000, help="users to simulate (default 100,000)")
+    parser.add_argument("--duration", type=float,
+                        help="run for this many seconds instead of a fixed number of users")
+    parser.add_argument("--rate", type=float, help="target events per second, across all workers")
+    parser.add_argument("--workers", type=int, default=1, help="processes generating in parallel")
+    parser.add_argument("--batch-users", type=int, default=10000, help="users per batch")
+    parser.add_argument("--format", choices=["jsonl", "native"], default="jsonl",
+                        help="encoding for --out (default jsonl)")
+    parser.add_argument("--out", default="-",
+                        help="output file, '-' for stdout; with --workers > 1, a directory of parts")
+    parser.add_argument("--clickhouse-url",
+                        help="insert into a ClickHouse server over HTTP instead, e.g. http://localhost:8123")
+    parser.add_argument("--chdb", help="insert into a chDB database at this path instead")
+    parser.add_argument("--table", default="logs", help="target table for --clickhouse-url/--chdb")
+    parser.add_argument("--vocab", type=int, default=100000,
+                        help="distinct user and correlation ids; user i gets id i %% vocab")
+    parser.add_argument("--cities", type=int, default=2000, help="Faker cities to draw locations from")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--faker", action="store_true",
+                        help="use the original one-event-at-a-time Faker generator (stdout only)")
+    args = parser.parse_args()
+
+    if args.faker:
+        logs = generate_journey_logs(args.users)
+        with jsonlines.Writer(sys.stdout) as out:
+            for log in logs:
+                out.write(log)
+        return
+
+    if args.workers > 1 and args.chdb:
+        parser.error("--chdb opens a database only one process can use; use --workers 1")
+    if args.workers > 1 and not args.clickhouse_url and args.out == "-":
+        parser.error("with --workers > 1, --out must be a directory (or use --clickhouse-url)")
+
+    options = vars(args).copy()
+    outs = [args.out] * args.workers
+    if args.workers > 1 and not args.clickhouse_url:
+        os.makedirs(args.out, exist_ok=True)
+        ext = "native" if args.format == "native" else "jsonl"
+        outs = [os.path.join(args.out, f"part-{i:04d}.{ext}") for i in range(args.workers)]
+
+    t0 = time.perf_counter()
+    if args.workers == 1:
+        results = [run_shard(0, options)]
+    else:
+        ctx = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(args.workers, mp_context=ctx) as pool:
+            futures = [pool.submit(run_shard, i, {**options, "out": outs[i]})
+                       for i in range(args.workers)]
+            results = [f.result() for f in futures]
+    elapsed = time.perf_counter() - t0
+    users = sum(r[0] for r in results)
+    events = sum(r[1] for r in results)
+    print(f"{users:,} users, {events:,} events in {elapsed:.2f}s "
+          f"({events / elapsed:,.0f} events/s)", file=sys.stderr)
+
+
 if __name__ == "__main__":
-    num_users = 100000  # Number of users to simulate
-    logs = generate_journey_logs(num_users)
-    
-    # Print logs as JSON
-    with jsonlines.Writer(sys.stdout) as out:
-      for log in logs:
-        out.write(log)
+    main()
@@ -1,12 +1,10 @@
 import datetime
 import streamlit as st
-import utils.queries as queries
 
 from utils.charts import line_chart
 from utils.formatting import colour_diff, format_date, style_subheading, style_table
 from utils.data import EnergyUsage, AlternateUsage
-
-from chdb.session import Session
+from utils.store import EnergyStore
 
 st.title("How much would it cost me then?")
 st.markdown(
@@ -14,9 +12,15 @@ st.markdown(
     unsafe_allow_html=True
 )
 
-db = Session(path="energy.chdb")
+# One store per server process, shared by every session and rerun, so its
+# result cache survives reruns.
+@st.cache_resource
+def get_store():
+    return EnergyStore(path="energy.chdb")
+
+db = get_store()
 with st.spinner("Loading data..."):
-    table = db.query(queries.tariffs_query, "DataFrame")
+    table = db.tariffs()
 
 left, _ = st.columns([2,3])
 with left:
@@ -36,7 +40,7 @@ with left:
     )
 
 
-usage = db.query(queries.energy_usage_for_day_query(selected_date), "DataFrame")
+usage = db.usage_for_day(selected_date)
 
 gas = EnergyUsage(usage[usage['energyType'] == 'gas'])
 alternate_gas = AlternateUsage(
@@ -50,7 +54,7 @@ alternate_elec = AlternateUsage(
     unit_rate = alternate["elecUnitRate"].values[0] / 100
 )
 
-all_energy = db.query(queries.energy_usage_query, "DataFrame")
+all_energy = db.usage_by_day()
 
 st.markdown(f"#### Usage on {selected_date.strftime('%d %b %Y')}")
 left, right = st.columns(2)
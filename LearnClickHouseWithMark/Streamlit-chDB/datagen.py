@@ -1,6 +1,17 @@
+import argparse
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+
+import chdb
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
+import pyarrow as pa
+import pyarrow.csv as csv
+import pyarrow.parquet as pq
+from chdb.session import Session
 
 # Function to generate ISO 8601 date string and epoch timestamp
 def generate_datetime_info(dt):
@@ -67,12 +78,206 @@ def simulate_energy_usage(start_date, end_date):
 
     return pd.DataFrame(data, columns=['energyType', 'epochTimestamp', 'kWh', 'dateTime'])
 
-# Example usage of the function
-start_date = '2023-01-01'
-end_date = '2024-01-02'
-simulated_data = simulate_energy_usage(start_date, end_date)
+# Vectorized generator: the same distributions as simulate_energy_usage, but
+# built a column at a time with NumPy for many meters and years.
+ENERGY_TYPES = ['electricity', 'gas']
+GAS_HOURS = np.zeros(24, dtype=bool)
+GAS_HOURS[5:9] = True    # 5:00 AM to 8:30 AM
+GAS_HOURS[17:22] = True  # evening
+
+# [energy type, month] -> min / max, from the same table get_usage_stats reads
+MONTHLY_MIN = np.array([[get_usage_stats(m, e)['min'] for m in range(1, 13)] for e in ENERGY_TYPES])
+MONTHLY_MAX = np.array([[get_usage_stats(m, e)['max'] for m in range(1, 13)] for e in ENERGY_TYPES])
+
+
+def usage_batch(timestamps, meters, rng, meter_ids=False):
+    """Readings for each meter in `meters` at every timestamp, as a pyarrow Table.
+
+    Rows come in the same order as simulate_energy_usage: per meter, per
+    timestamp, electricity then gas. With meter_ids a meterId column is added
+    first. The caller decides that once for the whole run, so every batch and
+    every part has the same schema, however the meters are split up.
+    """
+    n, m = len(timestamps), len(meters)
+    month = timestamps.astype('datetime64[M]').astype(np.int64) % 12
+    hour = timestamps.astype('datetime64[h]').astype(np.int64) % 24
+
+    # shape (meters, timestamps, energy type)
+    low = MONTHLY_MIN[:, month].T
+    high = MONTHLY_MAX[:, month].T
+    kwh = rng.uniform(low, high, size=(m, n, 2))
+    kwh[:, :, 1] *= GAS_HOURS[hour]
+    kwh = np.round(kwh, 3).reshape(-1)
+
+    epoch = np.repeat(timestamps.astype('datetime64[s]').astype(np.int64), 2)
+    columns = {
+        'energyType': pa.DictionaryArray.from_arrays(
+            np.tile(np.array([0, 1], dtype=np.int8), m * n), ENERGY_TYPES),
+        'epochTimestamp': np.tile(epoch, m),
+        'kWh': kwh,
+        'dateTime': pa.array(np.tile(epoch, m), pa.timestamp('s', tz='UTC')),
+    }
+    if meter_ids:
+        columns = {'meterId': np.repeat(np.asarray(meters, dtype=np.uint32), 2 * n), **columns}
+    table = pa.table(columns)
+    # No nulls anywhere: say so, so readers don't get Nullable columns.
+    return table.cast(pa.schema([field.with_nullable(False) for field in table.schema]))
+
+
+class UsageWriter:
+    """Appends batches to one CSV, Parquet or Native file, or inserts them into a chDB session."""
+
+    def __init__(self, fmt, path):
+        self.fmt, self.path = fmt, path
+        self.file = self.writer = self.session = None
+        self.rows = 0
+
+    def write(self, table):
+        if self.fmt == 'parquet':
+            if self.writer is None:
+                self.writer = pq.ParquetWriter(self.path, table.schema, compression='zstd')
+            self.writer.write_table(table)
+        elif self.fmt == 'csv':
+            # Same text layout as DataFrame.to_csv: plain header, ISO dates with a Z.
+            iso = np.char.add(np.datetime_as_string(
+                table['epochTimestamp'].to_numpy().astype('datetime64[s]')), 'Z')
+            table = table.set_column(table.schema.get_field_index('dateTime'), 'dateTime', pa.array(iso))
+            table = table.set_column(table.schema.get_field_index('energyType'), 'energyType',
+                                     table['energyType'].cast(pa.string()))
+            if self.writer is None:
+                self.file = open(self.path, 'wb')
+                self.file.write((','.join(table.column_names) + '\n').encode())
+                self.writer = csv.CSVWriter(self.file, table.schema, write_options=csv.WriteOptions(
+                    include_header=False, quoting_style='none'))
+            self.writer.write_table(table)
+        elif self.fmt == 'native':
+            if self.file is None:
+                self.file = open(self.path, 'wb')
+            # Native is a sequence of self-describing blocks, so batches can be appended.
+            self.file.write(chdb.query('SELECT * FROM Python(table)', 'Native').bytes())
+        elif self.fmt == 'chdb':
+            if self.session is None:
+                self.session = Session(path=self.path)
+                self.session.query('CREATE DATABASE IF NOT EXISTS energy')
+                self.session.query("""
+                    CREATE TABLE IF NOT EXISTS energy.usage (
+                        energyType String, epochTimestamp Int64, kWh Float64, dateTime DateTime
+                    ) ENGINE = MergeTree ORDER BY epochTimestamp""")
+            self.session.query('INSERT INTO energy.usage '
+                               'SELECT energyType, epochTimestamp, kWh, dateTime FROM Python(table)')
+        self.rows += table.num_rows
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        if self.file is not None:
+            self.file.close()
+        if self.session is not None:
+            self.session.close()
+
+
+def generate_part(start_date, end_date, meters, fmt, path, seed, meters_per_batch, meter_ids):
+    """Write readings for `meters` (a range) to `path`; one unit of work for a worker."""
+    timestamps = pd.date_range(start=start_date, end=end_date, freq='30min').values
+    rng = np.random.default_rng(seed)
+    writer = UsageWriter(fmt, path)
+    try:
+        for i in range(0, len(meters), meters_per_batch):
+            writer.write(usage_batch(timestamps, meters[i:i + meters_per_batch], rng, meter_ids))
+    finally:
+        writer.close()
+    return writer.rows
+
+
+def check():
+    """Every batch and every part of a run must share one schema, with meterId iff meters > 1."""
+    import tempfile
+
+    cases = [
+        # (meters, meters_per_batch, workers)
+        (1, 64, 1),
+        (65, 64, 1),   # leftover batch of one meter
+        (3, 2, 1),
+        (3, 64, 3),    # one meter per worker
+        (5, 2, 2),
+    ]
+    timestamps = pd.date_range(start='2023-01-01', end='2023-01-02', freq='30min').values
+    with tempfile.TemporaryDirectory() as tmp:
+        for meters, per_batch, workers in cases:
+            meter_ids = meters > 1
+            schemas = set()
+            for i, shard in enumerate(np.array_split(np.arange(meters), workers)):
+                path = os.path.join(tmp, f'{meters}-{per_batch}-{workers}-{i}.parquet')
+                # a mismatched batch makes ParquetWriter.write_table raise here
+                generate_part('2023-01-01', '2023-01-02', shard, 'parquet', path, 0,
+                              per_batch, meter_ids)
+                table = pq.read_table(path)
+                schemas.add(table.schema)
+                if meter_ids:
+                    assert table['meterId'].to_pylist() == np.repeat(shard, 2 * len(timestamps)).tolist()
+            assert len(schemas) == 1, f'{meters} meters: parts differ'
+            assert ('meterId' in schemas.pop().names) == meter_ids, f'{meters} meters: meterId'
+            print(f'ok  meters={meters} meters_per_batch={per_batch} workers={workers}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate half-hourly gas and electricity readings.')
+    parser.add_argument('--start', default='2023-01-01')
+    parser.add_argument('--end', default='2024-01-02')
+    parser.add_argument('--meters', type=int, default=1,
+                        help='number of households; more than one adds a meterId column')
+    parser.add_argument('--format', choices=['csv', 'parquet', 'native', 'chdb'], default='csv',
+                        help='chdb inserts into energy.usage in the --out chDB path')
+    parser.add_argument('--out', default='data.csv',
+                        help='output file, or a directory of part files with --workers > 1')
+    parser.add_argument('--workers', type=int, default=1, help='processes, each writing its own part')
+    parser.add_argument('--meters-per-batch', type=int, default=64,
+                        help='meters generated per batch; bounds memory per worker')
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--loop', action='store_true',
+                        help='use the original row-by-row simulate_energy_usage (CSV, one meter)')
+    parser.add_argument('--check', action='store_true',
+                        help='generate a few awkward meter/batch/worker splits and check their schemas')
+    args = parser.parse_args()
+    if args.format == 'chdb' and args.meters > 1:
+        # energy.usage and the app's daily rollup describe one household; meters
+        # inserted there would be summed together with no way to tell them apart.
+        parser.error('--format chdb writes the single-household energy.usage table; '
+                     'use --meters 1, or parquet/native/csv for several meters')
+
+    if args.check:
+        check()
+        return
+
+    # Decided from the total, not per batch or per part: a leftover batch of
+    # one meter, or one meter per worker, still gets its meterId.
+    meter_ids = args.meters > 1
+    t0 = time.perf_counter()
+    if args.loop:
+        simulated_data = simulate_energy_usage(args.start, args.end)
+        print(simulated_data.head(n=50))
+        simulated_data.to_csv(args.out, index=False)
+        rows = len(simulated_data)
+    elif args.workers == 1 or args.format == 'chdb':
+        # A chDB path can only be open in one process, so chdb output stays in this one.
+        rows = generate_part(args.start, args.end, range(args.meters), args.format, args.out,
+                             args.seed, args.meters_per_batch, meter_ids)
+    else:
+        os.makedirs(args.out, exist_ok=True)
+        shards = np.array_split(np.arange(args.meters), args.workers)
+        seeds = np.random.SeedSequence(args.seed).spawn(len(shards))
+        ctx = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(args.workers, mp_context=ctx) as pool:
+            futures = [
+                pool.submit(generate_part, args.start, args.end, shard, args.format,
+                            os.path.join(args.out, f'part-{i:04d}.{args.format}'), seed,
+                            args.meters_per_batch, meter_ids)
+                for i, (shard, seed) in enumerate(zip(shards, seeds)) if len(shard)
+            ]
+            rows = sum(f.result() for f in futures)
+    elapsed = time.perf_counter() - t0
+    print(f'{rows:,} rows -> {args.out} in {elapsed:.2f}s ({rows / elapsed:,.0f} rows/s)')
 
-# Print the first few rows of the simulated data
-print(simulated_data.head(n=50))
 
-simulated_data.to_csv("data.csv", index=False)
+if __name__ == '__main__':
+    main()
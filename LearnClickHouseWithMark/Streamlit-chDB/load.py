@@ -0,0 +1,14 @@
+import sys
+
+from utils.store import EnergyStore
+
+# Append usage files (same columns as data/data.csv) to energy.usage. The
+# materialized view rolls them into energy.daily_usage in the same insert.
+# Stop the app first: the chDB path can only be open in one process, and the
+# app's result cache starts empty when it is restarted.
+if len(sys.argv) < 2:
+    sys.exit("usage: python load.py data/more_usage.csv [...]")
+
+store = EnergyStore(path="energy.chdb")
+for path in sys.argv[1:]:
+    print(f"{path}: {store.load_usage(path):,} rows")
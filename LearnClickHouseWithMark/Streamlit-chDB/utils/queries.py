@@ -45,3 +45,36 @@ SELECT toString(day) AS day, energyType, totalUsage, standingCharge, unitRate,
     toDecimal32((standingCharge + (unitRate * totalUsage)), 2) / 100 AS cost
 ORDER BY day DESC, energyType
 """
+
+# The same two queries over energy.daily_usage, the per-day rollup that
+# utils/store.py keeps current with a materialized view. Rows for the same day
+# are only combined when parts merge, so sum again here; the table has about
+# one row per energy type and day, however many readings were loaded.
+def daily_usage_for_day_query(day):
+    return f"""
+FROM (
+    SELECT energyType, day, sum(totalUsage) AS totalUsage
+    FROM energy.daily_usage
+    WHERE day = '{day.strftime("%Y-%m-%d")}'
+    GROUP BY ALL
+) as u
+JOIN energy.tariffs AS t
+ON t.energyType = u.energyType AND t.day = u.day
+SELECT energyType, standingCharge, unitRate, totalUsage,
+       sum(toDecimal32((standingCharge + (unitRate * totalUsage)), 5)) AS rawCost,
+       rawCost/100 AS cost
+GROUP BY ALL
+"""
+
+daily_usage_query = """
+FROM (
+    SELECT energyType, day, sum(totalUsage) AS totalUsage
+    FROM energy.daily_usage
+    GROUP BY ALL
+) as u
+JOIN energy.tariffs AS t
+ON t.energyType = u.energyType AND t.day = u.day
+SELECT toString(day) AS day, energyType, totalUsage, standingCharge, unitRate,
+    toDecimal32((standingCharge + (unitRate * totalUsage)), 2) / 100 AS cost
+ORDER BY day DESC, energyType
+"""
@@ -0,0 +1,122 @@
+import threading
+
+from chdb.session import Session
+
+import utils.queries as queries
+
+# energy.daily_usage holds one row per (energyType, day). The materialized
+# view adds to it on every insert into energy.usage, so the app's queries read
+# a table whose size grows with the number of days, not with the number of
+# half-hourly readings. AggregatingMergeTree rather than SummingMergeTree,
+# which would drop days whose total is zero when parts merge.
+setup_statements = [
+    "CREATE DATABASE IF NOT EXISTS energy",
+    """
+    CREATE TABLE IF NOT EXISTS energy.usage (
+        energyType String,
+        epochTimestamp Int64,
+        kWh Float64,
+        dateTime DateTime
+    )
+    ENGINE = MergeTree
+    ORDER BY epochTimestamp
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS energy.tariffs
+    ENGINE = MergeTree
+    ORDER BY day
+    AS
+    SELECT arrayJoin(arrayMap(
+        x -> addDays(startDate, x),
+        range(dateDiff('days', startDate, endDate) + 1)
+    )) AS day, *
+    FROM file(`data/tariffs.csv`)
+    SETTINGS schema_inference_make_columns_nullable=0
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS energy.daily_usage (
+        energyType String,
+        day Date,
+        totalUsage SimpleAggregateFunction(sum, Decimal(38, 6))
+    )
+    ENGINE = AggregatingMergeTree
+    ORDER BY (energyType, day)
+    """,
+]
+
+daily_usage_view = """
+    CREATE MATERIALIZED VIEW IF NOT EXISTS energy.daily_usage_mv
+    TO energy.daily_usage AS
+    SELECT energyType,
+           toDate(epochTimestamp) AS day,
+           sum(toDecimal32(kWh, 6)) AS totalUsage
+    FROM energy.usage
+    GROUP BY ALL
+    """
+
+backfill_daily_usage = """
+    INSERT INTO energy.daily_usage
+    SELECT energyType,
+           toDate(epochTimestamp) AS day,
+           sum(toDecimal32(kWh, 6)) AS totalUsage
+    FROM energy.usage
+    GROUP BY ALL
+    """
+
+class EnergyStore:
+    def __init__(self, path="energy.chdb"):
+        self.db = Session(path=path)
+        self.lock = threading.Lock()
+        # Results by (query, day). Only this process can have the chDB path
+        # open, so every insert goes through load_usage, which clears it.
+        self.cache = {}
+        self.setup()
+
+    def setup(self):
+        with self.lock:
+            view_exists = self._scalar(
+                "SELECT count() FROM system.tables "
+                "WHERE database = 'energy' AND name = 'daily_usage_mv'"
+            )
+            for statement in setup_statements:
+                self.db.query(statement)
+            if not view_exists:
+                # First start on an existing energy.chdb: roll up the history
+                # that was loaded before the view existed.
+                self.db.query(daily_usage_view)
+                self.db.query("TRUNCATE TABLE energy.daily_usage")
+                self.db.query(backfill_daily_usage)
+            self.cache.clear()
+
+    def _scalar(self, sql):
+        return int(self.db.query(sql, "CSV").bytes().decode().strip() or 0)
+
+    def query(self, name, sql, day=None):
+        """Run sql, or return the cached result for (name, day)."""
+        with self.lock:
+            key = (name, day)
+            if key not in self.cache:
+                self.cache[key] = self.db.query(sql, "DataFrame")
+            return self.cache[key]
+
+    def load_usage(self, path):
+        """Append a usage file to energy.usage; the view updates daily_usage in the same insert."""
+        with self.lock:
+            before = self._scalar("SELECT count() FROM energy.usage")
+            self.db.query(f"""
+                INSERT INTO energy.usage
+                SELECT energyType, epochTimestamp, kWh, dateTime
+                FROM file('{path}')
+                SETTINGS schema_inference_make_columns_nullable=0
+            """)
+            self.cache.clear()
+            return self._scalar("SELECT count() FROM energy.usage") - before
+
+    def tariffs(self):
+        return self.query("tariffs", queries.tariffs_query)
+
+    def usage_for_day(self, day):
+        return self.query("usage_for_day", queries.daily_usage_for_day_query(day), day)
+
+    def usage_by_day(self):
+        return self.query("usage_by_day", queries.daily_usage_query)
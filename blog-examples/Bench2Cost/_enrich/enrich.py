@@ -0,0 +1,567 @@
+#!/usr/bin/env python3
+# -----------------------------------------------------------------------------
+# enrich.py — price every vendor's ClickBench results in one pass, offline
+#
+# Does what the vendor folders' enrich.sh / enrich_large.sh do (same cost
+# formulas, same enriched JSON), but for all of them at once:
+#
+#   1. finds every (result file, pricing file) pair in the results_1B/10B/100B
+#      layout of each vendor folder; the 100M ClickHouse Cloud results, which
+#      enrich.sh used to curl from GitHub one by one, are read from a local
+#      ClickBench checkout instead (--mirror, filled once by "mirror")
+#   2. turns each pricing tier into a per-second (or per-byte) rate, and
+#   3. multiplies every run of every query of every result set by its rates in
+#      one numpy operation
+#
+#   python enrich.py                      # re-enrich everything
+#   python enrich.py --vendor snowflake   # only some vendors
+#   python enrich.py --check              # compare with the files on disk, write nothing
+#   python enrich.py mirror               # fetch the ClickBench results the
+#                                         # ClickHouse Cloud pricings need
+#
+# Costs per vendor (seconds are the ClickBench result, unless noted):
+#   databricks        sec/3600 × dbu_per_hour × dbu_price_per_hour
+#   snowflake         sec/3600 × credits_per_hour × credit_price_per_hour, per plan
+#   clickhouse-cloud  sec/3600 × compute × memory_size/compute_price_unit × replicas, per tier
+#   bigquery          billed_slot_sec × capacity price per slot-second, per tier;
+#                     billed_bytes × on-demand price per byte
+#   redshift          billed_times × price per RPU-second
+#   storage           data_size × storage price / storage price unit
+#
+# A null run stays null.
+# -----------------------------------------------------------------------------
+
+import argparse
+import glob
+import json
+import math
+import os
+import re
+import sys
+import time
+import urllib.request
+
+import numpy as np
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BENCH2COST = os.path.dirname(HERE)
+CLICKBENCH_RAW = "https://raw.githubusercontent.com/ClickHouse/ClickBench/main"
+SCALES = ["1B", "10B", "100B"]
+
+
+def load_json(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+class Charge:
+    """One compute_costs grid still to be filled in: entry[...] = result[metric] × rate."""
+
+    def __init__(self, entry, result, metric, rate):
+        self.entry = entry
+        self.grid = result.get(metric)
+        self.rate = rate
+
+
+# -- cost models: (result, pricing, options) -> (enriched document, charges) ------------
+
+
+def databricks(result, pricing, opts):
+    block = next(
+        b for b in pricing["pricing"]
+        if b["cloud"] == opts["cloud"] and b["region"] == opts["region"] and b["plan"] == opts["plan"]
+    )
+    inst = next(i for i in block["instances"] if i["name"] == result["cluster_size"])
+    storage = block.get("storage") or {}
+    data_size = result.get("data_size")
+    entry = {
+        "tier": opts["plan"],
+        "provider": opts["cloud"],
+        "service": pricing["service"],
+        "cloud": opts["cloud"],
+        "region": opts["region"],
+        "warehouse_size": inst["name"],
+        "data_size": data_size,
+    }
+    if storage.get("storage") is not None and storage.get("storage_price_unit") is not None \
+            and data_size is not None:
+        sc = data_size * storage["storage"] / storage["storage_price_unit"]
+        entry["storage_cost"] = sc
+        entry["storage_costs"] = [{
+            "type": "data",
+            "bytes": data_size,
+            "price_per_unit": storage["storage"],
+            "unit_bytes": storage["storage_price_unit"],
+            "estimated_cost": sc,
+        }]
+    else:
+        entry["storage_cost"] = 0
+        entry["storage_costs"] = []
+    entry["compute_costs"] = None
+    entry["pricing_base"] = {
+        "dbu_per_hour": inst["dbu_per_hour"],
+        "dbu_price_per_hour": block["dbu_price_per_hour"],
+    }
+    rate = inst["dbu_per_hour"] * block["dbu_price_per_hour"] / 3600.0
+    return {**result, "costs": [entry]}, [Charge(entry, result, "result", rate)]
+
+
+def snowflake(result, pricing, opts):
+    costs, charges = [], []
+    for block in pricing["pricing"]:
+        if block["cloud"] != opts["cloud"] or block["region"] != opts["region"]:
+            continue
+        for wh in block["warehouses"]:
+            if wh["credits_per_hour"] != result["cluster_size"]:
+                continue
+            price, unit = block["storage"]["storage"], block["storage"]["storage_price_unit"]
+            storage_cost = result["data_size"] / unit * price
+            entry = {
+                "tier": block["plan"],
+                "provider": opts["cloud"],
+                "service": pricing["service"],
+                "cloud": opts["cloud"],
+                "region": opts["region"],
+                "warehouse_size": wh["name"],
+                "data_size": result["data_size"],
+                "storage_cost": storage_cost,
+                "storage_costs": [{
+                    "model": "object",
+                    "term": "active",
+                    "period": "monthly",
+                    "price_per_byte": price / unit,
+                    "bytes": result["data_size"],
+                    "estimated_cost": storage_cost,
+                    "pricing_base": {
+                        "price_usd": price,
+                        "price_unit": "byte_month",
+                        "price_unit_bytes": unit,
+                        "notes": "Snowflake storage (list price).",
+                    },
+                }],
+                "compute_costs": None,
+                "pricing_base": {
+                    "credits_per_hour": wh["credits_per_hour"],
+                    "credit_price_per_hour": block["credit_price_per_hour"],
+                    "storage": price,
+                    "storage_price_unit": unit,
+                },
+            }
+            costs.append(entry)
+            rate = wh["credits_per_hour"] * block["credit_price_per_hour"] / 3600.0
+            charges.append(Charge(entry, result, "result", rate))
+    return {**result, "costs": costs}, charges
+
+
+def clickhouse_cloud(result, pricing, opts):
+    memory, replicas = pricing["memory_size"], pricing["cluster_size"]
+    data_size = result["data_size"]
+    costs, charges = [], []
+    for tier in pricing["tier"]:
+        price_per_byte = tier["storage"] / tier["storage_price_unit"]
+        storage_cost = tier["storage"] * (data_size / tier["storage_price_unit"])
+        entry = {
+            "tier": tier["name"],
+            "provider": pricing["provider"],
+            "region": pricing["region"],
+            "compute_costs": None,
+            "storage_cost": storage_cost,
+            "storage_costs": [{
+                "model": "object",
+                "term": "active",
+                "period": "monthly",
+                "price_per_byte": price_per_byte,
+                "bytes": data_size,
+                "estimated_cost": storage_cost,
+                "pricing_base": {
+                    "price_usd": tier["storage"],
+                    "price_unit": "byte_month",
+                    "price_unit_bytes": tier["storage_price_unit"],
+                    "notes": "Object storage in ClickHouse Cloud (list price).",
+                },
+            }],
+            "pricing_base": {
+                "compute": tier["compute"],
+                "compute_price_unit": tier["compute_price_unit"],
+                "storage": tier["storage"],
+                "storage_price_unit": tier["storage_price_unit"],
+            },
+        }
+        costs.append(entry)
+        rate = tier["compute"] / 3600.0 * memory / tier["compute_price_unit"] * replicas
+        charges.append(Charge(entry, result, "result", rate))
+    return {**result, "costs": costs}, charges
+
+
+def clickhouse_cloud_large(result, pricing, opts):
+    # Like enrich_large.sh: replicas and memory come from the result, tiers from the pricing.
+    replicas = float(result.get("cluster_size") or 1)
+    if result.get("memory_size") is not None:
+        memory = float(result["memory_size"])
+    else:
+        digits = re.sub(r"[^0-9.]", "", str(result.get("machine", "")))
+        memory = float(digits) if digits else 0.0
+    data_size = float(result.get("data_size") or 0)
+    doc = {**result, "provider": pricing["provider"], "region": pricing["region"]}
+    costs, charges = [], []
+    for tier in pricing["tier"]:
+        entry = {
+            "tier": tier["name"],
+            "provider": pricing["provider"],
+            "region": pricing["region"],
+            "compute_costs": None,
+            "storage_cost": data_size * (tier["storage"] / tier["storage_price_unit"]),
+        }
+        costs.append(entry)
+        rate = tier["compute"] / 3600.0 * memory / tier["compute_price_unit"] * replicas
+        charges.append(Charge(entry, result, "result", rate))
+    doc["costs"] = costs
+    return doc, charges
+
+
+def serverless(capacity_metric, carried):
+    """bigquery/ and redshift-serverless/ enrich.sh: capacity tiers per slot/RPU-second, on demand per byte."""
+
+    def model(result, pricing, opts):
+        region = opts["region"]
+        region_prices = pricing.get("regions", {}).get(region, {})
+        compute = region_prices.get("pricing_compute", {})
+        dataset_bytes = result.get("data_size") or 0
+        provider = pricing.get("provider", "gcp")
+        currency = pricing.get("currency", "USD")
+        sources = pricing.get("sources", [])
+
+        storage_costs = []
+        for model_name in ("logical", "physical"):
+            monthly = (region_prices.get("pricing_storage", {}).get(model_name) or {}).get("monthly") or {}
+            for term, base in monthly.items():
+                if not isinstance(base, dict) or not base.get("price_unit_bytes"):
+                    continue
+                per_byte = base["price_usd"] / base["price_unit_bytes"]
+                storage_costs.append({
+                    "model": model_name,
+                    "term": term,
+                    "period": "monthly",
+                    "price_per_byte": per_byte,
+                    "bytes": dataset_bytes,
+                    "estimated_cost": dataset_bytes * per_byte,
+                    "pricing_base": {
+                        "price_usd": base["price_usd"],
+                        "price_unit": base["price_unit"],
+                        "price_unit_bytes": base["price_unit_bytes"],
+                        "notes": base.get("notes"),
+                    },
+                })
+
+        costs, charges = [], []
+        for variant, periods in (compute.get("capacity") or {}).items():
+            for period, node in periods.items():
+                for t in node.get("tiers") or []:
+                    if t.get("price_usd") is None or t.get("price_unit_seconds") is None:
+                        continue
+                    entry = {
+                        "tier": t["name"],
+                        "provider": provider,
+                        "region": region,
+                        "compute_model": "capacity",
+                        "pricing_variant": variant,
+                        "billing_period": period,
+                        "compute_costs": None,
+                        "pricing_base": {
+                            "price_usd": t["price_usd"],
+                            "price_unit": t["price_unit"],
+                            "price_unit_seconds": t["price_unit_seconds"],
+                            "currency": currency,
+                            "notes": t.get("notes"),
+                        },
+                        "assumptions": {"dataset_bytes": dataset_bytes, "metrics": [capacity_metric]},
+                        "sources": sources,
+                        "storage_costs": storage_costs,
+                    }
+                    costs.append(entry)
+                    charges.append(Charge(entry, result, capacity_metric,
+                                          t["price_usd"] / t["price_unit_seconds"]))
+
+        on_demand = (compute.get("on_demand") or {}).get("monthly")
+        if isinstance(on_demand, dict) and on_demand.get("price_unit_bytes"):
+            entry = {
+                "tier": "OnDemand",
+                "provider": provider,
+                "region": region,
+                "compute_model": "on_demand",
+                "billing_period": "monthly",
+                "compute_costs": None,
+                "pricing_base": {
+                    "price_usd": on_demand["price_usd"],
+                    "price_unit": on_demand["price_unit"],
+                    "price_unit_bytes": on_demand["price_unit_bytes"],
+                    "currency": currency,
+                    "notes": on_demand.get("notes"),
+                },
+                "assumptions": {"dataset_bytes": dataset_bytes, "metrics": ["billed_bytes"]},
+                "sources": sources,
+                "storage_costs": storage_costs,
+            }
+            costs.append(entry)
+            charges.append(Charge(entry, result, "billed_bytes",
+                                  on_demand["price_usd"] / on_demand["price_unit_bytes"]))
+
+        keys = ["system", "date", "machine", "cluster_size", "proprietary", "tuned", "comment",
+                "tags", "load_time", "data_size", "result"] + carried
+        return {**{k: result.get(k) for k in keys}, "costs": costs}, charges
+
+    return model
+
+
+# -- where the files are -----------------------------------------------------------------
+
+
+def scaled(folder, inputs, pattern, rename):
+    """(input, output) pairs for the 100M set (results/) and each of results_1B/10B/100B."""
+    pairs = []
+    for scale in [None] + SCALES:
+        src_dir = os.path.join(folder, inputs(scale))
+        dst_dir = os.path.join(folder, "results" if scale is None else f"results_{scale}")
+        for src in sorted(glob.glob(os.path.join(src_dir, pattern))):
+            pairs.append((src, os.path.join(dst_dir, rename(os.path.basename(src)))))
+    return pairs
+
+
+def enriched_name(name):
+    return name[: -len(".json")] + "_enriched.json"
+
+
+def databricks_jobs(mirror):
+    folder = os.path.join(BENCH2COST, "databricks")
+    pricing = os.path.join(folder, "pricings", "sql_serverless_compute.json")
+    pairs = scaled(folder, lambda s: "clickbench/results" if s is None else f"clickbench/large/results_{s}",
+                   "*.json", enriched_name)
+    return [(src, pricing, dst) for src, dst in pairs]
+
+
+def snowflake_jobs(mirror):
+    folder = os.path.join(BENCH2COST, "snowflake")
+    pricing = os.path.join(folder, "pricings", "standard_warehouse.json")
+    pairs = scaled(folder, lambda s: "clickbench/results" if s is None else f"clickbench/results_{s.lower()}",
+                   "*.json", enriched_name)
+    return [(src, pricing, dst) for src, dst in pairs]
+
+
+def bigquery_jobs(mirror):
+    folder = os.path.join(BENCH2COST, "bigquery")
+    pricing = os.path.join(folder, "pricings", "serverless.json")
+    base = "clickbench/bigquery_extended"
+    pairs = scaled(folder, lambda s: f"{base}/results" if s is None else f"{base}/large/results_{s}",
+                   "*.json", enriched_name)
+    return [(src, pricing, dst) for src, dst in pairs]
+
+
+def redshift_jobs(mirror):
+    folder = os.path.join(BENCH2COST, "redshift-serverless")
+    pricing = os.path.join(folder, "pricings", "serverless.json")
+    src_dir = os.path.join(folder, "clickbench", "redshift-serverless_extended", "results")
+    jobs = []
+    for scale, out_dir in [("100m", "results")] + [(s.lower(), f"results_{s}") for s in SCALES]:
+        src = os.path.join(src_dir, f"serverless_{scale}.json")
+        if os.path.exists(src):
+            jobs.append((src, pricing, os.path.join(folder, out_dir, f"enriched_{scale}.json")))
+    return jobs
+
+
+def clickhouse_cloud_jobs(mirror):
+    folder = os.path.join(BENCH2COST, "clickhouse-cloud")
+    jobs = []
+    # 100M: one ClickBench result per pricing file, same name.
+    for pricing in sorted(glob.glob(os.path.join(folder, "pricings", "*.json"))):
+        name = os.path.basename(pricing)
+        jobs.append((os.path.join(mirror, "clickhouse-cloud", "results", name), pricing,
+                     os.path.join(folder, "results", name)))
+    return jobs
+
+
+def clickhouse_cloud_large_jobs(mirror):
+    folder = os.path.join(BENCH2COST, "clickhouse-cloud")
+    jobs = []
+    for scale in SCALES:
+        for src in sorted(glob.glob(os.path.join(folder, "clickbench", "large", f"results_{scale}",
+                                                 "*.parallel_replicas.json"))):
+            name = os.path.basename(src)
+            provider = name.split(".", 1)[0]
+            # tiers are the same in every pricing file of a provider
+            pricing = sorted(glob.glob(os.path.join(folder, "pricings", f"{provider}.*.json")))[0]
+            jobs.append((src, pricing, os.path.join(folder, f"results_{scale}", name)))
+    return jobs
+
+
+# name -> (jobs, model, options)
+VENDORS = {
+    "databricks": (databricks_jobs, databricks, {"cloud": "aws", "region": "us-east-1", "plan": "premium"}),
+    "snowflake": (snowflake_jobs, snowflake, {"cloud": "aws", "region": "us-east-1"}),
+    "clickhouse-cloud": (clickhouse_cloud_jobs, clickhouse_cloud, {}),
+    "clickhouse-cloud-large": (clickhouse_cloud_large_jobs, clickhouse_cloud_large, {}),
+    "bigquery": (bigquery_jobs, serverless("billed_slot_sec", ["billed_slot_sec", "billed_bytes"]),
+                 {"region": "us-east1"}),
+    "redshift": (redshift_jobs, serverless("billed_times", ["billed_times"]), {"region": "us-east1"}),
+}
+
+
+# -- the vectorized part -------------------------------------------------------------------
+
+
+def fill_compute_costs(charges):
+    """
+    Pad every distinct grid into one (grids, queries, runs) array, NaN for null
+    or missing runs, and multiply it by all the rates in a single step.
+    """
+    grids, index = [], {}
+    for c in charges:
+        if isinstance(c.grid, list) and id(c.grid) not in index:
+            index[id(c.grid)] = len(grids)
+            grids.append(c.grid)
+    priced = [c for c in charges if isinstance(c.grid, list)]
+    for c in charges:
+        if not isinstance(c.grid, list):
+            c.entry["compute_costs"] = []  # the metric isn't in this result
+    if not priced:
+        return
+
+    rows = [row if isinstance(row, list) else [] for grid in grids for row in grid]
+    q_max = max(len(g) for g in grids)
+    r_max = max((len(r) for r in rows), default=0)
+    values = np.full((len(grids), q_max, max(r_max, 1)), np.nan)
+    for g, grid in enumerate(grids):
+        for q, row in enumerate(grid):
+            if isinstance(row, list) and row:
+                values[g, q, : len(row)] = [np.nan if v is None else float(v) for v in row]
+
+    which = np.array([index[id(c.grid)] for c in priced])
+    rates = np.array([c.rate for c in priced], dtype=float)
+    costs = values[which] * rates[:, None, None]
+
+    for c, grid_costs in zip(priced, costs.tolist()):
+        c.entry["compute_costs"] = [
+            [None if math.isnan(v) else v for v in q_costs[: len(row)]] if isinstance(row, list) else []
+            for q_costs, row in zip(grid_costs, c.grid)
+        ]
+
+
+# -- compare / write -------------------------------------------------------------------------
+
+
+def same(a, b, rel=1e-9):
+    if isinstance(a, float) or isinstance(b, float):
+        if a is None or b is None:
+            return a is b
+        return math.isclose(a, b, rel_tol=rel, abs_tol=1e-15)
+    if isinstance(a, dict) and isinstance(b, dict):
+        return a.keys() == b.keys() and all(same(a[k], b[k], rel) for k in a)
+    if isinstance(a, list) and isinstance(b, list):
+        return len(a) == len(b) and all(same(x, y, rel) for x, y in zip(a, b))
+    return a == b
+
+
+def keep_annotations(doc, old):
+    """Top-level keys only the file on disk has (labels added by hand) survive, in place."""
+    merged = {k: doc[k] if k in doc else v for k, v in old.items() if k in doc or k != "costs"}
+    merged.update((k, v) for k, v in doc.items() if k not in merged)
+    return merged
+
+
+def total(doc):
+    return {
+        c.get("tier"): sum(v for row in c.get("compute_costs") or [] for v in row if v is not None)
+        for c in doc["costs"]
+    }
+
+
+def enrich(vendors, mirror, check):
+    t0 = time.perf_counter()
+    jobs, charges = [], []
+    for name in vendors:
+        find, model, opts = VENDORS[name]
+        for src, pricing_path, dst in find(mirror):
+            if not os.path.exists(src):
+                print(f"⚠️  {name}: missing {src} (run: enrich.py mirror)")
+                continue
+            doc, doc_charges = model(load_json(src), load_json(pricing_path), opts)
+            jobs.append((name, dst, doc))
+            charges.extend(doc_charges)
+
+    fill_compute_costs(charges)
+    elapsed = time.perf_counter() - t0
+    print(f"Priced {len(jobs)} result sets, {len(charges)} cost entries in {elapsed:.2f}s")
+
+    changed = 0
+    for name, dst, doc in jobs:
+        rel = os.path.relpath(dst, BENCH2COST)
+        old = load_json(dst) if os.path.exists(dst) else None
+        if old is not None:
+            doc = keep_annotations(doc, old)
+        if check:
+            if old is None:
+                print(f"  + {rel} (new)")
+                changed += 1
+            elif not same(doc, old):
+                before, after = total(old), total(doc)
+                moved = ", ".join(f"{t}: {before.get(t, 0):.4f} → {after[t]:.4f}" for t in after)
+                print(f"  ~ {rel}  {moved}")
+                changed += 1
+            continue
+        os.makedirs(os.path.dirname(dst), exist_ok=True)
+        with open(dst, "w", encoding="utf-8") as f:
+            json.dump(doc, f, indent=2, ensure_ascii=False)
+            f.write("\n")
+    if check:
+        print(f"{changed} of {len(jobs)} enriched files would change")
+        return 1 if changed else 0
+    print(f"✅ Wrote {len(jobs)} enriched files")
+    return 0
+
+
+def mirror_results(mirror):
+    """Download the ClickBench results the ClickHouse Cloud pricing files refer to, if missing."""
+    fetched = 0
+    for src, _, _ in clickhouse_cloud_jobs(mirror):
+        if os.path.exists(src):
+            continue
+        path = os.path.relpath(src, mirror).replace(os.sep, "/")
+        os.makedirs(os.path.dirname(src), exist_ok=True)
+        try:
+            urllib.request.urlretrieve(f"{CLICKBENCH_RAW}/{path}", src)
+            fetched += 1
+        except OSError as e:
+            print(f"⚠️  {path}: {e}")
+    print(f"Fetched {fetched} result files into {mirror}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Enrich every vendor's ClickBench results with costs, offline"
+    )
+    parser.add_argument("command", nargs="?", choices=["enrich", "mirror"], default="enrich")
+    parser.add_argument(
+        "--vendor",
+        action="append",
+        choices=sorted(VENDORS),
+        help="Only these vendors (repeatable; default: all)",
+    )
+    parser.add_argument(
+        "--mirror",
+        default=os.path.join(BENCH2COST, "_mirror", "ClickBench"),
+        help="Local copy of the ClickBench repository (default: Bench2Cost/_mirror/ClickBench)",
+    )
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Don't write; list the enriched files whose contents would change (exit 1 if any)",
+    )
+    args = parser.parse_args()
+
+    if args.command == "mirror":
+        mirror_results(args.mirror)
+        return 0
+    return enrich(args.vendor or list(VENDORS), args.mirror, args.check)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
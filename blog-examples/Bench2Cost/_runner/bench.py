@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+# -----------------------------------------------------------------------------
+# bench.py — the run → collect → summarize pipeline for any vendor
+#
+# The same three stages as databricks/clickbench (run_bench.py,
+# collect_metrics_v2.py, summarize_results.py), with the vendor-specific part
+# behind the adapters in vendors.py:
+#
+#   python bench.py run       --vendor <v> --machine <m>
+#     → runs_<v>_<m>.json       one record per (query_index, run_index):
+#                               statement id + client-side timings
+#   python bench.py collect   --vendor <v> --machine <m>
+#     → metrics_<v>_<m>.json    the same records plus the server-side metrics,
+#                               polled until every id shows up (or --max-wait-sec),
+#                               with the checkpoint, parallel lookups and backoff
+#                               of databricks/clickbench/history.py
+#   python bench.py summarize --vendor <v> --machine <m> [--source client]
+#     → clickbench_<v>_<m>.json ClickBench result, ready for <vendor>/enrich.sh
+#
+# Every vendor runs its own dialect of the 43 queries (the file in its folder,
+# or --queries), result cache off, --runs times each, one after the other.
+#
+# Locally, with no account anywhere:
+#   python bench.py run --vendor chdb --machine local --chdb-sample-rows 1000000
+#   python bench.py collect --vendor chdb --machine local
+#   python bench.py summarize --vendor chdb --machine local
+# -----------------------------------------------------------------------------
+
+import json
+import argparse
+import os
+import re
+import time
+from datetime import date
+
+from vendors import BENCH2COST, VENDORS, add_vendor_args, open_vendor
+from history import add_poll_args, poll, poll_args, time_window
+
+
+def load_queries(path):
+    """Statements separated by ';' (one per line or spread over several); "--" comments skipped."""
+    with open(path, "r", encoding="utf-8") as f:
+        text = "\n".join(line for line in f if not line.lstrip().startswith("--"))
+    return [q.strip() for q in text.split(";") if q.strip()]
+
+
+def rewrite(query, table_name):
+    """Point "FROM hits" (or "FROM <db>.hits") at table_name, if given."""
+    if not table_name:
+        return query
+    return re.sub(r"\bFROM\s+(?:\w+\.)?hits\b", f"FROM {table_name}", query)
+
+
+# -- stage 1 ------------------------------------------------------------------------
+
+
+def run(args):
+    queries_path = args.queries or os.path.join(BENCH2COST, VENDORS[args.vendor].queries)
+    queries = load_queries(queries_path)
+    output_path = args.output or f"runs_{args.vendor}_{args.machine}.json"
+    print(f"Loaded {len(queries)} queries from {queries_path}")
+    print(f"Vendor: {args.vendor}, machine: {args.machine}, runs/query: {args.runs}")
+
+    vendor = open_vendor(args)
+    runs = []
+    try:
+        for q_idx, q in enumerate(queries, start=1):
+            rewritten = rewrite(q, args.table_name)
+            for run_idx in range(1, args.runs + 1):
+                print(f"\n[Q{q_idx} run {run_idx}/{args.runs}]")
+                started_at = time.time()
+                started = time.perf_counter()
+                try:
+                    timing = vendor.execute(rewritten)
+                    error = None
+                    print(f"  statement_id: {timing['statement_id']}")
+                    print(
+                        f"  client: {timing['client_ms']:.1f} ms "
+                        f"(first row {timing['ttfr_ms']:.1f} ms), {timing['rows']} rows"
+                    )
+                except Exception as e:  # recorded as a failed run, like a null in ClickBench
+                    error = str(e).splitlines()[0] if str(e) else type(e).__name__
+                    timing = {"statement_id": None, "ttfr_ms": None, "rows": None,
+                              "result_bytes": None, "result_hash": None,
+                              "client_ms": round((time.perf_counter() - started) * 1000.0, 3)}
+                    print(f"  ⚠️  {error}")
+
+                runs.append({
+                    "query_index": q_idx,
+                    "run_index": run_idx,
+                    "original_query": q,
+                    "rewritten_query": rewritten,
+                    "vendor": args.vendor,
+                    "machine": args.machine,
+                    "started_at": round(started_at, 6),
+                    **timing,
+                    "error": error,
+                })
+    finally:
+        vendor.close()
+
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump(runs, f, indent=2)
+    print(f"\nSaved {len(runs)} runs to {output_path} ({len(queries)} queries × {args.runs} runs).")
+
+
+# -- stage 2 ------------------------------------------------------------------------
+
+
+def collect(args):
+    input_path = args.input or f"runs_{args.vendor}_{args.machine}.json"
+    output_path = args.output or f"metrics_{args.vendor}_{args.machine}.json"
+    checkpoint_path = args.checkpoint or f"metrics_{args.vendor}_{args.machine}.checkpoint.ndjson"
+    with open(input_path, "r", encoding="utf-8") as f:
+        runs = json.load(f)
+    print(f"Loaded {len(runs)} run records from {input_path}")
+
+    window = time_window(runs, args.window_slack_sec)
+
+    def lookup(vendor, chunk):
+        return [(m.pop("statement_id"), m) for m in vendor.fetch_metrics(chunk, window)]
+
+    # one connection per lookup in flight
+    vendors = [open_vendor(args) for _ in range(max(1, args.parallel))]
+    try:
+        found = poll(vendors, lookup, [r["statement_id"] for r in runs if r["statement_id"]],
+                     checkpoint_path, **poll_args(args))
+    finally:
+        for vendor in vendors:
+            vendor.close()
+
+    records = []
+    for r in runs:
+        m = (found.get(r["statement_id"]) or [{}])[0]
+        records.append({**r, "server_ms": None, "status": "FAILED" if r["error"] else None, **m})
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump(records, f, indent=2)
+    print(f"Wrote {len(records)} records to {output_path}")
+
+
+# -- stage 3 ------------------------------------------------------------------------
+
+
+def summarize(args):
+    vendor = VENDORS[args.vendor](args)  # only for the header; no connection needed
+    if args.source == "client":
+        input_path = args.input or f"runs_{args.vendor}_{args.machine}.json"
+    else:
+        input_path = args.input or f"metrics_{args.vendor}_{args.machine}.json"
+    output_path = args.output or f"clickbench_{args.vendor}_{args.machine}.json"
+    with open(input_path, "r", encoding="utf-8") as f:
+        records = json.load(f)
+    print(f"Loaded {len(records)} records from {input_path}")
+
+    def seconds(r):
+        if args.source == "client":
+            ms = r["client_ms"] if r["error"] is None else None
+        else:
+            ms = r.get("server_ms") if r.get("status") == "FINISHED" else None
+        return round(ms / 1000.0, 3) if ms is not None else None
+
+    by_query = {}
+    for r in records:
+        by_query.setdefault(r["query_index"], []).append(r)
+    grid = [
+        sorted(by_query.get(q_idx, []), key=lambda r: r["run_index"])
+        for q_idx in range(1, max(by_query) + 1)
+    ]
+
+    hashes_differ = [
+        q_idx for q_idx, q_runs in enumerate(grid, start=1)
+        if len({r["result_hash"] for r in q_runs if r["error"] is None}) > 1
+    ]
+    for q_idx in hashes_differ:
+        print(f"⚠️  Q{q_idx}: runs returned different results")
+
+    header = vendor.header(args.machine, args.cluster_size)
+    output = {
+        "system": header.pop("system"),
+        "date": str(date.today()),
+        **header,
+        "comment": args.comment,
+        "load_time": 0,
+        "data_size": args.data_size,
+        "result": [[seconds(r) for r in q_runs] for q_runs in grid],
+    }
+    if args.source == "server":
+        for key, (metric, scale) in vendor.result_metrics.items():
+            output[key] = [
+                [r[metric] * scale if r.get(metric) is not None else None for r in q_runs]
+                for q_runs in grid
+            ]
+
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump(output, f, indent=2)
+    print(f"\n✅ Wrote ClickBench-compatible result to {output_path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Run ClickBench on any vendor, collect server-side metrics, summarize"
+    )
+    stages = parser.add_subparsers(dest="stage", required=True)
+
+    p_run = stages.add_parser("run", help="Execute the queries and record statement ids")
+    p_run.add_argument("--queries", help="SQL file (default: the vendor's queries.sql)")
+    p_run.add_argument(
+        "--table-name",
+        help='Replace "FROM hits" (or "FROM <db>.hits") with this table',
+    )
+    p_run.add_argument("--runs", type=int, default=3, help="Runs per query (default: 3)")
+
+    p_collect = stages.add_parser("collect", help="Resolve statement ids to server-side metrics")
+    add_poll_args(p_collect, "metrics_<vendor>_<machine>.checkpoint.ndjson")
+
+    p_sum = stages.add_parser("summarize", help="Build the ClickBench result JSON")
+    p_sum.add_argument("--source", choices=["server", "client"], default="server",
+                       help="server: metrics from collect (default); client: wall times from run")
+    p_sum.add_argument("--cluster-size", default=1, help='ClickBench "cluster_size" (default: 1)')
+    p_sum.add_argument("--data-size", type=int, default=0, help="Dataset size in bytes, for storage cost")
+    p_sum.add_argument("--comment", default="", help='ClickBench "comment"')
+
+    for p in (p_run, p_collect, p_sum):
+        p.add_argument("--machine", required=True, help='Machine name (e.g. "2X-Small", "XS", "236GiB")')
+        if p is not p_run:
+            p.add_argument("--input", help="Input file (default: the previous stage's output)")
+        p.add_argument("--output", help="Output file (default: <stage>_<vendor>_<machine>.json)")
+        add_vendor_args(p)
+    # collect reopens the vendor; it needs the table name only for chdb's sample data
+    for p in (p_collect, p_sum):
+        p.set_defaults(table_name=None)
+
+    args = parser.parse_args()
+    {"run": run, "collect": collect, "summarize": summarize}[args.stage](args)
+
+
+if __name__ == "__main__":
+    main()
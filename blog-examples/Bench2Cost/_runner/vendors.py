@@ -0,0 +1,603 @@
+#!/usr/bin/env python3
+# -----------------------------------------------------------------------------
+# vendors.py — one adapter per system for bench.py
+#
+# An adapter is a client (see databricks/clickbench/backends.py) that knows
+# how to, for its vendor:
+#   connect()          open a connection (credentials from the environment)
+#   disable_cache()    turn the result cache off for the session
+#   execute(query)     run one statement, fetch the result, time it from the
+#                      client's side (client_ms, ttfr_ms, rows, result_hash)
+#                      and return the id the vendor knows it by
+#   fetch_metrics(ids, window)
+#                      the server-side record of finished statements, as
+#                      {statement_id, server_ms, status, error, from_cache, ...};
+#                      ids not there yet are simply missing from the answer
+#
+#   databricks   system.query.history by statement_id
+#   clickhouse   ClickHouse server, local or Cloud: system.query_log, the
+#                statement tagged with log_comment = its id
+#   chdb         chDB in-process; it keeps no query log, so the adapter writes
+#                one (bench_query_log, in the chDB directory) from each
+#                result's own elapsed/rows_read/bytes_read
+#   snowflake    INFORMATION_SCHEMA.QUERY_HISTORY by query id (sfqid)
+#   bigquery     the job's statistics, by job id (available on completion)
+#   redshift     SYS_QUERY_HISTORY, the statement tagged with query_group
+#
+# Only the connector of the vendor in use needs to be installed.
+# -----------------------------------------------------------------------------
+
+import datetime
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BENCH2COST = os.path.dirname(HERE)
+sys.path.insert(0, os.path.join(BENCH2COST, "databricks", "clickbench"))
+
+from backends import (  # noqa: E402
+    CLICKBENCH_DDL,
+    HISTORY_COLUMNS,
+    Client,
+    DatabricksClient,
+    _ch_array,
+    _ch_datetime,
+    drain,
+)
+
+
+def _utc(ts):
+    return datetime.datetime.fromtimestamp(ts, datetime.timezone.utc)
+
+
+class Vendor(Client):
+    """Adapter base: subclasses fill in connect/disable_cache/fetch_metrics and the ClickBench header."""
+
+    name = None
+    queries = None  # default query file, relative to Bench2Cost/
+    # extra per-run arrays for the ClickBench result: key -> (metric, scale)
+    result_metrics = {}
+
+    def __init__(self, args):
+        self.args = args
+        self.fetch_size = args.fetch_size
+
+    @classmethod
+    def add_args(cls, parser):
+        pass
+
+    def connect(self):
+        raise NotImplementedError
+
+    def disable_cache(self):
+        raise NotImplementedError
+
+    def fetch_metrics(self, statement_ids, window=None):
+        raise NotImplementedError
+
+    def header(self, machine, cluster_size):
+        raise NotImplementedError
+
+
+# -- Databricks ----------------------------------------------------------------
+
+
+class DatabricksVendor(Vendor):
+    name = "databricks"
+    queries = "databricks/clickbench/queries.sql"
+
+    @classmethod
+    def add_args(cls, parser):
+        parser.add_argument("--catalog", help="Databricks: catalog to USE")
+        parser.add_argument("--db-name", help="Databricks: database to USE")
+
+    def connect(self):
+        # DatabricksClient already turns use_cached_result off when it connects.
+        self.client = DatabricksClient(self.args.catalog, self.args.db_name)
+        self.client.fetch_size = self.fetch_size
+
+    def disable_cache(self):
+        pass
+
+    def execute(self, query):
+        return self.client.execute(query)
+
+    def fetch_metrics(self, statement_ids, window=None):
+        out = []
+        for row in self.client.lookup_history(statement_ids, window):
+            m = dict(zip(HISTORY_COLUMNS, row))
+            if m["execution_status"] not in ("FINISHED", "FAILED", "CANCELED"):
+                continue
+            out.append({
+                "statement_id": m["statement_id"],
+                "server_ms": m["total_duration_ms"],
+                "status": "FINISHED" if m["execution_status"] == "FINISHED" else "FAILED",
+                "error": m["error_message"],
+                "from_cache": m["from_result_cache"],
+                "waiting_for_compute_ms": m["waiting_for_compute_duration_ms"],
+                "read_files": m["read_files"],
+                "pruned_files": m["pruned_files"],
+            })
+        return out
+
+    def header(self, machine, cluster_size):
+        return {
+            "system": "Databricks Serverless SQL warehouse",
+            "machine": "serverless",
+            "cluster_size": machine,
+            "proprietary": "yes",
+            "tuned": "no",
+            "tags": ["Databricks", "Photon", "Serverless"],
+        }
+
+    def close(self):
+        self.client.close()
+
+
+# -- ClickHouse server (local or Cloud) -------------------------------------------
+
+
+class ClickHouseVendor(Vendor):
+    name = "clickhouse"
+    queries = "clickhouse-cloud/clickbench/large/queries.sql"
+
+    @classmethod
+    def add_args(cls, parser):
+        parser.add_argument(
+            "--ch-cluster",
+            help="ClickHouse: read system.query_log from every replica of this cluster "
+                 '(e.g. "default" on ClickHouse Cloud)',
+        )
+        parser.add_argument(
+            "--ch-settings",
+            default="",
+            help='ClickHouse: extra query settings, e.g. "enable_parallel_replicas=1"',
+        )
+
+    def connect(self):
+        import clickhouse_connect
+
+        password = os.environ.get("PASSWORD", "")
+        self.conn = clickhouse_connect.get_client(
+            host=os.environ.get("FQDN", "localhost"),
+            username=os.environ.get("CLICKHOUSE_USER", "default"),
+            password=password,
+            secure=bool(password),
+        )
+        self.settings = {}
+        for pair in filter(None, self.args.ch_settings.split(",")):
+            key, _, value = pair.partition("=")
+            self.settings[key.strip()] = value.strip()
+
+    def disable_cache(self):
+        self.settings["use_query_cache"] = 0
+
+    def execute(self, query):
+        statement_id = str(uuid.uuid4())
+        settings = dict(self.settings, log_comment=statement_id)
+        t0 = time.perf_counter()
+        with self.conn.query_row_block_stream(query, settings=settings) as stream:
+            return drain(statement_id, t0, stream)
+
+    def fetch_metrics(self, statement_ids, window=None):
+        try:
+            self.conn.command("SYSTEM FLUSH LOGS")
+        except Exception:
+            pass  # not allowed for every user; the log is flushed every few seconds anyway
+        source = "system.query_log"
+        if self.args.ch_cluster:
+            source = f"clusterAllReplicas('{self.args.ch_cluster}', system.query_log)"
+        sql = (
+            "SELECT log_comment, query_duration_ms, type, exception, read_rows, read_bytes, memory_usage "
+            f"FROM {source} "
+            "WHERE type IN ('QueryFinish', 'ExceptionWhileProcessing') "
+            "AND log_comment IN {ids:Array(String)}"
+        )
+        params = {"ids": list(statement_ids)}
+        if window:
+            sql += (" AND event_time BETWEEN {window_start:DateTime64(3, 'UTC')}"
+                    " AND {window_end:DateTime64(3, 'UTC')}")
+            params["window_start"], params["window_end"] = map(_ch_datetime, window)
+        out = []
+        for sid, ms, kind, exception, read_rows, read_bytes, memory in self.conn.query(
+            sql, parameters=params
+        ).result_rows:
+            out.append({
+                "statement_id": sid,
+                "server_ms": ms,
+                "status": "FINISHED" if kind == "QueryFinish" else "FAILED",
+                "error": exception or None,
+                "from_cache": False,
+                "read_rows": read_rows,
+                "read_bytes": read_bytes,
+                "memory_bytes": memory,
+            })
+        return out
+
+    def header(self, machine, cluster_size):
+        return {
+            "system": "ClickHouse Cloud (AWS)" if self.args.ch_cluster else "ClickHouse",
+            "machine": machine,
+            "cluster_size": cluster_size,
+            "proprietary": "yes" if self.args.ch_cluster else "no",
+            "tuned": "no",
+            "tags": ["C++", "column-oriented", "ClickHouse derivative"]
+                    + (["managed", "aws"] if self.args.ch_cluster else []),
+        }
+
+    def close(self):
+        self.conn.close()
+
+
+# -- chDB ---------------------------------------------------------------------------
+
+
+class ChdbVendor(Vendor):
+    name = "chdb"
+    queries = "clickhouse-cloud/clickbench/large/queries.sql"
+
+    @classmethod
+    def add_args(cls, parser):
+        parser.add_argument(
+            "--chdb-path",
+            default="chdb_bench",
+            help="chDB: database directory (default: chdb_bench)",
+        )
+        parser.add_argument(
+            "--chdb-sample-rows",
+            type=int,
+            default=0,
+            help="chDB: create the table with this many random rows if missing",
+        )
+
+    def connect(self):
+        import chdb
+
+        self.conn = chdb.connect(self.args.chdb_path)
+        self.conn.query(
+            "CREATE TABLE IF NOT EXISTS bench_query_log ("
+            "statement_id String, event_time DateTime64(3, 'UTC'), query_duration_ms Float64, "
+            "status String, error Nullable(String), read_rows UInt64, read_bytes UInt64"
+            ") ENGINE = MergeTree ORDER BY (event_time, statement_id)"
+        )
+        if self.args.chdb_sample_rows:
+            self.create_sample(self.args.table_name or "hits", self.args.chdb_sample_rows)
+
+    def create_sample(self, table_name, rows):
+        with open(CLICKBENCH_DDL, "r", encoding="utf-8") as f:
+            ddl = f.read().strip().rstrip(";")
+        ddl = ddl.replace("CREATE TABLE hits", f"CREATE TABLE IF NOT EXISTS {table_name}", 1)
+        self.conn.query(ddl + " ENGINE = MergeTree")
+        count = self.conn.query(f"SELECT count() FROM {table_name}", "CSV").bytes()
+        if int(count) == 0:
+            print(f"Filling {table_name} with {rows:,} random rows")
+            self.conn.query(
+                f"INSERT INTO {table_name} SELECT * FROM generateRandom() LIMIT {int(rows)}"
+            )
+
+    def disable_cache(self):
+        pass  # the query cache is opt-in and never enabled here
+
+    def execute(self, query):
+        # No streaming here: the whole result comes back at once, so ttfr = client_ms.
+        statement_id = str(uuid.uuid4())
+        started_at = time.time()
+        t0 = time.perf_counter()
+        error = res = record = None
+        try:
+            res = self.conn.query(query, "JSONCompact")
+            record = drain(statement_id, t0, [json.loads(res.bytes() or b"{}").get("data", [])])
+            wall_ms = record["client_ms"]
+        except Exception as e:
+            error = str(e).splitlines()[0]
+            wall_ms = (time.perf_counter() - t0) * 1000.0
+
+        self._log({
+            "statement_id": statement_id,
+            "event_time": _ch_datetime(_utc(started_at + wall_ms / 1000.0)),
+            "query_duration_ms": res.elapsed() * 1000.0 if res else wall_ms,
+            "status": "FAILED" if error else "FINISHED",
+            "error": error,
+            "read_rows": res.rows_read() if res else 0,
+            "read_bytes": res.bytes_read() if res else 0,
+        })
+        if error:
+            raise RuntimeError(error)
+        return record
+
+    def _log(self, entry):
+        self.conn.query("INSERT INTO bench_query_log FORMAT JSONEachRow\n" + json.dumps(entry))
+
+    # Every connection in the process shares one chDB engine, and query
+    # parameters from two threads at once can clash (see ChdbClient), so
+    # parallel lookups from bench.py collect take turns.
+    _lookup_lock = threading.Lock()
+
+    def fetch_metrics(self, statement_ids, window=None):
+        sql = (
+            "SELECT statement_id, query_duration_ms, status, error, read_rows, read_bytes "
+            "FROM bench_query_log WHERE statement_id IN {ids:Array(String)}"
+        )
+        params = {"ids": _ch_array(statement_ids)}
+        if window:
+            sql += (" AND event_time BETWEEN {window_start:DateTime64(3, 'UTC')}"
+                    " AND {window_end:DateTime64(3, 'UTC')}")
+            params["window_start"], params["window_end"] = map(_ch_datetime, window)
+        with self._lookup_lock:
+            res = self.conn.query(sql, "JSONCompact", params=params)
+        return [
+            {
+                "statement_id": sid,
+                "server_ms": round(ms, 3),
+                "status": status,
+                "error": error,
+                "from_cache": False,
+                "read_rows": int(read_rows),
+                "read_bytes": int(read_bytes),
+            }
+            for sid, ms, status, error, read_rows, read_bytes
+            in json.loads(res.bytes() or b"{}").get("data", [])
+        ]
+
+    def header(self, machine, cluster_size):
+        return {
+            "system": "chDB",
+            "machine": machine,
+            "cluster_size": 1,
+            "proprietary": "no",
+            "tuned": "no",
+            "tags": ["C++", "column-oriented", "embedded", "ClickHouse derivative"],
+        }
+
+    def close(self):
+        self.conn.close()
+
+
+# -- Snowflake ------------------------------------------------------------------------
+
+
+class SnowflakeVendor(Vendor):
+    name = "snowflake"
+    queries = "snowflake/clickbench/queries.sql"
+
+    @classmethod
+    def add_args(cls, parser):
+        parser.add_argument("--sf-warehouse", help="Snowflake: warehouse")
+        parser.add_argument("--sf-database", default="HITS", help="Snowflake: database (default: HITS)")
+        parser.add_argument("--sf-schema", default="PUBLIC", help="Snowflake: schema (default: PUBLIC)")
+
+    def connect(self):
+        import snowflake.connector
+
+        # Same variables as snowflake/clickbench/run.sh (snowsql).
+        self.conn = snowflake.connector.connect(
+            account=os.environ["SNOWSQL_ACCOUNT"],
+            user=os.environ["SNOWSQL_USER"],
+            password=os.environ["SNOWSQL_PWD"],
+            warehouse=self.args.sf_warehouse,
+            database=self.args.sf_database,
+            schema=self.args.sf_schema,
+        )
+        self.cur = self.conn.cursor()
+
+    def disable_cache(self):
+        self.cur.execute("ALTER SESSION SET USE_CACHED_RESULT = FALSE")
+
+    def statement_id(self):
+        return self.cur.sfqid
+
+    def fetch_metrics(self, statement_ids, window=None):
+        params = {f"id{i}": sid for i, sid in enumerate(statement_ids)}
+        args = ["RESULT_LIMIT => 10000"]
+        if window:
+            params["window_start"], params["window_end"] = window
+            args += ["END_TIME_RANGE_START => %(window_start)s::TIMESTAMP_LTZ",
+                     "END_TIME_RANGE_END => %(window_end)s::TIMESTAMP_LTZ"]
+        self.cur.execute(
+            "SELECT query_id, total_elapsed_time, execution_status, error_message, "
+            "bytes_scanned, queued_overload_time "
+            f"FROM TABLE(INFORMATION_SCHEMA.QUERY_HISTORY({', '.join(args)})) "
+            f"WHERE query_id IN ({', '.join(f'%(id{i})s' for i in range(len(statement_ids)))})",
+            params,
+        )
+        out = []
+        for sid, ms, status, error, scanned, queued in self.cur.fetchall():
+            if status not in ("SUCCESS", "FAIL", "INCIDENT"):
+                continue  # still RUNNING / QUEUED
+            out.append({
+                "statement_id": sid,
+                "server_ms": ms,
+                "status": "FINISHED" if status == "SUCCESS" else "FAILED",
+                "error": error,
+                "from_cache": None,
+                "read_bytes": scanned,
+                "queued_ms": queued,
+            })
+        return out
+
+    def header(self, machine, cluster_size):
+        return {
+            "system": "Snowflake",
+            "machine": machine,
+            "cluster_size": cluster_size,
+            "proprietary": "yes",
+            "tuned": "no",
+            "tags": ["managed", "column-oriented"],
+        }
+
+    def close(self):
+        self.cur.close()
+        self.conn.close()
+
+
+# -- BigQuery -------------------------------------------------------------------------
+
+
+class BigQueryVendor(Vendor):
+    name = "bigquery"
+    queries = "bigquery/clickbench/bigquery_extended/queries.sql"
+    # What bigquery/enrich.sh prices: slot time (capacity) and bytes billed (on demand).
+    result_metrics = {
+        "billed_slot_sec": ("slot_ms", 0.001),
+        "billed_bytes": ("bytes_billed", 1),
+    }
+
+    @classmethod
+    def add_args(cls, parser):
+        parser.add_argument("--bq-project", help="BigQuery: project (default: from the environment)")
+        parser.add_argument("--bq-location", help="BigQuery: job location, e.g. US")
+
+    def connect(self):
+        from google.cloud import bigquery
+
+        self.bigquery = bigquery
+        self.conn = bigquery.Client(project=self.args.bq_project, location=self.args.bq_location)
+        self.job_config = bigquery.QueryJobConfig()
+
+    def disable_cache(self):
+        self.job_config.use_query_cache = False
+
+    def execute(self, query):
+        job_id = "job_" + uuid.uuid4().hex
+        t0 = time.perf_counter()
+        job = self.conn.query(query, job_config=self.job_config, job_id=job_id)
+        pages = job.result(page_size=self.fetch_size).pages
+        return drain(job_id, t0, ([tuple(row.values()) for row in page] for page in pages))
+
+    def fetch_metrics(self, statement_ids, window=None):
+        # Job statistics are final once the job is DONE; no history to wait for.
+        out = []
+        for job_id in statement_ids:
+            job = self.conn.get_job(job_id, location=self.args.bq_location)
+            if job.state != "DONE":
+                continue
+            stats = job._properties.get("statistics", {})
+            query_stats = stats.get("query", {})
+            duration = stats.get("finalExecutionDurationMs")
+            out.append({
+                "statement_id": job_id,
+                "server_ms": int(duration) if duration is not None else None,
+                "status": "FAILED" if job.error_result else "FINISHED",
+                "error": (job.error_result or {}).get("message"),
+                "from_cache": query_stats.get("cacheHit"),
+                "slot_ms": int(stats["totalSlotMs"]) if "totalSlotMs" in stats else None,
+                "bytes_billed": int(query_stats["totalBytesBilled"])
+                if "totalBytesBilled" in query_stats else None,
+            })
+        return out
+
+    def header(self, machine, cluster_size):
+        return {
+            "system": "BigQuery",
+            "machine": "serverless",
+            "cluster_size": "serverless",
+            "proprietary": "yes",
+            "tuned": "no",
+            "tags": ["serverless", "column-oriented", "gcp", "managed"],
+        }
+
+    def close(self):
+        self.conn.close()
+
+
+# -- Redshift Serverless ----------------------------------------------------------------
+
+
+class RedshiftVendor(Vendor):
+    name = "redshift"
+    queries = "redshift-serverless/clickbench/redshift-serverless_extended/queries.sql"
+
+    def connect(self):
+        import redshift_connector
+
+        # Same endpoint and user as redshift-serverless/.../run.sh (psql).
+        self.conn = redshift_connector.connect(
+            host=os.environ["FQDN"],
+            port=5439,
+            database="dev",
+            user=os.environ.get("REDSHIFT_USER", "dev"),
+            password=os.environ["REDSHIFT_PASSWORD"],
+        )
+        self.conn.autocommit = True
+        self.cur = self.conn.cursor()
+
+    def disable_cache(self):
+        self.cur.execute("SET enable_result_cache_for_session TO off")
+
+    def execute(self, query):
+        # SYS_QUERY_HISTORY.query_label carries query_group; set it outside the timed part.
+        self.label = str(uuid.uuid4())
+        self.cur.execute(f"SET query_group TO '{self.label}'")
+        return super().execute(query)
+
+    def statement_id(self):
+        return self.label
+
+    def fetch_metrics(self, statement_ids, window=None):
+        where = [f"query_label IN ({', '.join(['%s'] * len(statement_ids))})", "query_type = 'SELECT'"]
+        params = list(statement_ids)
+        if window:
+            where.append("start_time BETWEEN %s AND %s")
+            params += [w.replace(tzinfo=None) for w in window]
+        self.cur.execute(
+            "SELECT query_label, elapsed_time, queue_time, status, error_message, result_cache_hit "
+            f"FROM sys_query_history WHERE {' AND '.join(where)}",
+            params,
+        )
+        out = []
+        for label, elapsed_us, queue_us, status, error, cache_hit in self.cur.fetchall():
+            status = status.strip().lower()
+            if status not in ("success", "failed", "canceled"):
+                continue  # still queued / running
+            out.append({
+                "statement_id": label.strip(),
+                "server_ms": round(elapsed_us / 1000.0, 3),
+                "status": "FINISHED" if status == "success" else "FAILED",
+                "error": error.strip() if error else None,
+                "from_cache": cache_hit,
+                "queued_ms": round(queue_us / 1000.0, 3),
+            })
+        return out
+
+    def header(self, machine, cluster_size):
+        return {
+            "system": "Redshift Serverless",
+            "machine": "serverless",
+            "cluster_size": "serverless",
+            "proprietary": "yes",
+            "tuned": "no",
+            "tags": ["serverless", "column-oriented", "aws", "managed"],
+        }
+
+    def close(self):
+        self.cur.close()
+        self.conn.close()
+
+
+VENDORS = {
+    v.name: v
+    for v in (DatabricksVendor, ClickHouseVendor, ChdbVendor, SnowflakeVendor, BigQueryVendor, RedshiftVendor)
+}
+
+
+def add_vendor_args(parser):
+    parser.add_argument("--vendor", required=True, choices=sorted(VENDORS), help="System to benchmark")
+    parser.add_argument(
+        "--fetch-size",
+        type=int,
+        default=Client.fetch_size,
+        help=f"Rows per fetch when draining results (default: {Client.fetch_size})",
+    )
+    for vendor in VENDORS.values():
+        vendor.add_args(parser)
+
+
+def open_vendor(args):
+    vendor = VENDORS[args.vendor](args)
+    vendor.connect()
+    vendor.disable_cache()
+    return vendor
@@ -0,0 +1,382 @@
+#!/usr/bin/env python3
+# -----------------------------------------------------------------------------
+# backends.py — connection layer for run_bench.py
+#
+# run_bench.py only needs "a client that runs a statement and tells me its id",
+# once per worker. A backend opens such clients:
+#
+#   databricks  Databricks SQL warehouse (DATABRICKS_SERVER_HOSTNAME,
+#               DATABRICKS_HTTP_PATH, DATABRICKS_TOKEN), result cache off;
+#               the id is the warehouse's statement_id (cur.query_id)
+#   chdb        a local chDB database directory, to exercise the harness
+#               offline; chDB keeps no query history, so the id is a UUID
+#               generated here
+#
+# With --chdb-sample-rows N the chdb backend creates the table (ClickBench
+# schema from clickhouse-cloud/clickbench/large/create.sql) and fills it with
+# N random rows if it doesn't exist yet, so no data download is needed.
+#
+# Client.execute() times the statement from the client's side and drains the
+# result in batches of fetch_size rows:
+#   client_ms      execute() call → last row fetched
+#   ttfr_ms        execute() call → first batch fetched (time to first row)
+#   rows           rows fetched
+#   result_bytes   size of the result in the canonical encoding below
+#   result_hash    sha256 over the sorted canonical rows, so it is the same for
+#                  the same rows in any order (ties under ORDER BY ... LIMIT);
+#                  floats are compared to 10 significant digits
+# The fingerprint is computed after the clock stops. drain() builds this record
+# from any iterable of row batches, so other clients (_runner/vendors.py) that
+# fetch in their own way return the same fields.
+#
+# Client.lookup_history() is what collect_metrics_v2.py polls: the
+# HISTORY_COLUMNS of the given statement ids, optionally only those that
+# started inside a time window, with the ids passed as query parameters.
+# Databricks reads system.query.history. chDB has no history, so the chdb
+# backend reads a query_history table that simulate_history() fills from a
+# runs file, each row only becoming visible some random delay after its
+# statement finished, like entries arriving late.
+# -----------------------------------------------------------------------------
+
+import datetime
+import decimal
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+import uuid
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+CLICKBENCH_DDL = os.path.join(
+    HERE, "..", "..", "clickhouse-cloud", "clickbench", "large", "create.sql"
+)
+
+
+# Columns collect_metrics_v2.py reads from the query history, in this order.
+HISTORY_COLUMNS = [
+    "statement_id",
+    "total_duration_ms",
+    "waiting_for_compute_duration_ms",
+    "from_result_cache",
+    "read_partitions",
+    "pruned_files",
+    "read_files",
+    "execution_status",
+    "error_message",
+    "statement_text",
+]
+
+
+def _canonical(value):
+    if isinstance(value, float):
+        return float(f"{value:.10g}")
+    if isinstance(value, decimal.Decimal):
+        return float(f"{float(value):.10g}")
+    if isinstance(value, (datetime.date, datetime.datetime, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, (bytes, bytearray)):
+        return value.hex()
+    if isinstance(value, (list, tuple)):
+        return [_canonical(v) for v in value]
+    if isinstance(value, dict):
+        return {str(k): _canonical(v) for k, v in value.items()}
+    return value
+
+
+def fingerprint(batches):
+    """(result_bytes, result_hash) of fetched row batches; row order doesn't matter."""
+    encoded = sorted(
+        json.dumps([_canonical(v) for v in row], separators=(",", ":"), default=str).encode()
+        for batch in batches
+        for row in batch
+    )
+    digest = hashlib.sha256()
+    for row in encoded:
+        digest.update(row)
+        digest.update(b"\n")
+    return sum(len(row) for row in encoded), digest.hexdigest()
+
+
+def drain(statement_id, t0, batches):
+    """
+    Fetch every batch of a result whose statement started at perf_counter() t0,
+    and return the client-side record (the first batch's arrival is the ttfr).
+    """
+    fetched = []
+    ttfr = None
+    for batch in batches:
+        if ttfr is None:
+            ttfr = time.perf_counter() - t0
+        fetched.append(batch)
+    wall = time.perf_counter() - t0
+
+    result_bytes, result_hash = fingerprint(fetched)
+    return {
+        "statement_id": statement_id,
+        "client_ms": round(wall * 1000.0, 3),
+        "ttfr_ms": round((ttfr if ttfr is not None else wall) * 1000.0, 3),
+        "rows": sum(len(b) for b in fetched),
+        "result_bytes": result_bytes,
+        "result_hash": result_hash,
+    }
+
+
+class Client:
+    """One connection and cursor; subclasses open them and say where statement ids come from."""
+
+    fetch_size = 10000
+
+    def statement_id(self):
+        raise NotImplementedError
+
+    def lookup_history(self, statement_ids, window=None):
+        """
+        History rows (HISTORY_COLUMNS) for these ids; window is an optional
+        (start, end) pair of UTC datetimes the statements started in.
+        """
+        raise NotImplementedError
+
+    def execute(self, query):
+        """Run one statement and fetch its whole result; returns the client-side record."""
+        t0 = time.perf_counter()
+        self.cur.execute(query)
+        return drain(self.statement_id(), t0, self.batches())
+
+    def batches(self):
+        while True:
+            batch = self.cur.fetchmany(self.fetch_size)
+            if not batch:
+                return
+            yield batch
+
+    def close(self):
+        self.cur.close()
+
+
+class DatabricksClient(Client):
+    def __init__(self, catalog, db_name):
+        from databricks import sql
+
+        self.conn = sql.connect(
+            server_hostname=os.environ["DATABRICKS_SERVER_HOSTNAME"],
+            http_path=os.environ["DATABRICKS_HTTP_PATH"],
+            access_token=os.environ["DATABRICKS_TOKEN"],
+        )
+        self.cur = self.conn.cursor()
+
+        # disable cached results for this session
+        self.cur.execute("SET use_cached_result=false")
+        self.cur.fetchall()
+
+        if catalog:
+            self.cur.execute(f"USE CATALOG {catalog}")
+
+        if db_name:
+            self.cur.execute(f"USE {db_name}")
+            self.cur.fetchall()
+
+    def statement_id(self):
+        return self.cur.query_id
+
+    def lookup_history(self, statement_ids, window=None):
+        # Named parameter markers: ids go to the warehouse as values, not as SQL text.
+        params = {f"id{i}": sid for i, sid in enumerate(statement_ids)}
+        where = [f"statement_id IN ({', '.join(':' + name for name in params)})"]
+        if window:
+            params["window_start"], params["window_end"] = window
+            where.append("start_time BETWEEN :window_start AND :window_end")
+        self.cur.execute(
+            f"SELECT {', '.join(HISTORY_COLUMNS)} FROM system.query.history "
+            f"WHERE {' AND '.join(where)}",
+            parameters=params,
+        )
+        return self.cur.fetchall()
+
+    def close(self):
+        self.cur.close()
+        self.conn.close()
+
+
+def _ch_array(values):
+    return "[" + ",".join(
+        "'" + v.replace("\\", "\\\\").replace("'", "\\'") + "'" for v in values
+    ) + "]"
+
+
+def _ch_datetime(dt):
+    return dt.astimezone(datetime.timezone.utc).strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+
+
+class ChdbClient(Client):
+    def __init__(self, conn, lock):
+        self.conn = conn
+        self.lock = lock
+        self.cur = conn.cursor()
+
+    def statement_id(self):
+        return str(uuid.uuid4())
+
+    def lookup_history(self, statement_ids, window=None):
+        sql = (
+            f"SELECT {', '.join(HISTORY_COLUMNS)} FROM query_history "
+            "WHERE statement_id IN {ids:Array(String)} AND visible_at <= now64(3)"
+        )
+        params = {"ids": _ch_array(statement_ids)}
+        if window:
+            sql += (" AND start_time BETWEEN {window_start:DateTime64(3, 'UTC')}"
+                    " AND {window_end:DateTime64(3, 'UTC')}")
+            params["window_start"], params["window_end"] = map(_ch_datetime, window)
+        # Query parameters belong to the connection, not the call: two threads
+        # passing params at once see each other's (or none), so take turns.
+        with self.lock:
+            result = self.conn.query(sql, "JSONCompact", params=params)
+        return [tuple(row) for row in json.loads(result.bytes() or b"{}").get("data", [])]
+
+
+class DatabricksBackend:
+    name = "databricks"
+
+    def __init__(self, args):
+        self.catalog = getattr(args, "catalog", None)
+        self.db_name = getattr(args, "db_name", None)
+        self.fetch_size = args.fetch_size
+
+    def client(self):
+        client = DatabricksClient(self.catalog, self.db_name)
+        client.fetch_size = self.fetch_size
+        return client
+
+    def close(self):
+        pass
+
+
+class ChdbBackend:
+    """One chDB connection for the process; each worker gets its own cursor on it."""
+
+    name = "chdb"
+
+    def __init__(self, args):
+        import chdb
+
+        self.conn = chdb.connect(args.chdb_path)
+        self.lock = threading.Lock()
+        self.fetch_size = args.fetch_size
+        if getattr(args, "chdb_sample_rows", 0):
+            self.create_sample(args.table_name, args.chdb_sample_rows)
+
+    def create_sample(self, table_name, rows):
+        with open(CLICKBENCH_DDL, "r", encoding="utf-8") as f:
+            ddl = f.read().strip().rstrip(";")
+        ddl = ddl.replace("CREATE TABLE hits", f"CREATE TABLE IF NOT EXISTS {table_name}", 1)
+        cur = self.conn.cursor()
+        cur.execute(ddl + " ENGINE = MergeTree")
+        cur.execute(f"SELECT count() FROM {table_name}")
+        if cur.fetchall()[0][0] == 0:
+            print(f"Filling {table_name} with {rows:,} random rows")
+            cur.execute(
+                f"INSERT INTO {table_name} SELECT * FROM generateRandom() LIMIT {int(rows)}"
+            )
+        cur.close()
+
+    def simulate_history(self, runs, mean_delay_s, seed=0):
+        """
+        Add a query_history row for every run not in it yet. total_duration_ms
+        is the client-side time; the row turns visible an exponentially
+        distributed delay (mean mean_delay_s) after the statement ended.
+        """
+        cur = self.conn.cursor()
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS query_history (
+                statement_id String,
+                start_time DateTime64(3, 'UTC'),
+                visible_at DateTime64(3, 'UTC'),
+                total_duration_ms Nullable(Int64),
+                waiting_for_compute_duration_ms Nullable(Int64),
+                from_result_cache Nullable(Bool),
+                read_partitions Nullable(Int64),
+                pruned_files Nullable(Int64),
+                read_files Nullable(Int64),
+                execution_status String,
+                error_message Nullable(String),
+                statement_text String
+            ) ENGINE = MergeTree ORDER BY (start_time, statement_id)
+        """)
+        cur.execute("SELECT statement_id FROM query_history")
+        known = {row[0] for row in cur.fetchall()}
+
+        rng = random.Random(seed)
+        now = time.time()
+        lines = []
+        for r in runs:
+            sid = r.get("statement_id")
+            if not sid or sid in known:
+                continue
+            started = r.get("started_at") or now
+            duration_ms = r.get("client_ms")
+            ended = started + (duration_ms or 0) / 1000.0
+            delay = rng.expovariate(1.0 / mean_delay_s) if mean_delay_s > 0 else 0.0
+            ts = lambda t: datetime.datetime.fromtimestamp(t, datetime.timezone.utc)  # noqa: E731
+            lines.append(json.dumps({
+                "statement_id": sid,
+                "start_time": _ch_datetime(ts(started)),
+                "visible_at": _ch_datetime(ts(max(ended, now) + delay)),
+                "total_duration_ms": round(duration_ms) if duration_ms is not None else None,
+                "waiting_for_compute_duration_ms": 0,
+                "from_result_cache": False,
+                "read_partitions": None,
+                "pruned_files": None,
+                "read_files": None,
+                "execution_status": "FAILED" if r.get("error") else "FINISHED",
+                "error_message": r.get("error"),
+                "statement_text": r.get("rewritten_query", ""),
+            }))
+        if lines:
+            self.conn.query("INSERT INTO query_history FORMAT JSONEachRow\n" + "\n".join(lines))
+        cur.close()
+        return len(lines)
+
+    def client(self):
+        client = ChdbClient(self.conn, self.lock)
+        client.fetch_size = self.fetch_size
+        return client
+
+    def close(self):
+        self.conn.close()
+
+
+BACKENDS = {
+    "databricks": DatabricksBackend,
+    "chdb": ChdbBackend,
+}
+
+
+def add_backend_args(parser):
+    parser.add_argument(
+        "--backend",
+        choices=sorted(BACKENDS),
+        default="databricks",
+        help="Where to run the queries (default: databricks)",
+    )
+    parser.add_argument(
+        "--chdb-path",
+        default="chdb_bench",
+        help="chDB database directory for --backend chdb (default: chdb_bench)",
+    )
+    parser.add_argument(
+        "--chdb-sample-rows",
+        type=int,
+        default=0,
+        help="With --backend chdb: create the table with this many random rows if missing",
+    )
+    parser.add_argument(
+        "--fetch-size",
+        type=int,
+        default=Client.fetch_size,
+        help=f"Rows per fetch when draining results (default: {Client.fetch_size})",
+    )
+
+
+def open_backend(args):
+    return BACKENDS[args.backend](args)
@@ -1,18 +1,24 @@
 #!/usr/bin/env python3
-import os
-import time
+# -----------------------------------------------------------------------------
+# collect_metrics_v2.py — Stage 2: resolve statement_ids in the query history
+#
+# Entries show up in system.query.history minutes after the statements ran,
+# so this polls until every statement_id from runs_<machine>.json is found or
+# --max-wait-sec passes (history.poll: pending ids only, --chunk-size ids per
+# query, --parallel queries in flight, a checkpoint file to resume from, and
+# jittered exponential backoff from --poll-interval-sec to --max-interval-sec).
+# When the runs carry started_at (run_bench.py records it), each query is
+# narrowed with start_time BETWEEN <first start - slack> AND <last end + slack>.
+#
+# Offline, against chDB (see backends.py), with entries arriving ~20s late:
+#   python collect_metrics_v2.py --machine local --backend chdb --simulate-delay 20
+# -----------------------------------------------------------------------------
+
 import json
 import argparse
-from databricks import sql
-
-HOST = os.environ["DATABRICKS_SERVER_HOSTNAME"]
-HTTP_PATH = os.environ["DATABRICKS_HTTP_PATH"]
-TOKEN = os.environ["DATABRICKS_TOKEN"]
-
 
-def escape_literal(s: str) -> str:
-    """Escape single quotes for safe inclusion in an IN (...) list."""
-    return s.replace("'", "''")
+from backends import HISTORY_COLUMNS, add_backend_args, open_backend
+from history import add_poll_args, poll, poll_args, time_window
 
 
 def main():
@@ -32,32 +38,29 @@ def main():
         "--output",
         help="Path to metrics JSON (default: metrics_<machine>.json)",
     )
+    add_poll_args(parser, "metrics_<machine>.checkpoint.ndjson")
     parser.add_argument(
-        "--max-wait-sec",
-        type=int,
-        default=900,
-        help="Max seconds to wait for history entries (default: 900 = 15min)",
-    )
-    parser.add_argument(
-        "--poll-interval-sec",
-        type=int,
-        default=10,
-        help="Polling interval in seconds (default: 10)",
+        "--simulate-delay",
+        type=float,
+        default=0.0,
+        help="With --backend chdb: first add the runs to a simulated history table, "
+             "each entry appearing this many seconds late on average",
     )
+    add_backend_args(parser)
 
     args = parser.parse_args()
     machine = args.machine
 
     input_path = args.input or f"runs_{machine}.json"
     output_path = args.output or f"metrics_{machine}.json"
-    max_wait = args.max_wait_sec
-    interval = args.poll_interval_sec
+    checkpoint_path = args.checkpoint or f"metrics_{machine}.checkpoint.ndjson"
 
     print(f"Machine           : {machine}")
     print(f"Input (runs)      : {input_path}")
     print(f"Output (metrics)  : {output_path}")
-    print(f"Max wait (sec)    : {max_wait}")
-    print(f"Poll interval (s) : {interval}")
+    print(f"Checkpoint        : {checkpoint_path}")
+    print(f"Max wait (sec)    : {args.max_wait_sec}")
+    print(f"Poll interval (s) : {args.poll_interval_sec} → {args.max_interval_sec} (backoff)")
 
     with open(input_path, "r", encoding="utf-8") as f:
         items = json.load(f)
@@ -68,113 +71,33 @@ def main():
     by_stmt = {}
     for item in items:
         sid = item["statement_id"]
+        if sid is None:
+            continue  # the statement failed client-side; there is nothing to look up
         by_stmt.setdefault(sid, []).append(item)
 
-    pending_ids = set(by_stmt.keys())
-    found_metrics = {}  # statement_id -> list of rows (should normally be 1)
-
-    start_ts = time.time()
-    attempts = 0
-
-    with sql.connect(
-        server_hostname=HOST,
-        http_path=HTTP_PATH,
-        access_token=TOKEN,
-    ) as conn:
-        while pending_ids and (time.time() - start_ts) < max_wait:
-            attempts += 1
-            print(
-                f"\nPolling attempt {attempts} "
-                f"(pending {len(pending_ids)} statement_ids)..."
-            )
-
-            batch_ids = list(pending_ids)
-            # Databricks can handle pretty large IN lists, but be safe:
-            chunk_size = 200
-            new_found = 0
-
-            for i in range(0, len(batch_ids), chunk_size):
-                chunk = batch_ids[i : i + chunk_size]
-                in_list = ",".join(
-                    f"'{escape_literal(s)}'" for s in chunk
-                )
-
-                metrics_sql = f"""
-                SELECT
-                    statement_id,
-                    total_duration_ms,
-                    waiting_for_compute_duration_ms,
-                    from_result_cache,
-                    read_partitions,
-                    pruned_files,
-                    read_files,
-                    execution_status,
-                    error_message,
-                    statement_text
-                FROM system.query.history
-                WHERE statement_id IN ({in_list})
-                """
-
-                with conn.cursor() as cur:
-                    cur.execute(metrics_sql)
-                    rows = cur.fetchall()
-
-                for row in rows:
-                    (
-                        stmt_id,
-                        total_ms,
-                        wait_ms,
-                        from_cache,
-                        read_partitions,
-                        pruned_files,
-                        read_files,
-                        exec_status,
-                        err_msg,
-                        stmt_text,
-                    ) = row
-
-                    # accumulate metrics (normally 1 row per statement_id)
-                    found_metrics.setdefault(stmt_id, []).append(
-                        {
-                            "total_duration_ms": total_ms,
-                            "waiting_for_compute_duration_ms": wait_ms,
-                            "from_result_cache": from_cache,
-                            "read_partitions": read_partitions,
-                            "pruned_files": pruned_files,
-                            "read_files": read_files,
-                            "execution_status": exec_status,
-                            "error_message": err_msg,
-                            "statement_text": stmt_text,
-                        }
-                    )
-
-                new_found += len(rows)
-
-            if new_found:
-                print(f"  → Found {new_found} new history rows.")
-                # remove any IDs that now have metrics
-                pending_ids -= set(found_metrics.keys())
-            else:
-                print("  → No new rows yet.")
-
-            if pending_ids:
-                elapsed = int(time.time() - start_ts)
-                print(
-                    f"  Still waiting on {len(pending_ids)} ids "
-                    f"(elapsed {elapsed}s, sleeping {interval}s)..."
-                )
-                time.sleep(interval)
-
-        # after polling loop
-        if pending_ids:
-            elapsed = int(time.time() - start_ts)
-            print(
-                f"\n⚠️  Timeout after {elapsed}s, "
-                f"{len(pending_ids)} statement_ids still missing."
-            )
-        else:
-            elapsed = int(time.time() - start_ts)
-            print(f"\n✅ All statement_ids resolved in {elapsed}s.")
+    window = time_window(items, args.window_slack_sec)
+    if window:
+        print(f"Start-time window : {window[0].isoformat()} → {window[1].isoformat()}")
+
+    backend = open_backend(args)
+    if args.simulate_delay:
+        if backend.name != "chdb":
+            parser.error("--simulate-delay needs --backend chdb")
+        added = backend.simulate_history(items, args.simulate_delay)
+        print(f"Simulated history : {added} new entries, ~{args.simulate_delay}s late")
+
+    def lookup(client, chunk):
+        rows = [dict(zip(HISTORY_COLUMNS, row)) for row in client.lookup_history(chunk, window)]
+        return [(m.pop("statement_id"), m) for m in rows]
+
+    clients = [backend.client() for _ in range(max(1, args.parallel))]
+    try:
+        # statement_id -> list of history rows
+        found_metrics = poll(clients, lookup, by_stmt, checkpoint_path, **poll_args(args))
+    finally:
+        for client in clients:
+            client.close()
+        backend.close()
 
     # Build final per-run records, keeping your exact schema
     records = []
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+# -----------------------------------------------------------------------------
+# history.py — wait for statement ids to show up in a query history
+#
+# Shared by collect_metrics_v2.py and _runner/bench.py (every vendor). Query
+# history entries arrive some time after the statements ran, so poll() asks
+# again until every id is found or max_wait_sec passes. Each poll:
+#   - only asks for ids still pending, in chunks of chunk_size, one chunk per
+#     client with all clients in flight at once
+#   - appends whatever it found to a checkpoint file (NDJSON), so a restarted
+#     collection starts from what is already there
+# Between polls it backs off exponentially from poll_interval_sec up to
+# max_interval_sec, with jitter, and drops back to the start after a poll
+# that found something.
+#
+# time_window() is the start-time range to narrow each lookup to, when the
+# runs carry started_at (run_bench.py and bench.py record it).
+# -----------------------------------------------------------------------------
+
+import datetime
+import json
+import os
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+def time_window(items, slack_sec):
+    """(start, end) UTC datetimes covering every run, or None if the runs have no timestamps."""
+    starts = [i["started_at"] for i in items if i.get("started_at")]
+    if not starts or len(starts) != len(items):
+        return None
+    ends = [i["started_at"] + (i.get("client_ms") or 0) / 1000.0 for i in items]
+    utc = datetime.timezone.utc
+    return (
+        datetime.datetime.fromtimestamp(min(starts) - slack_sec, utc),
+        datetime.datetime.fromtimestamp(max(ends) + slack_sec, utc),
+    )
+
+
+def load_checkpoint(path, wanted):
+    """statement_id -> metric rows already found by an earlier collection."""
+    found = {}
+    if not path or not os.path.exists(path):
+        return found
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            if entry["statement_id"] in wanted:
+                found.setdefault(entry["statement_id"], []).append(entry["metrics"])
+    return found
+
+
+def poll(
+    clients,
+    lookup,
+    statement_ids,
+    checkpoint_path,
+    max_wait_sec=900,
+    poll_interval_sec=10,
+    max_interval_sec=120,
+    chunk_size=200,
+):
+    """
+    statement_id -> list of metric rows, for every id that showed up in time.
+
+    lookup(client, ids) returns (statement_id, metrics dict) pairs for those of
+    ids that are visible now; it runs on up to len(clients) threads at once,
+    each call with a client nobody else is using.
+    """
+    wanted = set(statement_ids)
+    found = load_checkpoint(checkpoint_path, wanted)
+    if found:
+        print(f"Resuming: {len(found)} statement_ids already in {checkpoint_path}")
+    pending = wanted - set(found)
+
+    free = list(clients)
+
+    def lookup_chunk(chunk):
+        client = free.pop()  # list.pop/append are atomic; one client per query in flight
+        try:
+            return lookup(client, chunk)
+        finally:
+            free.append(client)
+
+    start_ts = time.time()
+    attempts = 0
+    delay = poll_interval_sec
+
+    with open(checkpoint_path, "a", encoding="utf-8") as checkpoint, \
+            ThreadPoolExecutor(max_workers=len(clients)) as pool:
+        while pending and (time.time() - start_ts) < max_wait_sec:
+            attempts += 1
+            print(f"\nPolling attempt {attempts} (pending {len(pending)} statement_ids)...")
+
+            ids = sorted(pending)
+            chunks = [ids[i : i + chunk_size] for i in range(0, len(ids), chunk_size)]
+            new_found = 0
+
+            for rows in pool.map(lookup_chunk, chunks):
+                for stmt_id, m in rows:
+                    if stmt_id not in pending:
+                        continue
+                    # accumulate metrics (normally 1 row per statement_id)
+                    found.setdefault(stmt_id, []).append(m)
+                    checkpoint.write(
+                        json.dumps({"statement_id": stmt_id, "metrics": m}, default=str) + "\n"
+                    )
+                    new_found += 1
+            checkpoint.flush()
+
+            if new_found:
+                print(f"  → Found {new_found} new history rows.")
+                pending -= set(found)
+                delay = poll_interval_sec
+            else:
+                print("  → No new rows yet.")
+
+            if pending:
+                elapsed = time.time() - start_ts
+                # Full jitter on the upper half, and never past the deadline.
+                sleep = min(random.uniform(delay / 2, delay), max(0.0, max_wait_sec - elapsed))
+                print(
+                    f"  Still waiting on {len(pending)} ids "
+                    f"(elapsed {int(elapsed)}s, sleeping {sleep:.1f}s)..."
+                )
+                time.sleep(sleep)
+                if not new_found:
+                    delay = min(delay * 2, max_interval_sec)
+
+    elapsed = int(time.time() - start_ts)
+    if pending:
+        print(f"\n⚠️  Timeout after {elapsed}s, {len(pending)} statement_ids still missing.")
+    else:
+        print(f"\n✅ All statement_ids resolved in {elapsed}s ({attempts} polls).")
+    return found
+
+
+def add_poll_args(parser, checkpoint_default):
+    """The poll() knobs as command-line options, shared by the collect scripts."""
+    parser.add_argument(
+        "--max-wait-sec",
+        type=int,
+        default=900,
+        help="Max seconds to wait for history entries (default: 900 = 15min)",
+    )
+    parser.add_argument(
+        "--poll-interval-sec",
+        type=float,
+        default=10,
+        help="First wait between polls, in seconds (default: 10)",
+    )
+    parser.add_argument(
+        "--max-interval-sec",
+        type=float,
+        default=120,
+        help="Longest wait between polls while nothing new shows up (default: 120)",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=200,
+        help="statement_ids per history query (default: 200)",
+    )
+    parser.add_argument(
+        "--parallel",
+        type=int,
+        default=4,
+        help="History queries in flight at once, one connection each (default: 4)",
+    )
+    parser.add_argument(
+        "--window-slack-sec",
+        type=float,
+        default=600,
+        help="Widen the start_time window by this much on both sides (default: 600)",
+    )
+    parser.add_argument(
+        "--checkpoint",
+        help=f"NDJSON of history rows found so far (default: {checkpoint_default})",
+    )
+
+
+def poll_args(args):
+    """The poll() keyword arguments from add_poll_args options."""
+    return {
+        "max_wait_sec": args.max_wait_sec,
+        "poll_interval_sec": args.poll_interval_sec,
+        "max_interval_sec": args.max_interval_sec,
+        "chunk_size": args.chunk_size,
+    }
@@ -20,12 +20,46 @@
 #   ✅ makes re-running metric collection possible without re-running queries
 #
 # Output: runs_<machine>.json — one record per (query_index, run_index)
+#
+# Concurrency mode (--concurrency N):
+#   N client workers, each with its own connection, replay the query set at
+#   the same time instead of one query after another. Which query runs next
+#   is drawn from --mix; when it starts is either "as soon as the worker is
+#   free" (closed loop, the default) or a stream of arrivals at
+#   --arrival-rate statements/s shared by all workers (open loop; a statement
+#   that finds every worker busy waits, and that wait is reported). Runs until
+#   --duration seconds or --statements statements, whichever comes first.
+#
+#   Every statement keeps its statement_id plus client-side timings, so
+#   collect_metrics_v2.py --input runs_<machine>_c<N>.json resolves them as
+#   usual. Throughput and tail latency go to load_<machine>_c<N>.json.
+#
+# Client-side results (both modes):
+#   Every statement is also appended, as soon as it finishes, to
+#   client_<machine>.ndjson (--client-log): statement_id, client-observed wall
+#   time, time to first row, rows and bytes fetched, and a fingerprint of the
+#   result (see backends.py). These timings are usable right away:
+#     python summarize_results.py --machine <machine> --source client
+#   builds the ClickBench result from them without waiting for
+#   system.query.history; collect_metrics_v2.py stays available for the
+#   server-side numbers. Each invocation is one "session" in the log.
+#
+# --backend chdb runs the same harness against a local chDB directory (see
+# backends.py), e.g. to try a mix offline:
+#   python run_bench.py --machine local --backend chdb --chdb-sample-rows 1000000 \
+#       --table-name hits --concurrency 8 --duration 30 --mix 1:5,2:5,8:1
 # -----------------------------------------------------------------------------
 
-import os
 import json
 import argparse
-from databricks import sql
+import math
+import queue
+import random
+import threading
+import time
+import uuid
+
+from backends import add_backend_args, open_backend
 
 
 def load_queries(path: str):
@@ -41,6 +75,258 @@ def load_queries(path: str):
     return queries
 
 
+def parse_mix(spec, num_queries):
+    """
+    "" → every query, equal weight; "1,2,8" → only those; "1:5,2:5,8:1" →
+    weighted. Returns (query_indexes, weights).
+    """
+    if not spec:
+        return list(range(1, num_queries + 1)), [1.0] * num_queries
+    indexes, weights = [], []
+    for part in spec.split(","):
+        q, _, w = part.partition(":")
+        q_idx = int(q)
+        if not 1 <= q_idx <= num_queries:
+            raise ValueError(f"query {q_idx} not in 1..{num_queries}")
+        indexes.append(q_idx)
+        weights.append(float(w) if w else 1.0)
+    return indexes, weights
+
+
+def percentile(values, p):
+    """Nearest-rank percentile of an already sorted list."""
+    if not values:
+        return None
+    k = max(0, math.ceil(p / 100.0 * len(values)) - 1)
+    return values[k]
+
+
+def latency_summary(ms):
+    ms = sorted(ms)
+    return {
+        "count": len(ms),
+        "p50_ms": percentile(ms, 50),
+        "p90_ms": percentile(ms, 90),
+        "p95_ms": percentile(ms, 95),
+        "p99_ms": percentile(ms, 99),
+        "max_ms": ms[-1] if ms else None,
+    }
+
+
+class ClientLog:
+    """Append-only NDJSON, one line per statement, flushed as each one finishes."""
+
+    def __init__(self, path, context):
+        self.f = open(path, "a", encoding="utf-8")
+        self.context = context
+        self.lock = threading.Lock()
+
+    def write(self, record):
+        line = json.dumps({**self.context, **record}, ensure_ascii=False)
+        with self.lock:
+            self.f.write(line + "\n")
+            self.f.flush()
+
+    def close(self):
+        self.f.close()
+
+
+def client_fields(record):
+    """The part of a run record that goes to the client log."""
+    keys = ("query_index", "run_index", "statement_id", "worker", "started_at",
+            "client_ms", "ttfr_ms", "queue_ms", "rows", "result_bytes",
+            "result_hash", "error")
+    return {k: record[k] for k in keys if k in record}
+
+
+def run_serial(backend, queries, args, log):
+    runs = []  # one record per (query_index, run_index)
+
+    client = backend.client()
+    try:
+        for q_idx, q in enumerate(queries, start=1):
+            rewritten = q.replace("FROM hits", f"FROM {args.table_name}")
+
+            for run_idx in range(1, args.runs + 1):
+                print(f"\n[Q{q_idx} run {run_idx}/{args.runs}]")
+                print(f"  {rewritten}")
+
+                started_at = time.time()
+                timing = client.execute(rewritten)
+                print(f"  statement_id: {timing['statement_id']}")
+                print(
+                    f"  client: {timing['client_ms']:.1f} ms "
+                    f"(first row {timing['ttfr_ms']:.1f} ms), {timing['rows']} rows"
+                )
+
+                record = {
+                    "query_index": q_idx,
+                    "run_index": run_idx,
+                    "original_query": q,
+                    "rewritten_query": rewritten,
+                    "statement_id": timing["statement_id"],
+                    "table_name": args.table_name,
+                    "machine": args.machine,
+                    "started_at": round(started_at, 6),
+                    **{k: v for k, v in timing.items() if k != "statement_id"},
+                    "error": None,
+                }
+                runs.append(record)
+                log.write(client_fields(record))
+    finally:
+        client.close()
+    return runs
+
+
+def run_concurrent(backend, queries, args, log):
+    """
+    Replay the mix from --concurrency workers; returns (runs, summary).
+    Each worker owns one client for the whole run.
+    """
+    indexes, weights = parse_mix(args.mix, len(queries))
+    rng = random.Random(args.seed)
+    runs = []
+    lock = threading.Lock()
+    occurrences = {}  # query_index -> statements issued so far, for run_index
+    issued = [0]
+    stop_at = time.monotonic() + args.duration if args.duration else None
+    open_loop = args.arrival_rate > 0
+    arrivals = queue.Queue()
+
+    def next_statement():
+        """Claim the next (query_index, run_index), or None when the run is over."""
+        with lock:
+            if args.statements and issued[0] >= args.statements:
+                return None
+            if stop_at is not None and time.monotonic() >= stop_at:
+                return None
+            issued[0] += 1
+            q_idx = rng.choices(indexes, weights)[0]
+            occurrences[q_idx] = occurrences.get(q_idx, 0) + 1
+            return q_idx, occurrences[q_idx]
+
+    def dispatcher():
+        # Poisson arrivals: exponential gaps with mean 1 / rate.
+        t = time.monotonic()
+        while True:
+            claimed = next_statement()
+            if claimed is None:
+                break
+            t += rng.expovariate(args.arrival_rate)
+            delay = t - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            arrivals.put((claimed, t))
+        for _ in range(args.concurrency):
+            arrivals.put(None)
+
+    def worker(worker_idx):
+        client = backend.client()
+        try:
+            while True:
+                if open_loop:
+                    item = arrivals.get()
+                    if item is None:
+                        break
+                    (q_idx, run_idx), scheduled = item
+                else:
+                    claimed = next_statement()
+                    if claimed is None:
+                        break
+                    (q_idx, run_idx), scheduled = claimed, None
+
+                q = queries[q_idx - 1]
+                rewritten = q.replace("FROM hits", f"FROM {args.table_name}")
+                started = time.monotonic()
+                started_at = time.time()
+                timing = {"statement_id": None, "client_ms": None, "ttfr_ms": None,
+                          "rows": None, "result_bytes": None, "result_hash": None}
+                error = None
+                try:
+                    timing = client.execute(rewritten)
+                except Exception as e:  # keep the load going; the error is recorded
+                    error = str(e).splitlines()[0] if str(e) else type(e).__name__
+                    timing["client_ms"] = round((time.monotonic() - started) * 1000.0, 3)
+
+                record = {
+                    "query_index": q_idx,
+                    "run_index": run_idx,
+                    "original_query": q,
+                    "rewritten_query": rewritten,
+                    "statement_id": timing["statement_id"],
+                    "table_name": args.table_name,
+                    "machine": args.machine,
+                    "worker": worker_idx,
+                    "started_at": round(started_at, 6),
+                    **{k: v for k, v in timing.items() if k != "statement_id"},
+                    "queue_ms": round((started - scheduled) * 1000.0, 3) if open_loop else None,
+                    "error": error,
+                }
+                with lock:
+                    runs.append(record)
+                log.write(client_fields(record))
+        finally:
+            client.close()
+
+    threads = [
+        threading.Thread(target=worker, args=(i,), name=f"worker-{i}")
+        for i in range(args.concurrency)
+    ]
+    if open_loop:
+        threads.append(threading.Thread(target=dispatcher, name="dispatcher"))
+
+    t0 = time.monotonic()
+    started_at = time.time()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.monotonic() - t0
+
+    runs.sort(key=lambda r: r["started_at"])
+    ok = [r for r in runs if r["error"] is None]
+    per_query = {}
+    for r in ok:
+        per_query.setdefault(r["query_index"], []).append(r["client_ms"])
+
+    summary = {
+        "machine": args.machine,
+        "backend": backend.name,
+        "table_name": args.table_name,
+        "concurrency": args.concurrency,
+        "mode": "open" if open_loop else "closed",
+        "arrival_rate": args.arrival_rate if open_loop else None,
+        "mix": args.mix or "all",
+        "started_at": round(started_at, 3),
+        "wall_s": round(wall, 3),
+        "statements": len(runs),
+        "errors": len(runs) - len(ok),
+        "qps": round(len(ok) / wall, 3) if wall else None,
+        "latency": latency_summary([r["client_ms"] for r in ok]),
+        "queue": latency_summary([r["queue_ms"] for r in ok]) if open_loop else None,
+        "per_query": {
+            str(q_idx): latency_summary(ms) for q_idx, ms in sorted(per_query.items())
+        },
+    }
+    return runs, summary
+
+
+def print_summary(summary):
+    lat = summary["latency"]
+    print(
+        f"\n{summary['statements']} statements from {summary['concurrency']} workers "
+        f"in {summary['wall_s']:.1f}s ({summary['mode']} loop), {summary['errors']} errors"
+    )
+    print(f"  QPS      : {summary['qps']}")
+    if lat["count"]:
+        print(
+            f"  latency  : p50 {lat['p50_ms']:.1f} ms, p95 {lat['p95_ms']:.1f} ms, "
+            f"p99 {lat['p99_ms']:.1f} ms, max {lat['max_ms']:.1f} ms"
+        )
+    if summary["queue"] and summary["queue"]["count"]:
+        print(f"  queueing : p95 {summary['queue']['p95_ms']:.1f} ms")
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Execute ClickBench queries and collect Databricks statement_ids"
@@ -76,80 +362,114 @@ def main():
         default=3,
         help="Number of runs per query (default: 3)",
     )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=0,
+        help="Run N concurrent client workers instead of the serial runs (default: 0 = serial)",
+    )
+    parser.add_argument(
+        "--mix",
+        default="",
+        help='Queries to replay and their weights, e.g. "1,2,8" or "1:5,2:5,8:1" '
+             "(1-based; default: all queries, equal weight)",
+    )
+    parser.add_argument(
+        "--arrival-rate",
+        type=float,
+        default=0.0,
+        help="Open loop: Poisson arrivals at this many statements/s across all workers "
+             "(default: 0 = closed loop, each worker starts its next statement when free)",
+    )
+    parser.add_argument(
+        "--duration",
+        type=float,
+        default=0.0,
+        help="Concurrency mode: stop issuing statements after this many seconds",
+    )
+    parser.add_argument(
+        "--statements",
+        type=int,
+        default=0,
+        help="Concurrency mode: stop after this many statements",
+    )
+    parser.add_argument(
+        "--client-log",
+        help="Append-only NDJSON of client-side timings (default: client_<machine>.ndjson)",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=0,
+        help="Seed for the query mix and arrival times (default: 0)",
+    )
+    add_backend_args(parser)
 
     args = parser.parse_args()
+    if args.concurrency and not (args.duration or args.statements):
+        parser.error("--concurrency needs --duration and/or --statements")
+
     MACHINE = args.machine
     INPUT_FILE = args.input
-    DB_NAME = args.db_name
-    CATALOG = args.catalog
-    TABLE_NAME = args.table_name
-    NUM_RUNS = args.runs
-    OUTPUT_FILE = f"runs_{MACHINE}.json"
-
-    HOST = os.environ["DATABRICKS_SERVER_HOSTNAME"]
-    HTTP_PATH = os.environ["DATABRICKS_HTTP_PATH"]
-    TOKEN = os.environ["DATABRICKS_TOKEN"]
+    if args.concurrency:
+        OUTPUT_FILE = f"runs_{MACHINE}_c{args.concurrency}.json"
+        SUMMARY_FILE = f"load_{MACHINE}_c{args.concurrency}.json"
+    else:
+        OUTPUT_FILE = f"runs_{MACHINE}.json"
 
     queries = load_queries(INPUT_FILE)
     print(f"Loaded {len(queries)} queries from {INPUT_FILE}")
     print(f"Machine: {MACHINE}")
-    print(f"DB: {DB_NAME}, table: {TABLE_NAME}, runs/query: {NUM_RUNS}")
+    print(f"Backend: {args.backend}")
+    if args.concurrency:
+        print(
+            f"DB: {args.db_name}, table: {args.table_name}, workers: {args.concurrency}, "
+            f"mix: {args.mix or 'all'}, "
+            + (f"arrivals: {args.arrival_rate}/s" if args.arrival_rate else "closed loop")
+        )
+    else:
+        print(f"DB: {args.db_name}, table: {args.table_name}, runs/query: {args.runs}")
     print(f"Output file: {OUTPUT_FILE}")
 
-    runs = []  # one record per (query_index, run_index)
+    session = str(uuid.uuid4())
+    client_log = args.client_log or f"client_{MACHINE}.ndjson"
+    print(f"Client log: {client_log} (session {session})")
 
-    with sql.connect(
-        server_hostname=HOST,
-        http_path=HTTP_PATH,
-        access_token=TOKEN,
-    ) as conn:
-        with conn.cursor() as cur:
-            # disable cached results for this session
-            cur.execute("SET use_cached_result=false")
-            cur.fetchall()
-
-            # If user supplied a catalog, activate it
-            if CATALOG:
-                print(f"Using catalog: {CATALOG}")
-                cur.execute(f"USE CATALOG {CATALOG}")
-
-            # choose database
-            cur.execute(f"USE {DB_NAME}")
-            cur.fetchall()
-
-            for q_idx, q in enumerate(queries, start=1):
-                rewritten = q.replace("FROM hits", f"FROM {TABLE_NAME}")
-
-                for run_idx in range(1, NUM_RUNS + 1):
-                    print(f"\n[Q{q_idx} run {run_idx}/{NUM_RUNS}]")
-                    print(f"  {rewritten}")
-
-                    cur.execute(rewritten)
-                    cur.fetchall()
-
-                    statement_id = cur.query_id
-                    print(f"  statement_id: {statement_id}")
-
-                    runs.append(
-                        {
-                            "query_index": q_idx,
-                            "run_index": run_idx,
-                            "original_query": q,
-                            "rewritten_query": rewritten,
-                            "statement_id": statement_id,
-                            "table_name": TABLE_NAME,
-                            "machine": MACHINE,
-                        }
-                    )
+    backend = open_backend(args)
+    log = ClientLog(
+        client_log,
+        {
+            "session": session,
+            "machine": MACHINE,
+            "backend": backend.name,
+            "table_name": args.table_name,
+            "concurrency": args.concurrency,
+        },
+    )
+    try:
+        if args.concurrency:
+            runs, summary = run_concurrent(backend, queries, args, log)
+            summary["session"] = session
+        else:
+            runs = run_serial(backend, queries, args, log)
+    finally:
+        log.close()
+        backend.close()
 
     with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
         json.dump(runs, f, indent=2)
 
-    print(
-        f"\nSaved {len(runs)} runs to {OUTPUT_FILE} "
-        f"({len(queries)} queries × {NUM_RUNS} runs)."
-    )
+    if args.concurrency:
+        with open(SUMMARY_FILE, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+        print_summary(summary)
+        print(f"\nSaved {len(runs)} runs to {OUTPUT_FILE}, summary to {SUMMARY_FILE}.")
+    else:
+        print(
+            f"\nSaved {len(runs)} runs to {OUTPUT_FILE} "
+            f"({len(queries)} queries × {args.runs} runs)."
+        )
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -14,6 +14,12 @@
 #   "data_size": 0,
 #   "result": [[run1, run2, run3], ...]
 # }
+#
+# --source server (default) takes total_duration_ms from metrics_<machine>.json
+# (collect_metrics_v2.py). --source client takes the client-observed wall time
+# from the NDJSON log written by run_bench.py, so no history polling is needed;
+# it uses the serial runs of the latest session in the log (or --session) and
+# warns about any query whose runs returned different results.
 # -----------------------------------------------------------------------------
 
 import json
@@ -21,6 +27,53 @@ import argparse
 from datetime import date
 
 
+def load_server_runs(path):
+    """metrics_<machine>.json → [{query_index, run_index, seconds}]"""
+    with open(path, "r", encoding="utf-8") as f:
+        runs = json.load(f)
+
+    out = []
+    for r in runs:
+        if r["total_duration_ms"] is None or r.get("execution_status") != "FINISHED":
+            seconds = None
+        else:
+            seconds = round(r["total_duration_ms"] / 1000.0, 3)
+        out.append({"query_index": r["query_index"], "run_index": r["run_index"], "seconds": seconds})
+    return out
+
+
+def load_client_runs(path, machine, session=None):
+    """client_<machine>.ndjson → [{query_index, run_index, seconds}] for one serial session."""
+    entries = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                e = json.loads(line)
+                if e.get("machine") == machine and not e.get("concurrency"):
+                    entries.append(e)
+
+    if not entries:
+        raise SystemExit(f"No serial runs for machine {machine} in {path}")
+    session = session or entries[-1]["session"]
+    entries = [e for e in entries if e["session"] == session]
+    print(f"Using client timings from session {session} ({len(entries)} statements)")
+
+    hashes = {}
+    out = []
+    for e in entries:
+        if e.get("error") is None and e.get("client_ms") is not None:
+            seconds = round(e["client_ms"] / 1000.0, 3)
+            hashes.setdefault(e["query_index"], set()).add(e.get("result_hash"))
+        else:
+            seconds = None
+        out.append({"query_index": e["query_index"], "run_index": e["run_index"], "seconds": seconds})
+
+    for q_idx, seen in sorted(hashes.items()):
+        if len(seen) > 1:
+            print(f"⚠️  Q{q_idx}: runs returned {len(seen)} different results")
+    return out
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Summarize Databricks benchmark results into minimal ClickBench JSON"
@@ -30,9 +83,20 @@ def main():
         required=True,
         help='Machine name (e.g. "2X-Small", "2X-Large", etc.)',
     )
+    parser.add_argument(
+        "--source",
+        choices=["server", "client"],
+        default="server",
+        help="server: query history durations (default); client: run_bench.py wall times",
+    )
     parser.add_argument(
         "--input",
-        help="Path to metrics JSON (default: metrics_<machine>.json)",
+        help="Path to metrics JSON (default: metrics_<machine>.json), "
+             "or with --source client the NDJSON log (default: client_<machine>.ndjson)",
+    )
+    parser.add_argument(
+        "--session",
+        help="With --source client: session to use (default: the latest one)",
     )
     parser.add_argument(
         "--output",
@@ -41,15 +105,20 @@ def main():
 
     args = parser.parse_args()
     MACHINE = args.machine
-    input_path = args.input or f"metrics_{MACHINE}.json"
+    if args.source == "client":
+        input_path = args.input or f"client_{MACHINE}.ndjson"
+    else:
+        input_path = args.input or f"metrics_{MACHINE}.json"
     output_path = args.output or f"clickbench_{MACHINE}.json"
 
     print(f"Loading metrics from {input_path}")
     print(f"Generating ClickBench result for machine: {MACHINE}")
     print(f"Output file will be: {output_path}")
 
-    with open(input_path, "r", encoding="utf-8") as f:
-        runs = json.load(f)
+    if args.source == "client":
+        runs = load_client_runs(input_path, MACHINE, args.session)
+    else:
+        runs = load_server_runs(input_path)
 
     # group by query_index → list of runs (sorted by run_index)
     by_query = {}
@@ -63,16 +132,7 @@ def main():
 
     for q_idx in range(1, max_q + 1):
         q_runs = sorted(by_query.get(q_idx, []), key=lambda x: x["run_index"])
-        run_times = []
-        for r in q_runs:
-            if (
-                r["total_duration_ms"] is None
-                or r.get("execution_status") != "FINISHED"
-            ):
-                run_times.append(None)
-            else:
-                run_times.append(round(r["total_duration_ms"] / 1000.0, 3))
-        result.append(run_times)
+        result.append([r["seconds"] for r in q_runs])
 
     output = {
         "system": "Databricks Serverless SQL warehouse",
@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""Template mining outside the database (Drain3 UDF) vs inside it (replaceRegexpAll + GROUP BY).
+
+    python cluster_bench.py                                # 100,000 generated, labelled lines
+    python cluster_bench.py --batches 1000,10000 --json report.json
+    python cluster_bench.py --corpus corpus.tsv            # see log_corpus.py for the format
+
+The Drain3 rows run drain3_miner.py as a subprocess and feed it batches over
+the executable UDF protocol: one {"values": [...]} line in, one {"result":
+[...]} line out, as ClickHouse would with that batch size as block size. It
+runs cold (a new miner per batch, the UDF's default) and --incremental (one
+miner for the process). The SQL row loads the corpus into a MergeTree table
+in chDB and runs one GROUP BY over a chain of replaceRegexpAll calls that
+mask the same kinds of tokens.
+
+  lines/s     corpus lines / time to get every batch's templates back
+  peak MiB    growth of the process's peak RSS over its idle size while working
+  templates   distinct clusters produced
+  ARI         adjusted Rand index of the line -> cluster assignment against the
+              corpus labels (1.0: same partition, ~0: no better than chance)
+  purity      share of lines whose cluster's most common label is their own
+
+The UDF only returns counts per template, so the line -> template assignment
+is recomputed in-process with the same miner and batch boundaries. A line is
+assigned the template its cluster had when its batch ended, which is what
+summing the UDF's results by template would count it under.
+"""
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+
+import log_corpus
+from drain3_miner import build_miner
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# RE2 has no lookbehind, so word boundaries stand in for the INI's
+# "not next to a letter or digit" guards. The last rule catches any remaining
+# token with a digit in it (ids like C68BF56155, durations like 258ms).
+SQL_RULES = [
+    (r"(?i)\b[0-9a-f]{8}(?:-[0-9a-f]{4}){3}-[0-9a-f]{12}\b", "<:UUID:>"),
+    (r"\d{4}-\d{2}-\d{2}[ T]\d{2}:\d{2}:\d{2}(?:\.\d+)?(?:Z|[+-]\d{2}:\d{2})?", "<:TS:>"),
+    (r"\b(?:[0-9a-f]{2,}:){3,}[0-9a-f]{2,}\b", "<:ID:>"),
+    (r"\b\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}\b", "<:IP:>"),
+    (r"\b(?:[0-9a-f]{6,} ?){3,}\b", "<:SEQ:>"),
+    (r"\b(?:[0-9A-F]{4} ?){4,}\b", "<:SEQ:>"),
+    (r"\b0x[0-9a-fA-F]+\b", "<:HEX:>"),
+    (r'"[^"]*"', "<:STR:>"),
+    (r"[-+]?\b\d+\b", "<:NUM:>"),
+    (r"\b[\w.-]*\d[\w.-]*\b", "<*>"),
+]
+
+
+def _literal(s):
+    return "'" + s.replace("\\", "\\\\").replace("'", "\\'") + "'"
+
+
+def normalize_sql(column):
+    expr = column
+    for pattern, mask in SQL_RULES:
+        expr = f"replaceRegexpAll({expr}, {_literal(pattern)}, {_literal(mask)})"
+    return expr
+
+
+# -- agreement ---------------------------------------------------------------------
+
+
+def adjusted_rand_index(a, b):
+    n = len(a)
+    pairs = lambda counts: sum(math.comb(c, 2) for c in counts)  # noqa: E731
+    both = pairs(Counter(zip(a, b)).values())
+    left, right, total = pairs(Counter(a).values()), pairs(Counter(b).values()), math.comb(n, 2)
+    expected = left * right / total if total else 0.0
+    best = (left + right) / 2
+    return 1.0 if best == expected else (both - expected) / (best - expected)
+
+
+def purity(clusters, labels):
+    by_cluster = {}
+    for c, label in zip(clusters, labels):
+        by_cluster.setdefault(c, Counter())[label] += 1
+    return sum(counts.most_common(1)[0][1] for counts in by_cluster.values()) / len(labels)
+
+
+# -- memory --------------------------------------------------------------------------
+
+
+def _status_kib(pid, field):
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith(field + ":"):
+                return int(line.split()[1])
+    return 0
+
+
+def _reset_peak(pid="self"):
+    # Writing 5 resets VmHWM to the current RSS (Linux 4.0+).
+    try:
+        with open(f"/proc/{pid}/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+# -- Drain3 through the UDF protocol -------------------------------------------------
+
+
+def run_udf(lines, batch, incremental):
+    cmd = [sys.executable, os.path.join(HERE, "drain3_miner.py")] + (["--incremental"] if incremental else [])
+    proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                            stderr=subprocess.DEVNULL, text=True, encoding="utf-8")
+    try:
+        # An empty call first, so start-up (imports, config) is neither timed nor counted as growth.
+        proc.stdin.write(json.dumps({"values": []}) + "\n")
+        proc.stdin.flush()
+        proc.stdout.readline()
+        idle = _status_kib(proc.pid, "VmRSS")
+        _reset_peak(proc.pid)
+        t0 = time.perf_counter()
+        for i in range(0, len(lines), batch):
+            proc.stdin.write(json.dumps({"values": lines[i:i + batch]}, ensure_ascii=False) + "\n")
+            proc.stdin.flush()
+            json.loads(proc.stdout.readline())
+        seconds = time.perf_counter() - t0
+        peak = _status_kib(proc.pid, "VmHWM")
+    finally:
+        proc.stdin.close()
+        proc.wait()
+    return seconds, (peak - idle) / 1024
+
+
+def drain_assignments(lines, batch, incremental):
+    """Each line's template as the UDF reports it: the cluster's template at the end of its batch."""
+    miner = build_miner()
+    out = []
+    for i in range(0, len(lines), batch):
+        if not incremental and i:
+            miner = build_miner()
+        mined = [miner.add_log_message(line) for line in lines[i:i + batch]]
+        final = {r["cluster_id"]: r["template_mined"] for r in mined}
+        for cid in final:
+            cluster = miner.drain.id_to_cluster.get(cid)
+            if cluster is not None:
+                final[cid] = cluster.get_template()
+        out.extend(final[r["cluster_id"]] for r in mined)
+    return out
+
+
+# -- SQL in chDB (in a child process, so its memory is measured on its own) ----------
+
+
+def _sql_child(conn, lines, repeat):
+    import pyarrow as pa
+    from chdb.session import Session
+
+    with tempfile.TemporaryDirectory() as path:
+        db = Session(path)
+        table = pa.table({"id": pa.array(range(len(lines)), pa.uint32()),  # noqa: F841
+                          "message": pa.array(lines, pa.string())})
+        t0 = time.perf_counter()
+        db.query("CREATE TABLE logs (id UInt32, message String) ENGINE = MergeTree ORDER BY id")
+        db.query("INSERT INTO logs SELECT id, message FROM Python(table)")
+        load_s = time.perf_counter() - t0
+        del table
+        idle = _status_kib("self", "VmRSS")
+        _reset_peak()
+        sql = (f"SELECT {normalize_sql('message')} AS template, count() AS count "
+               "FROM logs GROUP BY template ORDER BY count DESC")
+        best = float("inf")
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            db.query(sql, "JSONCompact")
+            best = min(best, time.perf_counter() - t0)
+        peak = _status_kib("self", "VmHWM")
+        assigned = db.query(f"SELECT {normalize_sql('message')} FROM logs ORDER BY id",
+                            "TabSeparatedRaw").bytes().decode("utf-8").split("\n")[:len(lines)]
+        db.close()
+    conn.send({"seconds": best, "load_s": load_s, "peak_mib": (peak - idle) / 1024,
+               "assignments": assigned})
+
+
+def run_sql(lines, repeat):
+    ctx = multiprocessing.get_context("spawn")
+    parent, child = ctx.Pipe()
+    proc = ctx.Process(target=_sql_child, args=(child, lines, repeat))
+    proc.start()
+    result = parent.recv()
+    proc.join()
+    return result
+
+
+# -- report ----------------------------------------------------------------------------
+
+
+def row(method, batch, n, seconds, peak_mib, clusters, labels, extra=None):
+    r = {
+        "method": method,
+        "batch": batch,
+        "lines_per_s": round(n / seconds),
+        "peak_mib": round(peak_mib, 1),
+        "templates": len(set(clusters)),
+        "ari": round(adjusted_rand_index(clusters, labels), 4),
+        "purity": round(purity(clusters, labels), 4),
+    }
+    r.update(extra or {})
+    return r
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    ap.add_argument("--corpus", help="label<TAB>service<TAB>message file (default: generate one)")
+    ap.add_argument("--lines", type=int, default=100_000, help="lines to generate without --corpus")
+    ap.add_argument("--batches", default="1000,10000,100000",
+                    help="UDF batch sizes, i.e. rows per block sent to the function")
+    ap.add_argument("--repeat", type=int, default=3, help="runs of the SQL query; the best is kept")
+    ap.add_argument("--json", help="also write the report to this file")
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    corpus = log_corpus.corpus(args.corpus, args.lines, args.seed)
+    labels = [label for label, _, _ in corpus]
+    lines = [message for _, _, message in corpus]
+    n = len(lines)
+    print(f"{n:,} lines, {len(set(labels))} labelled templates")
+
+    sql = run_sql(lines, args.repeat)
+    results = [row("sql replaceRegexpAll", n, n, sql["seconds"], sql["peak_mib"],
+                   sql["assignments"], labels, {"load_s": round(sql["load_s"], 3)})]
+    for batch in (int(b) for b in args.batches.split(",")):
+        for incremental in (False, True):
+            seconds, peak_mib = run_udf(lines, batch, incremental)
+            clusters = drain_assignments(lines, batch, incremental)
+            method = "drain3 udf " + ("incremental" if incremental else "cold")
+            results.append(row(method, batch, n, seconds, peak_mib, clusters, labels,
+                               {"ari_vs_sql": round(adjusted_rand_index(clusters, sql["assignments"]), 4)}))
+
+    print(f"\n{'method':<24} {'batch':>8} {'lines/s':>10} {'peak MiB':>9} {'templates':>10} "
+          f"{'ARI':>7} {'purity':>7} {'ARI vs sql':>11}")
+    for r in results:
+        vs_sql = f"{r['ari_vs_sql']:>11.3f}" if "ari_vs_sql" in r else f"{'':>11}"
+        print(f"{r['method']:<24} {r['batch']:>8,} {r['lines_per_s']:>10,} {r['peak_mib']:>9.1f} "
+              f"{r['templates']:>10,} {r['ari']:>7.3f} {r['purity']:>7.3f} {vs_sql}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"lines": n, "labels": len(set(labels)), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
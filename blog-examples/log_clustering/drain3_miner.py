@@ -1,13 +1,46 @@
 #!/usr/bin/env python3
+"""Drain3 template mining as a ClickHouse executable UDF (JSONEachRow in, JSONEachRow out).
+
+Each input line is {"values": [...]} and gets back {"result": [...]}, one
+{"template", "count", "coverage"} per template found in that batch.
+
+By default every call mines its batch with a fresh miner. With --incremental
+(implied by --state-dir, --state-db, --partition or --workers > 1) the miners
+live as long as the process: templates learnt on one call are reused on the
+next, and the [SNAPSHOT] settings below decide how often each miner's state
+is written to the store, so a restarted pool picks up where it left off:
+
+    drain3_miner.py --state-dir /var/lib/clickhouse/drain3
+    drain3_miner.py --state-db /var/lib/clickhouse/drain3.sqlite --partition service --workers 4
+
+--partition splits a batch into one miner per key: "service" reads a
+parallel {"services": [...]} array, "prefix" takes the first match of
+--prefix-pattern in the line. Keys are spread over --workers processes by
+hash, each owning its miners; their per-template counts are merged into one
+result, so coverage is still relative to the whole batch.
+
+Masking uses FastLogMasker, which gives the same output as Drain3's masker
+at about twice the rate; --masker drain3 switches back, and masking_bench.py
+checks the two against each other.
+"""
 import sys, json, argparse
+import multiprocessing
+import os
+import re
+import signal
+import sqlite3
+import tempfile
+import time
+import zlib
 from collections import defaultdict
-from io import StringIO
 import contextlib
 from drain3 import TemplateMiner
+from drain3.masking import LogMasker, MaskingInstruction
+from drain3.persistence_handler import PersistenceHandler
 from drain3.template_miner_config import TemplateMinerConfig
 from drain3.file_persistence import FilePersistence
 
-INI = """
+INI = r"""
 [SNAPSHOT]
 snapshot_interval_minutes = 10
 compress_state = True
@@ -22,9 +55,9 @@ masking = [
   {"regex_pattern":"((?<=[^A-Za-z0-9])|^)([\\-\\+]?\\d+)((?=[^A-Za-z0-9])|$)", "mask_with": "NUM"},
   {"regex_pattern":"(?i)([a-f0-9]{8}(?:-[a-f0-9]{4}){3}-[a-f0-9]{12})","mask_with":"UUID"},
   {"regex_pattern":"\\d{4}-\\d{2}-\\d{2}[ T]\\d{2}:\\d{2}:\\d{2}(?:\\.\\d+)?(?:Z|[+\\-]\\d{2}:\\d{2})?","mask_with":"TS"},
-  {"regex_pattern":"\\\".*?\\\"","mask_with":"STR"},
-  {"regex_pattern":"(?<=executed cmd )(\\".+?\\")", "mask_with": "CMD"}
-]
+  {"regex_pattern":"\".*?\"","mask_with":"STR"},
+  {"regex_pattern":"(?<=executed cmd )(\".+?\")", "mask_with": "CMD"}
+  ]
 mask_prefix = <:
 mask_suffix = :>
 
@@ -39,16 +72,84 @@ extra_delimiters = ["_"]
 enabled = False
 report_sec = 30
 """
-def build_miner():
+# -- masking -------------------------------------------------------------------
+
+# Drain3 runs every rule above over every line, in order; most of the cost is
+# the boundary alternations being tried at each position, for rules that
+# cannot match the line at all. A gate is a cheap necessary condition for a
+# rule: a digit anywhere in the original line (masks never add one), literal
+# substrings, or a short probe regex, checked against the text as it stands at
+# that step. Rules not listed here always run.
+MASK_GATES = {
+    r"((?<=[^A-Za-z0-9])|^)(([0-9a-f]{2,}:){3,}([0-9a-f]{2,}))((?=[^A-Za-z0-9])|$)": (False, (":",), None),
+    r"((?<=[^A-Za-z0-9])|^)(\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})((?=[^A-Za-z0-9])|$)": (True, (".",), None),
+    r"((?<=[^A-Za-z0-9])|^)([0-9a-f]{6,} ?){3,}((?=[^A-Za-z0-9])|$)": (False, (), r"[0-9a-f]{6}"),
+    r"((?<=[^A-Za-z0-9])|^)([0-9A-F]{4} ?){4,}((?=[^A-Za-z0-9])|$)": (False, (), r"[0-9A-F]{4}"),
+    r"((?<=[^A-Za-z0-9])|^)(0x[a-f0-9A-F]+)((?=[^A-Za-z0-9])|$)": (True, ("0x",), None),
+    r"((?<=[^A-Za-z0-9])|^)([\-\+]?\d+)((?=[^A-Za-z0-9])|$)": (True, (), None),
+    r"(?i)([a-f0-9]{8}(?:-[a-f0-9]{4}){3}-[a-f0-9]{12})": (False, ("-",), None),
+    r"\d{4}-\d{2}-\d{2}[ T]\d{2}:\d{2}:\d{2}(?:\.\d+)?(?:Z|[+\-]\d{2}:\d{2})?": (True, ("-", ":"), None),
+    r'".*?"': (False, ('"',), None),
+    r'(?<=executed cmd )(".+?")': (False, ("executed cmd ",), None),
+}
+
+DIGIT = re.compile(r"\d")
+
+def simplify_bounds(pattern):
+    """Same matches, cheaper: 'preceded by a non-alphanumeric or at the start' is 'not preceded by one'."""
+    return (pattern.replace("((?<=[^A-Za-z0-9])|^)", "(?<![A-Za-z0-9])")
+                   .replace("((?=[^A-Za-z0-9])|$)", "(?![A-Za-z0-9])"))
+
+class FastLogMasker(LogMasker):
+    """Drop-in LogMasker with identical output: the same rules, in the same order, gated and simplified."""
+
+    def __init__(self, masking_instructions, mask_prefix, mask_suffix):
+        super().__init__(masking_instructions, mask_prefix, mask_suffix)
+        self.steps = []
+        for mi in masking_instructions:
+            if isinstance(mi, MaskingInstruction):
+                needs_digit, literals, probe = MASK_GATES.get(mi.pattern, (False, (), None))
+                regex = re.compile(simplify_bounds(mi.pattern), mi.regex.flags)
+                self.steps.append((needs_digit, literals, probe and re.compile(probe).search,
+                                   regex.sub, mask_prefix + mi.mask_with + mask_suffix))
+            else:
+                # Not a regex rule: no gate, and let it mask as it would in LogMasker.
+                self.steps.append((False, (), None, lambda mask, content, mi=mi: mi.mask(
+                    content, mask_prefix, mask_suffix), None))
+
+    def mask(self, content):
+        has_digit = DIGIT.search(content) is not None
+        for needs_digit, literals, probe, sub, mask in self.steps:
+            if needs_digit and not has_digit:
+                continue
+            for literal in literals:
+                if literal not in content:
+                    break
+            else:
+                if probe is None or probe(content) is not None:
+                    content = sub(mask, content)
+        return content
+
+def load_config():
+    # TemplateMinerConfig.load() only reads from a path (a StringIO is silently
+    # ignored, leaving Drain3's defaults), so the INI goes through a temp file.
     cfg = TemplateMinerConfig()
+    with tempfile.NamedTemporaryFile("w", suffix=".ini") as f:
+      f.write(INI)
+      f.flush()
+      cfg.load(f.name)
+    return cfg
+
+def build_miner(persistence=None, fast_masking=True):
     with contextlib.redirect_stdout(sys.stderr):
-      cfg.load(StringIO(INI))
-      cfg.config_file = None
-      persistence = None
-      return TemplateMiner(persistence, cfg)
+      miner = TemplateMiner(persistence, load_config())
+    if fast_masking:
+      miner.masker = FastLogMasker(miner.config.masking_instructions,
+                                   miner.config.mask_prefix, miner.config.mask_suffix)
+    return miner
 
-def mine_summary(lines):
-    miner = build_miner()
+def mine_summary(lines, fast_masking=True):
+    miner = build_miner(fast_masking=fast_masking)
     counts = defaultdict(int)
     templates = {}
     total = 0
@@ -71,12 +172,246 @@ def mine_summary(lines):
     items.sort(key=lambda x: (-x["count"], x["template"]))
     return items
 
-def main():
+# -- incremental mining --------------------------------------------------------
+
+class SqlitePersistence(PersistenceHandler):
+    """One row per partition key in a local SQLite file, shared by all workers."""
+
+    def __init__(self, path, key):
+        self.path = path
+        self.key = key
+
+    def _connect(self):
+        db = sqlite3.connect(self.path, timeout=60)
+        db.execute("CREATE TABLE IF NOT EXISTS drain3_state (key TEXT PRIMARY KEY, state BLOB)")
+        return db
+
+    def save_state(self, state):
+        with contextlib.closing(self._connect()) as db, db:
+            db.execute("INSERT OR REPLACE INTO drain3_state VALUES (?, ?)", (self.key, state))
+
+    def load_state(self):
+        with contextlib.closing(self._connect()) as db:
+            row = db.execute("SELECT state FROM drain3_state WHERE key = ?", (self.key,)).fetchone()
+        return row[0] if row else None
+
+def state_filename(key):
+    # Readable, but a checksum keeps keys that sanitize to the same name apart.
+    safe = re.sub(r"[^\w.-]", "_", key)[:64] or "default"
+    return f"{safe}-{zlib.crc32(key.encode()):08x}.drain3"
+
+def persistence_for(options, key):
+    if options.state_dir:
+        return FilePersistence(os.path.join(options.state_dir, state_filename(key)))
+    if options.state_db:
+        return SqlitePersistence(options.state_db, key)
+    return None
+
+class PartitionMiners:
+    """Long-lived miners, one per partition key, restored from and snapshotted to the store.
+
+    Drain3 snapshots on every new or changed cluster, i.e. many times per batch
+    while templates are still being learnt. Here a miner is snapshotted at most
+    once per batch: after a batch that changed a cluster, when
+    snapshot_interval_minutes has passed, and on shutdown.
+    """
+
+    def __init__(self, options):
+        self.options = options
+        self.miners = {}
+        self.stores = {}
+        self.last_save = {}
+        self.pending = set()
+        self.changed = set()
+
+    def miner(self, key):
+        miner = self.miners.get(key)
+        if miner is None:
+            store = persistence_for(self.options, key)
+            miner = build_miner(store, self.options.masker == "fast")  # loads the snapshot, if any
+            # Saving is driven from snapshot(); the miner must not save per message.
+            miner.persistence_handler = None
+            self.miners[key], self.stores[key] = miner, store
+            self.last_save[key] = time.time()
+        return miner
+
+    def mine(self, key, lines):
+        """{template: count} for this batch; templates as they stand after the whole batch."""
+        miner = self.miner(key)
+        counts = defaultdict(int)
+        last_template = {}
+        for raw in lines:
+            r = miner.add_log_message(raw)
+            counts[r["cluster_id"]] += 1
+            last_template[r["cluster_id"]] = r["template_mined"]
+            if r["change_type"] != "none":
+                self.changed.add(key)
+        self.pending.add(key)
+        by_template = defaultdict(int)
+        for cid, cnt in counts.items():
+            # A cluster evicted by max_clusters keeps the template it had when last seen.
+            cluster = miner.drain.id_to_cluster.get(cid)
+            by_template[cluster.get_template() if cluster else last_template[cid]] += cnt
+        return by_template
+
+    def snapshot(self, force=False):
+        now = time.time()
+        for key in list(self.pending):
+            store, miner = self.stores[key], self.miners[key]
+            if store is None:
+                continue
+            interval = miner.config.snapshot_interval_minutes * 60
+            if force or key in self.changed or now - self.last_save[key] >= interval:
+                miner.persistence_handler = store
+                try:
+                    miner.save_state("batch" if key in self.changed else "periodic")
+                finally:
+                    miner.persistence_handler = None
+                self.last_save[key] = now
+                self.pending.discard(key)
+        self.changed.clear()
+
+    def mine_partitions(self, partitions):
+        merged = defaultdict(int)
+        for key, lines in partitions:
+            for template, cnt in self.mine(key, lines).items():
+                merged[template] += cnt
+        self.snapshot()
+        return merged
+
+def summarize(template_counts, total):
+    items = [{"template": t, "count": int(cnt), "coverage": round(cnt / total * 100.0 if total else 0.0, 2)}
+             for t, cnt in template_counts.items()]
+    items.sort(key=lambda x: (-x["count"], x["template"]))
+    return items
+
+def partition(obj, options):
+    """Group the batch's lines by partition key, keeping their order within each key."""
+    values = obj.get("values") or []
+    if options.partition == "service":
+        services = obj.get("services") or []
+        keys = [str(services[i]) if i < len(services) and services[i] is not None else ""
+                for i in range(len(values))]
+    elif options.partition == "prefix":
+        pattern = re.compile(options.prefix_pattern)
+        keys = [(m.group(0) if (m := pattern.search(v)) else "") if isinstance(v, str) else ""
+                for v in values]
+    else:
+        keys = [""] * len(values)
+    groups = defaultdict(list)
+    for key, v in zip(keys, values):
+        if isinstance(v, str) and v:
+            groups[key].append(v)
+    return groups
+
+def _on_sigterm(signum, frame):
+    raise SystemExit(0)
+
+def worker_loop(conn, options):
+    """A pool worker: owns the miners of the keys hashed to it until the pipe closes."""
+    signal.signal(signal.SIGTERM, _on_sigterm)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    miners = PartitionMiners(options)
+    try:
+        while True:
+            try:
+                partitions = conn.recv()
+            except EOFError:
+                break
+            if partitions is None:
+                break
+            conn.send(dict(miners.mine_partitions(partitions)))
+    finally:
+        miners.snapshot(force=True)
+
+class WorkerPool:
+    """--workers processes; a partition key always goes to the same one, so its miner stays warm."""
+
+    def __init__(self, options):
+        ctx = multiprocessing.get_context("spawn")
+        self.conns, self.procs = [], []
+        for _ in range(options.workers):
+            parent, child = ctx.Pipe()
+            proc = ctx.Process(target=worker_loop, args=(child, options), daemon=True)
+            proc.start()
+            child.close()
+            self.conns.append(parent)
+            self.procs.append(proc)
+
+    def mine_partitions(self, partitions):
+        shards = defaultdict(list)
+        for key, lines in partitions:
+            shards[zlib.crc32(key.encode()) % len(self.conns)].append((key, lines))
+        for i, shard in shards.items():
+            self.conns[i].send(shard)
+        merged = defaultdict(int)
+        for i in shards:
+            for template, cnt in self.conns[i].recv().items():
+                merged[template] += cnt
+        return merged
+
+    def snapshot(self, force=False):
+        pass  # each worker snapshots after its own batches and on exit
+
+    def close(self):
+        for conn in self.conns:
+            try:
+                conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+        for proc in self.procs:
+            proc.join(timeout=60)
+
+def serve_incremental(options):
+    if options.state_dir:
+        os.makedirs(options.state_dir, exist_ok=True)
+    signal.signal(signal.SIGTERM, _on_sigterm)
+    miners = WorkerPool(options) if options.workers > 1 else PartitionMiners(options)
+    try:
+        for line in sys.stdin:
+            groups = partition(json.loads(line), options)
+            total = sum(len(lines) for lines in groups.values())
+            result = summarize(miners.mine_partitions(groups.items()), total)
+            sys.stdout.write(json.dumps({"result": result}, ensure_ascii=False) + "\n")
+            sys.stdout.flush()
+    finally:
+        if isinstance(miners, WorkerPool):
+            miners.close()
+        else:
+            miners.snapshot(force=True)
+
+def parse_args(argv=None):
+    ap = argparse.ArgumentParser(description="Drain3 template mining as a ClickHouse executable UDF.")
+    ap.add_argument("--incremental", action="store_true",
+                    help="keep miners between calls instead of starting cold on every batch")
+    store = ap.add_mutually_exclusive_group()
+    store.add_argument("--state-dir", help="snapshot each partition's miner to a file in this directory")
+    store.add_argument("--state-db", help="snapshot the miners into this SQLite file")
+    ap.add_argument("--partition", choices=["none", "service", "prefix"], default="none",
+                    help="one miner per service (from a parallel 'services' array) or per line prefix")
+    ap.add_argument("--prefix-pattern", default=r"^[A-Za-z][\w.-]*",
+                    help="regex whose first match is the partition key with --partition prefix")
+    ap.add_argument("--workers", type=int, default=1,
+                    help="processes to spread partitions over (default 1: mine in this process)")
+    ap.add_argument("--masker", choices=["fast", "drain3"], default="fast",
+                    help="gated masking pass (default) or Drain3's own; the output is the same")
+    options = ap.parse_args(argv)
+    if options.workers < 1:
+        ap.error("--workers must be at least 1")
+    options.incremental = (options.incremental or bool(options.state_dir or options.state_db)
+                           or options.partition != "none" or options.workers > 1)
+    return options
+
+def main(argv=None):
+    options = parse_args(argv)
+    if options.incremental:
+        serve_incremental(options)
+        return
     for line in sys.stdin:
         obj = json.loads(line)
         values = obj.get("values") or []
         strings = [s for s in values if isinstance(s, str)]
-        result = mine_summary(strings)
+        result = mine_summary(strings, options.masker == "fast")
         sys.stdout.write(json.dumps({"result": result}, ensure_ascii=False) + "\n")
         sys.stdout.flush()
 
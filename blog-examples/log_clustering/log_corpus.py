@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""A labelled log corpus for the clustering examples: every line knows which template produced it.
+
+    python log_corpus.py --lines 100000 > corpus.tsv      # label<TAB>service<TAB>message
+
+The templates cover every masking rule in drain3_miner.py (MAC-style IDs,
+IPs, hex sequences, 0x values, numbers, UUIDs, timestamps, quoted strings,
+executed commands) plus lines with no digits at all, across a few services.
+"""
+import argparse
+import random
+import sys
+import uuid
+
+
+def _hex(rng, n, upper=False):
+    s = "".join(rng.choice("0123456789abcdef") for _ in range(n))
+    return s.upper() if upper else s
+
+
+def _ip(rng):
+    return ".".join(str(rng.randint(1, 254)) for _ in range(4))
+
+
+def _ts(rng):
+    return (f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T{rng.randint(0, 23):02d}:"
+            f"{rng.randint(0, 59):02d}:{rng.randint(0, 59):02d}.{rng.randint(0, 999):03d}Z")
+
+
+def _uuid(rng):
+    return str(uuid.UUID(int=rng.getrandbits(128)))
+
+
+WORDS = ["alpha", "bravo", "charlie", "delta", "echo", "foxtrot", "golf", "hotel"]
+PATHS = ["/api/products", "/api/cart", "/api/checkout", "/static/app.js", "/health"]
+AGENTS = ["curl/8.5.0", "Mozilla/5.0 (X11; Linux x86_64)", "python-requests/2.32"]
+
+# (label, service, weight, line generator)
+TEMPLATES = [
+    ("nginx_access", "nginx", 20, lambda r: (
+        f'{_ip(r)} - - [12/Jan/2025:{r.randint(0, 23):02d}:{r.randint(0, 59):02d}:00 +0000] '
+        f'"GET {r.choice(PATHS)}/{r.randint(1, 999)} HTTP/1.1" {r.choice([200, 304, 404])} '
+        f'{r.randint(100, 99999)} "-" "{r.choice(AGENTS)}"')),
+    ("cart_get", "cart", 10, lambda r: f"GetCartAsync called with userId={_uuid(r)}"),
+    ("cart_add", "cart", 10, lambda r: (
+        f"AddItemAsync called with userId={_uuid(r)}, productId={_hex(r, 10, True)}, "
+        f"quantity={r.randint(1, 9)}")),
+    ("cart_store", "cart", 4, lambda r: "info: cart.cartstore.ValkeyCartStore[0]"),
+    ("recommendation", "recommendation", 10, lambda r: (
+        "Receive ListRecommendations for product ids:["
+        + " ".join(_hex(r, 10, True) for _ in range(5)) + "]")),
+    ("db_slow_query", "postgres", 6, lambda r: (
+        f"{_ts(r)} duration: {r.randint(100, 9999)}.{r.randint(0, 999)} ms statement: "
+        f"SELECT * FROM orders WHERE id = {r.randint(1, 10 ** 6)}")),
+    ("db_connection", "postgres", 4, lambda r: (
+        f"connection received: host={_ip(r)} port={r.randint(1024, 65535)}")),
+    ("auth_login", "auth", 6, lambda r: (
+        f'user "{r.choice(WORDS)}_{r.randint(1, 500)}" logged in from {_ip(r)} session {_hex(r, 32)}')),
+    ("auth_denied", "auth", 3, lambda r: f'permission denied for user "{r.choice(WORDS)}" on resource "billing"'),
+    ("kernel_link", "kernel", 3, lambda r: (
+        "eth0: link up, peer " + ":".join(_hex(r, 2) for _ in range(6)) + f" speed {r.choice([100, 1000])}")),
+    ("kernel_fault", "kernel", 2, lambda r: (
+        f"segfault at 0x{_hex(r, 12)} ip 0x{_hex(r, 12)} sp 0x{_hex(r, 12)} error {r.randint(4, 7)}")),
+    ("trace_spans", "tracing", 4, lambda r: (
+        "exported spans " + " ".join(_hex(r, 16) for _ in range(3)) + f" in {r.randint(1, 500)}ms")),
+    ("firmware_blob", "kernel", 2, lambda r: (
+        "firmware checksum " + " ".join(_hex(r, 4, True) for _ in range(6)))),
+    ("scheduler_cmd", "scheduler", 4, lambda r: (
+        f'job {r.choice(WORDS)} executed cmd "/usr/bin/backup --target {r.choice(WORDS)}" '
+        f"exit={r.randint(0, 2)}")),
+    ("scheduler_idle", "scheduler", 6, lambda r: (
+        f"worker {r.choice(WORDS)} is idle, waiting for jobs on queue {r.choice(WORDS)}")),
+    ("health_ok", "frontend", 6, lambda r: "health check passed: all upstreams healthy"),
+]
+
+
+def generate(lines, seed=0):
+    """``lines`` (label, service, message) tuples, templates drawn by weight."""
+    rng = random.Random(seed)
+    weights = [t[2] for t in TEMPLATES]
+    picks = rng.choices(TEMPLATES, weights=weights, k=lines)
+    return [(label, service, make(rng)) for label, service, _, make in picks]
+
+
+def load(path):
+    """Read a corpus written by this script; a file of bare messages gets empty labels."""
+    out = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.rstrip("\n")
+            if not line:
+                continue
+            parts = line.split("\t", 2)
+            out.append(tuple(parts) if len(parts) == 3 else ("", "", line))
+    return out
+
+
+def corpus(path=None, lines=100_000, seed=0):
+    return load(path) if path else generate(lines, seed)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    ap.add_argument("--lines", type=int, default=100_000)
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+    out = sys.stdout
+    for label, service, message in generate(args.lines, args.seed):
+        out.write(f"{label}\t{service}\t{message}\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""Check that FastLogMasker masks exactly like Drain3's LogMasker, and measure both.
+
+    python masking_bench.py                          # 100,000 generated lines
+    python masking_bench.py --corpus corpus.tsv      # or your own (see log_corpus.py)
+
+Every line is masked by both maskers and compared; any difference is printed
+and the script exits with status 1. Then each masker, and a full
+TemplateMiner using it, is timed over the corpus (best of --repeat) and
+reported in lines/sec.
+"""
+import argparse
+import sys
+import time
+
+from drain3.masking import LogMasker
+
+import log_corpus
+from drain3_miner import FastLogMasker, build_miner, load_config
+
+
+def best_rate(fn, lines, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(lines)
+        best = min(best, time.perf_counter() - t0)
+    return len(lines) / best
+
+
+def mask_all(masker):
+    def run(lines):
+        for line in lines:
+            masker.mask(line)
+    return run
+
+
+def mine_all(fast):
+    def run(lines):
+        miner = build_miner(fast_masking=fast)
+        for line in lines:
+            miner.add_log_message(line)
+    return run
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    ap.add_argument("--corpus", help="label<TAB>service<TAB>message file, or one message per line")
+    ap.add_argument("--lines", type=int, default=100_000, help="lines to generate without --corpus")
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    lines = [message for _, _, message in log_corpus.corpus(args.corpus, args.lines, args.seed)]
+    cfg = load_config()
+    drain3 = LogMasker(cfg.masking_instructions, cfg.mask_prefix, cfg.mask_suffix)
+    fast = FastLogMasker(cfg.masking_instructions, cfg.mask_prefix, cfg.mask_suffix)
+
+    mismatches = [(line, drain3.mask(line), fast.mask(line)) for line in lines
+                  if drain3.mask(line) != fast.mask(line)]
+    for line, want, got in mismatches[:5]:
+        print(f"line:   {line}\ndrain3: {want}\nfast:   {got}\n")
+    print(f"{len(lines):,} lines, {len(mismatches):,} masked differently")
+    if mismatches:
+        sys.exit(1)
+
+    print(f"\n{'':<16} {'drain3 lines/s':>15} {'fast lines/s':>15} {'speedup':>8}")
+    for name, before, after in [("mask", mask_all(drain3), mask_all(fast)),
+                                ("mask + mine", mine_all(False), mine_all(True))]:
+        b = best_rate(before, lines, args.repeat)
+        a = best_rate(after, lines, args.repeat)
+        print(f"{name:<16} {b:>15,.0f} {a:>15,.0f} {a / b:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
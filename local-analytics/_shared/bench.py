@@ -0,0 +1,284 @@
+"""Shared benchmark harness for the local-analytics chDB examples.
+
+Replaces the per-folder ``best_of_3`` helper. Each timed function gets a
+configurable number of warm-up and measured runs; every measured run records
+wall time, CPU time and peak RSS, and the summary reports median, p95,
+standard deviation and a 95% confidence interval for the mean.
+
+Usage from a ``run.py``::
+
+    import pathlib, sys
+    sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent / "_shared"))
+    from bench import Bench
+
+    bench = Bench("chdb-parquet")
+    pd_r = bench.run("pandas", pandas_agg)
+    ds_r = bench.run("chdb.datastore", datastore_agg)
+    print(f"speedup: {pd_r.median / ds_r.median:.1f}x")
+    bench.report()
+
+Run counts and the JSON sink come from the constructor or the environment:
+
+    BENCH_WARMUP=1 BENCH_RUNS=10 BENCH_JSON=bench.json python3 run.py
+
+When ``BENCH_JSON`` is set, ``report()`` appends one JSON object per line, so
+the file can be collected across folders and fed into regression tracking.
+"""
+import json
+import math
+import os
+import platform
+import resource
+import statistics
+import sys
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+
+# Two-sided 95% Student-t critical values by degrees of freedom; beyond 30
+# the normal approximation (1.96) is within a couple of percent.
+_T95 = {
+    1: 12.706, 2: 4.303, 3: 3.182, 4: 2.776, 5: 2.571, 6: 2.447, 7: 2.365,
+    8: 2.306, 9: 2.262, 10: 2.228, 11: 2.201, 12: 2.179, 13: 2.160,
+    14: 2.145, 15: 2.131, 16: 2.120, 17: 2.110, 18: 2.101, 19: 2.093,
+    20: 2.086, 25: 2.060, 30: 2.042,
+}
+
+
+def _t95(dof):
+    if dof in _T95:
+        return _T95[dof]
+    if dof > 30:
+        return 1.96
+    return _T95[max(k for k in _T95 if k <= dof)]
+
+
+def _percentile(values, pct):
+    """Linear-interpolated percentile (same definition as numpy's default)."""
+    s = sorted(values)
+    if len(s) == 1:
+        return s[0]
+    pos = (len(s) - 1) * pct / 100.0
+    lo = math.floor(pos)
+    hi = math.ceil(pos)
+    return s[lo] + (s[hi] - s[lo]) * (pos - lo)
+
+
+def _rss_reader():
+    """Return a zero-arg callable giving the current RSS in bytes, or None."""
+    try:
+        import psutil
+        proc = psutil.Process()
+        return lambda: proc.memory_info().rss
+    except ImportError:
+        pass
+    if os.path.exists("/proc/self/statm"):
+        page = os.sysconf("SC_PAGE_SIZE")
+
+        def read():
+            with open("/proc/self/statm") as f:
+                return int(f.read().split()[1]) * page
+        return read
+    return None
+
+
+def _maxrss_bytes():
+    """Process-lifetime RSS high-water mark (KB on Linux, bytes on macOS)."""
+    r = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return r if sys.platform == "darwin" else r * 1024
+
+
+class _PeakRSS:
+    """Sample RSS on a background thread while a run is in progress.
+
+    ru_maxrss cannot be reset between runs, so when a live RSS source is
+    available we poll it instead and report the true per-run peak.
+    """
+
+    def __init__(self, interval=0.005, record=False):
+        self.interval = interval
+        self.read = _rss_reader()
+        self.start = 0
+        self.peak = 0
+        self.samples = [] if record else None
+        self._t0 = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __enter__(self):
+        if self.read is None:
+            self.start = _maxrss_bytes()
+            return self
+        self.start = self.peak = self.read()
+        self._t0 = time.perf_counter()
+        if self.samples is not None:
+            self.samples.append((0.0, self.start))
+        self._thread = threading.Thread(target=self._poll, daemon=True)
+        self._thread.start()
+        return self
+
+    def _poll(self):
+        while not self._stop.wait(self.interval):
+            rss = self.read()
+            self.peak = max(self.peak, rss)
+            if self.samples is not None:
+                self.samples.append((time.perf_counter() - self._t0, rss))
+
+    def __exit__(self, *exc):
+        if self._thread is None:
+            self.peak = _maxrss_bytes()
+            return False
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, self.read())
+        return False
+
+
+def rss_timeline(fn, *args, interval=0.05, **kwargs):
+    """Run ``fn`` once and return its RSS over time as ``[(seconds, bytes), ...]``.
+
+    Empty when the platform has no live RSS source (see ``_rss_reader``).
+    """
+    with _PeakRSS(interval=interval, record=True) as rss:
+        fn(*args, **kwargs)
+    return rss.samples or []
+
+
+@dataclass
+class Run:
+    wall_s: float
+    cpu_s: float
+    peak_rss_bytes: int
+    rss_growth_bytes: int
+
+
+@dataclass
+class Result:
+    name: str
+    warmup: int
+    runs: list = field(default_factory=list)
+
+    @property
+    def walls(self):
+        return [r.wall_s for r in self.runs]
+
+    @property
+    def median(self):
+        return statistics.median(self.walls)
+
+    @property
+    def mean(self):
+        return statistics.fmean(self.walls)
+
+    @property
+    def min(self):
+        return min(self.walls)
+
+    @property
+    def p95(self):
+        return _percentile(self.walls, 95)
+
+    @property
+    def stddev(self):
+        return statistics.stdev(self.walls) if len(self.runs) > 1 else 0.0
+
+    @property
+    def ci95(self):
+        """95% confidence interval for the mean wall time, as (low, high)."""
+        n = len(self.runs)
+        if n < 2:
+            return (self.mean, self.mean)
+        half = _t95(n - 1) * self.stddev / math.sqrt(n)
+        return (self.mean - half, self.mean + half)
+
+    @property
+    def cpu_median(self):
+        return statistics.median(r.cpu_s for r in self.runs)
+
+    @property
+    def peak_rss_bytes(self):
+        return max(r.peak_rss_bytes for r in self.runs)
+
+    @property
+    def rss_growth_bytes(self):
+        """Largest RSS increase above the level at the start of a run."""
+        return max(r.rss_growth_bytes for r in self.runs)
+
+    def summary(self):
+        lo, hi = self.ci95
+        return {
+            "name": self.name,
+            "warmup": self.warmup,
+            "runs": len(self.runs),
+            "median_s": self.median,
+            "mean_s": self.mean,
+            "min_s": self.min,
+            "p95_s": self.p95,
+            "stddev_s": self.stddev,
+            "ci95_s": [lo, hi],
+            "cpu_median_s": self.cpu_median,
+            "peak_rss_bytes": self.peak_rss_bytes,
+            "rss_growth_bytes": self.rss_growth_bytes,
+            "samples": [asdict(r) for r in self.runs],
+        }
+
+
+class Bench:
+    """Collects timed results for one example and reports them together."""
+
+    def __init__(self, suite, warmup=None, runs=None, json_path=None):
+        self.suite = suite
+        self.warmup = int(warmup if warmup is not None else os.environ.get("BENCH_WARMUP", 1))
+        self.runs = int(runs if runs is not None else os.environ.get("BENCH_RUNS", 5))
+        self.json_path = json_path or os.environ.get("BENCH_JSON")
+        if self.runs < 1:
+            raise ValueError("runs must be >= 1")
+        self.results = []
+
+    def run(self, name, fn, *args, **kwargs):
+        """Warm up ``fn`` then time it ``self.runs`` times; return a Result."""
+        for _ in range(self.warmup):
+            fn(*args, **kwargs)
+        result = Result(name=name, warmup=self.warmup)
+        for _ in range(self.runs):
+            with _PeakRSS() as rss:
+                c0 = time.process_time()
+                t0 = time.perf_counter()
+                fn(*args, **kwargs)
+                wall = time.perf_counter() - t0
+                cpu = time.process_time() - c0
+            result.runs.append(Run(wall_s=wall, cpu_s=cpu, peak_rss_bytes=rss.peak,
+                                   rss_growth_bytes=rss.peak - rss.start))
+        self.results.append(result)
+        return result
+
+    def report(self, file=None):
+        """Print a per-result stats table and append JSON if configured."""
+        file = file or sys.stdout
+        print(f"# {self.suite}: {self.warmup} warm-up + {self.runs} measured runs", file=file)
+        width = max(len(r.name) for r in self.results) if self.results else 0
+        for r in self.results:
+            lo, hi = r.ci95
+            print(f"#   {r.name:<{width}}  median {r.median:.3f}s  p95 {r.p95:.3f}s  "
+                  f"sd {r.stddev:.3f}s  ci95 [{lo:.3f}, {hi:.3f}]s  "
+                  f"cpu {r.cpu_median:.3f}s  rss {r.peak_rss_bytes / 2**20:.0f} MiB",
+                  file=file)
+        if self.json_path:
+            self.write_json(self.json_path)
+
+    def to_dict(self):
+        return {
+            "suite": self.suite,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "host": {
+                "platform": platform.platform(),
+                "machine": platform.machine(),
+                "python": platform.python_version(),
+                "cpus": os.cpu_count(),
+            },
+            "results": [r.summary() for r in self.results],
+        }
+
+    def write_json(self, path):
+        with open(path, "a") as f:
+            f.write(json.dumps(self.to_dict()) + "\n")
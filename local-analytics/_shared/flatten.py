@@ -0,0 +1,66 @@
+"""Flatten nested JSON inside ClickHouse instead of with pandas ``.apply``.
+
+The pandas idiom for nested records is to materialize, then pull each field
+out of a Python dict row by row::
+
+    flat_pdf["country"] = flat_pdf["customer"].apply(lambda c: c["country"])
+
+That runs single-threaded in the interpreter, once per field. ``flatten``
+builds one SQL query that explodes the array column with ``ARRAY JOIN``,
+extracts struct subfields with ``tupleElement`` and computes derived columns,
+so only flat, typed columns cross into Python::
+
+    from flatten import flatten
+
+    flat = flatten(
+        "data/orders.json",
+        explode="items",
+        keep=["order_id"],
+        fields={"country": "customer.country", "sku": "items.sku",
+                "qty": "items.qty", "price": "items.price"},
+        derived={"line_total": "round(qty * price, 2)"},
+    )
+    flat.groupby("country")["line_total"].sum()
+
+Field paths are dotted (``customer.address.city``); after the explode, the
+exploded column name refers to one array element. ``derived`` expressions are
+ClickHouse SQL and may refer to the ``fields`` aliases.
+"""
+from chdb.datastore import DataStore
+
+
+def _ident(name):
+    return "`" + name.replace("`", "``") + "`"
+
+
+def _path_expr(path):
+    head, *rest = path.split(".")
+    expr = _ident(head)
+    for part in rest:
+        expr = f"tupleElement({expr}, '{part}')"
+    return expr
+
+
+def flatten_sql(path, explode=None, fields=None, keep=(), derived=None,
+                format="JSONEachRow", keep_empty=False):
+    """Return the flattening query as a SQL string (see module docstring).
+
+    ``keep_empty=True`` uses ``LEFT ARRAY JOIN`` so rows whose array is empty
+    survive with default values, like ``explode`` followed by no ``dropna``.
+    """
+    select = [_ident(c) for c in keep]
+    select += [f"{_path_expr(p)} AS {_ident(alias)}" for alias, p in (fields or {}).items()]
+    select += [f"{expr} AS {_ident(alias)}" for alias, expr in (derived or {}).items()]
+    if not select:
+        raise ValueError("nothing to select: pass keep, fields or derived")
+    escaped = str(path).replace("'", "\\'")
+    sql = f"SELECT {', '.join(select)} FROM file('{escaped}', '{format}')"
+    if explode:
+        join = "LEFT ARRAY JOIN" if keep_empty else "ARRAY JOIN"
+        sql += f" {join} {_ident(explode)}"
+    return sql
+
+
+def flatten(path, **kwargs):
+    """Run :func:`flatten_sql` in chDB and return the flat result as a DataStore."""
+    return DataStore.run_sql(flatten_sql(path, **kwargs))
@@ -0,0 +1,149 @@
+"""On-disk cache for HTTP sources read with chDB, revalidated with conditional GET.
+
+``DataStore.from_url`` downloads and re-parses the response on every call, so
+a dashboard that polls the same endpoint pays the full transfer and JSON parse
+on each refresh. ``HTTPCache`` keeps the *parsed* result instead: the first
+read downloads the body, converts it once to a columnar file (Native by
+default, or Arrow) and remembers the response's ``ETag`` / ``Last-Modified``.
+Later reads send ``If-None-Match`` / ``If-Modified-Since``; when the server
+answers ``304 Not Modified`` the cached columns are read straight from disk,
+so an unchanged endpoint costs one empty round-trip::
+
+    from httpcache import HTTPCache
+
+    cache = HTTPCache("cache")
+    d = cache.read(f"{BASE}/orders_large.json", format="JSONEachRow")
+    d[d["status"] == "open"].groupby("country")["amount"].sum()
+    cache.last_status   # "miss", "revalidated" or "fresh"
+
+Entries are keyed by URL, query parameters, request headers, input format and
+structure. ``max_age`` (seconds) skips revalidation entirely for that long
+after a fetch. Responses without validators are always downloaded again.
+"""
+import hashlib
+import json
+import os
+import pathlib
+import shutil
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from urllib.parse import urlencode
+
+import chdb
+from chdb.datastore import DataStore
+
+# Cache format -> (file extension, chDB output format, chDB input format).
+_STORE_FORMATS = {
+    "Native": ("native", "Native", "Native"),
+    "Arrow": ("arrow", "ArrowStream", "ArrowStream"),
+}
+
+
+def _quote(s):
+    return str(s).replace("\\", "\\\\").replace("'", "\\'")
+
+
+class HTTPCache:
+    def __init__(self, directory, store_format="Native", max_age=0, timeout=30):
+        if store_format not in _STORE_FORMATS:
+            raise ValueError(f"store_format must be one of {', '.join(_STORE_FORMATS)}")
+        self.directory = pathlib.Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.store_format = store_format
+        self.max_age = max_age
+        self.timeout = timeout
+        self.last_status = None
+        self.stats = {"miss": 0, "revalidated": 0, "fresh": 0}
+
+    # -- keys and entries ---------------------------------------------------
+
+    def _key(self, url, format, structure, headers):
+        ident = json.dumps([url, format, structure, sorted(headers.items()), self.store_format])
+        return hashlib.sha256(ident.encode()).hexdigest()[:32]
+
+    def _paths(self, key):
+        ext = _STORE_FORMATS[self.store_format][0]
+        return self.directory / f"{key}.{ext}", self.directory / f"{key}.json"
+
+    @staticmethod
+    def _full_url(url, params):
+        if not params:
+            return url
+        sep = "&" if "?" in url else "?"
+        return url + sep + urlencode(sorted(params.items()))
+
+    # -- fetching -----------------------------------------------------------
+
+    def fetch(self, url, params=None, format="JSONEachRow", structure=None, headers=None):
+        """Make sure the cache holds the current response; return its data file path."""
+        url = self._full_url(url, params)
+        headers = dict(headers or {})
+        data, meta_path = self._paths(self._key(url, format, structure, headers))
+        meta = json.loads(meta_path.read_text()) if meta_path.exists() and data.exists() else None
+
+        if meta and self.max_age and time.time() - meta["fetched_at"] < self.max_age:
+            return self._done("fresh", data)
+
+        request_headers = dict(headers)
+        if meta and meta.get("etag"):
+            request_headers["If-None-Match"] = meta["etag"]
+        if meta and meta.get("last_modified"):
+            request_headers["If-Modified-Since"] = meta["last_modified"]
+        req = urllib.request.Request(url, headers=request_headers)
+        try:
+            resp = urllib.request.urlopen(req, timeout=self.timeout)
+        except urllib.error.HTTPError as e:
+            if e.code == 304 and meta:
+                e.close()
+                meta["fetched_at"] = time.time()
+                meta_path.write_text(json.dumps(meta))
+                return self._done("revalidated", data)
+            raise
+
+        with resp:
+            fd, raw = tempfile.mkstemp(prefix="body-", dir=self.directory)
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    shutil.copyfileobj(resp, f, 1 << 20)
+                self._convert(raw, format, structure, data)
+            finally:
+                os.unlink(raw)
+            meta = {
+                "url": url,
+                "format": format,
+                "etag": resp.headers.get("ETag"),
+                "last_modified": resp.headers.get("Last-Modified"),
+                "fetched_at": time.time(),
+            }
+        meta_path.write_text(json.dumps(meta))
+        return self._done("miss", data)
+
+    def _convert(self, raw, format, structure, data):
+        # Parse once in chDB and keep the typed columns; write next to the final
+        # path and rename so a concurrent reader never sees a half-written file.
+        out_format = _STORE_FORMATS[self.store_format][1]
+        tmp = data.with_name(data.name + ".tmp")
+        struct = f", '{_quote(structure)}'" if structure else ""
+        chdb.query(f"SELECT * FROM file('{_quote(raw)}', '{format}'{struct}) "
+                   f"INTO OUTFILE '{_quote(tmp)}' TRUNCATE FORMAT {out_format}")
+        os.replace(tmp, data)
+
+    def _done(self, status, data):
+        self.last_status = status
+        self.stats[status] += 1
+        return data
+
+    # -- results ------------------------------------------------------------
+
+    def read(self, url, **kwargs):
+        """A DataStore over the cached columns of ``url`` (see :meth:`fetch`)."""
+        path = self.fetch(url, **kwargs)
+        return DataStore.from_file(str(path), format=_STORE_FORMATS[self.store_format][2])
+
+    def clear(self):
+        """Drop every cached entry."""
+        for p in self.directory.iterdir():
+            if p.is_file():
+                p.unlink()
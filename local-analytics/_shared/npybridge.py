@@ -0,0 +1,95 @@
+"""Query .npy arrays with chDB without going through pandas, and get NumPy back.
+
+Reading each array with ``DataStore.from_file(..., format="Npy")`` and
+joining them by position means decoding every file, materializing each one
+as a ``pandas.DataFrame`` and aligning them on a ``RangeIndex``: several
+copies of the data before anything is aggregated, plus a fixed per-call
+overhead that dominates on small arrays.
+
+``NpyTable`` memory-maps each file (``numpy.load(mmap_mode="r")``), wraps the
+mapped buffers as Arrow arrays (no copy: Arrow points at the same pages),
+and hands chDB one table whose columns are the arrays zipped by row::
+
+    from npybridge import NpyTable
+
+    t = NpyTable(reading="data/readings.npy", ok="data/flags.npy")
+    out = t.query("SELECT reading * 2 AS doubled FROM {table} WHERE ok = 1")
+    out["doubled"]        # numpy.ndarray
+
+``{table}`` in the SQL stands for the zipped arrays. Values may be paths or
+arrays already in memory; all must have the same length, because row ``i``
+of every column comes from element ``i`` of every array. A 2-D array
+becomes an ``Array(T)`` column, one row per outer element.
+
+Results come back through Arrow. A column that arrives as a single chunk is
+returned as a NumPy view of the Arrow buffer; a column split across blocks
+is concatenated once. The engine still reads the mapped pages into its own
+blocks as it scans, so only the pages a query touches are read from disk.
+"""
+import chdb
+import numpy as np
+import pyarrow as pa
+
+
+def open_npy(path):
+    """Memory-map a .npy file read-only; nothing is read until it is touched."""
+    return np.load(path, mmap_mode="r")
+
+
+def _to_arrow(arr):
+    # pa.array over a contiguous numeric ndarray wraps its buffer instead of copying.
+    arr = np.asarray(arr)
+    if arr.ndim == 1:
+        return pa.array(arr)
+    if arr.ndim == 2:
+        flat = pa.array(np.ascontiguousarray(arr).reshape(-1))
+        item = pa.field("item", flat.type, nullable=False)
+        return pa.FixedSizeListArray.from_arrays(flat, type=pa.list_(item, arr.shape[1]))
+    raise ValueError(f"only 1-D and 2-D arrays are supported, got shape {arr.shape}")
+
+
+def to_numpy(table):
+    """Columns of a ``pyarrow.Table`` as a dict of NumPy arrays, sharing buffers where possible."""
+    out = {}
+    for name, col in zip(table.column_names, table.columns):
+        chunks = [c.to_numpy(zero_copy_only=False) for c in col.chunks]
+        if len(chunks) == 1:
+            out[name] = chunks[0]
+        elif chunks:
+            out[name] = np.concatenate(chunks)
+        else:
+            out[name] = col.to_numpy()
+    return out
+
+
+class NpyTable:
+    """Several equal-length arrays (or .npy files), zipped by row and queryable in chDB."""
+
+    def __init__(self, conn=None, **columns):
+        if not columns:
+            raise ValueError("pass at least one column, e.g. NpyTable(v='data/v.npy')")
+        self.conn = conn
+        self.arrays = {name: open_npy(a) if isinstance(a, (str, bytes)) or hasattr(a, "__fspath__")
+                       else np.asarray(a)
+                       for name, a in columns.items()}
+        lengths = {name: len(a) for name, a in self.arrays.items()}
+        if len(set(lengths.values())) > 1:
+            raise ValueError(f"arrays must have the same length to be zipped by row: {lengths}")
+        arrow = {name: _to_arrow(a) for name, a in self.arrays.items()}
+        # Non-nullable fields, so numeric columns are plain (not Nullable) in the engine.
+        schema = pa.schema([pa.field(n, a.type, nullable=False) for n, a in arrow.items()])
+        self.arrow = pa.Table.from_arrays(list(arrow.values()), schema=schema)
+
+    def __len__(self):
+        return self.arrow.num_rows
+
+    def arrow_query(self, sql):
+        """Run ``sql`` (with ``{table}``) and return the result as a ``pyarrow.Table``."""
+        # chDB resolves Python(name) against the caller's local variables.
+        table = self.arrow  # noqa: F841
+        run = self.conn.query if self.conn is not None else chdb.query
+        return run(sql.format(table="Python(table)"), "ArrowTable")
+
+    def query(self, sql):
+        """Run ``sql`` (with ``{table}``) and return ``{column: numpy.ndarray}``."""
+        return to_numpy(self.arrow_query(sql))
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""Write Parquet tuned for reads: search writer settings on a sample, then convert.
+
+A plain ``SELECT * FROM file('in.csv') INTO OUTFILE 'out.parquet'`` leaves the
+sort order, row-group size, page size and dictionary encoding at their
+defaults, and those often matter more for later scans than the codec does.
+Sorted data gives tight per-row-group min/max statistics, so filters can skip
+whole row groups; smaller pages make the page index finer; the codec trades
+file size for decode speed.
+
+``tune`` copies the first ``sample_rows`` rows of the input into memory-cheap
+Native form and then searches one axis at a time (coordinate descent):
+the sort key first, then row-group size, page size, dictionary, and codec.
+For each candidate it writes the sample as Parquet, runs your queries against
+it, and scores the candidate as
+
+    query time / baseline query time + size_weight * size / baseline size
+
+where the baseline is the default writer settings. Row-group sizes are tried
+relative to the sample (16, 4 and 64 row groups, then the default), and the
+sort-key search already writes 16 row groups, so row-group skipping shows up
+in the timings. The winner is then used to convert the full input, and a JSON
+report of every trial is written next to the output::
+
+    from parquet_tune import tune
+
+    report = tune("data/orders_large.csv", "data/orders_tuned.parquet",
+                  queries=["SELECT sum(revenue) FROM {file} WHERE country = 'GB'",
+                           "SELECT count() FROM {file} WHERE order_date = '2026-03-01'"])
+
+or from the shell::
+
+    python3 parquet_tune.py data/orders_large.csv data/orders_tuned.parquet \\
+        -q "SELECT sum(revenue) FROM {file} WHERE country = 'GB'" --sort-key country
+
+``{file}`` in a query stands for the Parquet file under test. Without
+``sort_keys``, the lowest-cardinality columns that the queries mention are
+tried. Sorting the full input is a full sort; ClickHouse spills to disk past
+``max_bytes_before_external_sort`` if you set it.
+"""
+import argparse
+import json
+import os
+import pathlib
+import re
+import shutil
+import statistics
+import tempfile
+import time
+
+import chdb
+
+from sink import write_query
+
+ROW_GROUP_SIZE = "output_format_parquet_row_group_size"
+
+# ClickHouse's defaults for the settings searched; the baseline trial uses them.
+DEFAULTS = {
+    ROW_GROUP_SIZE: 1_000_000,
+    "output_format_parquet_data_page_size": 1_048_576,
+    "output_format_parquet_max_dictionary_size": 1_048_576,
+    "output_format_parquet_compression_method": "zstd",
+}
+
+# Searched in this order, each starting from its first value. Row-group sizes
+# of None are set from the sample by _row_group_sizes.
+AXES = {
+    ROW_GROUP_SIZE: None,
+    "output_format_parquet_data_page_size": [1_048_576, 65_536],
+    "output_format_parquet_max_dictionary_size": [1_048_576, 0],  # 0: no dictionary
+    "output_format_parquet_compression_method": ["zstd", "lz4", "snappy"],
+}
+
+
+def _row_group_sizes(n_sample):
+    """
+    Sizes that cut the sample into 16, 4 and 64 row groups, then the default.
+    At the default size a 1M-row sample is a single row group, so no sort key
+    could let a query skip anything and the sort-key search would be noise.
+    """
+    sizes = [max(1, n_sample // n) for n in (16, 4, 64)] + [DEFAULTS[ROW_GROUP_SIZE]]
+    return list(dict.fromkeys(sizes))
+
+
+def _quote(s):
+    return str(s).replace("\\", "\\\\").replace("'", "\\'")
+
+
+def _source(path, input_format=None):
+    fmt = f", '{input_format}'" if input_format else ""
+    return f"file('{_quote(path)}'{fmt})"
+
+
+def _select(source, sort_key):
+    return f"SELECT * FROM {source}" + (f" ORDER BY {sort_key}" if sort_key else "")
+
+
+def suggest_sort_keys(conn, sample, queries, limit=2):
+    """Columns the queries mention, lowest cardinality first (good leading sort keys)."""
+    columns = [r.split("\t")[0] for r in
+               conn.query(f"DESCRIBE {sample}", "TSV").bytes().decode().splitlines()]
+    text = " ".join(queries)
+    used = [c for c in columns if re.search(rf"\b{re.escape(c)}\b", text)]
+    if not used:
+        return []
+    counts = conn.query("SELECT " + ", ".join(f"uniq(`{c}`)" for c in used) + f" FROM {sample}",
+                        "TSV").bytes().decode().split()
+    ranked = sorted(zip(map(int, counts), used))
+    return [c for _, c in ranked[:limit]]
+
+
+class _Trials:
+    """Writes and times one candidate configuration; remembers every result."""
+
+    def __init__(self, conn, sample, queries, workdir, runs, size_weight):
+        self.conn = conn
+        self.sample = sample
+        self.queries = queries
+        self.workdir = pathlib.Path(workdir)
+        self.runs = runs
+        self.size_weight = size_weight
+        self.results = {}
+        self.baseline = None
+
+    def evaluate(self, config):
+        key = json.dumps(config, sort_keys=True)
+        if key in self.results:
+            return self.results[key]
+        path = self.workdir / f"trial_{len(self.results)}.parquet"
+        settings = {k: v for k, v in config.items() if k != "sort_key"}
+        write_query(_select(self.sample, config["sort_key"]), path, "Parquet",
+                    conn=self.conn, settings=settings)
+        query_s, rows_read = [], []
+        for q in self.queries:
+            sql = q.format(file=f"file('{_quote(path)}', 'Parquet')")
+            self.conn.query(sql, "Null")  # warm-up: page cache, metadata
+            times = []
+            for _ in range(self.runs):
+                t0 = time.perf_counter()
+                res = self.conn.query(sql, "Null")
+                times.append(time.perf_counter() - t0)
+            query_s.append(statistics.median(times))
+            rows_read.append(res.rows_read())
+        trial = {"config": config, "size_bytes": path.stat().st_size,
+                 "query_s": query_s, "rows_read": rows_read}
+        path.unlink()
+        if self.baseline is None:
+            self.baseline = trial
+        base_t = sum(self.baseline["query_s"]) or 1e-9
+        trial["score"] = (sum(query_s) / base_t
+                          + self.size_weight * trial["size_bytes"] / self.baseline["size_bytes"])
+        self.results[key] = trial
+        return trial
+
+
+def tune(src, dst, queries, sort_keys=None, sample_rows=1_000_000, input_format=None,
+         axes=None, size_weight=0.25, runs=3, report_path=None, verbose=True):
+    """Pick Parquet writer settings for ``queries`` on a sample, then convert ``src`` to ``dst``.
+
+    Returns the report dict (also written to ``report_path``, default ``<dst>.tuning.json``).
+    """
+    if not queries:
+        raise ValueError("pass at least one query using {file}")
+    axes = AXES if axes is None else axes
+    log = print if verbose else (lambda *a, **k: None)
+    conn = chdb.connect(":memory:")
+    workdir = tempfile.mkdtemp(prefix="parquet-tune-")
+    try:
+        sample_path = os.path.join(workdir, "sample.native")
+        write_query(f"SELECT * FROM {_source(src, input_format)} LIMIT {int(sample_rows)}",
+                    sample_path, "Native", conn=conn)
+        sample = f"file('{_quote(sample_path)}', 'Native')"
+        n_sample = int(conn.query(f"SELECT count() FROM {sample}", "TSV").bytes())
+        if sort_keys is None:
+            sort_keys = suggest_sort_keys(conn, sample, queries)
+        log(f"# sample: {n_sample:,} rows; sort keys tried: {[None] + list(sort_keys)}")
+
+        axes = {k: _row_group_sizes(n_sample) if k == ROW_GROUP_SIZE and v is None else v
+                for k, v in axes.items()}
+        trials = _Trials(conn, sample, queries, workdir, runs, size_weight)
+        # the baseline every score is relative to: unsorted, ClickHouse's defaults
+        trials.evaluate({"sort_key": None, **{k: DEFAULTS.get(k, v[0]) for k, v in axes.items()}})
+        best = {"sort_key": None, **{k: v[0] for k, v in axes.items()}}
+        search = [("sort_key", [None] + list(sort_keys))] + list(axes.items())
+        for axis, values in search:
+            scored = []
+            for value in values:
+                trial = trials.evaluate({**best, axis: value})
+                scored.append((trial["score"], value))
+                log(f"  {axis:<42} {value!s:<22} score {trial['score']:.3f}  "
+                    f"{trial['size_bytes'] / 2**20:7.1f} MiB  "
+                    f"{sum(trial['query_s']) * 1000:8.1f} ms")
+            best[axis] = min(scored, key=lambda s: s[0])[1]
+
+        winner = trials.evaluate(best)
+        log(f"# winner: {best}")
+        settings = {k: v for k, v in best.items() if k != "sort_key"}
+        t0 = time.perf_counter()
+        write_query(_select(_source(src, input_format), best["sort_key"]), dst, "Parquet",
+                    settings=settings)
+        final = {"path": str(dst), "size_bytes": os.path.getsize(dst),
+                 "seconds": time.perf_counter() - t0}
+        log(f"# wrote {dst} ({final['size_bytes'] / 2**20:.1f} MiB) in {final['seconds']:.2f}s")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        "input": str(src),
+        "sample_rows": n_sample,
+        "queries": list(queries),
+        "size_weight": size_weight,
+        "baseline": trials.baseline,
+        "winner": winner,
+        "trials": list(trials.results.values()),
+        "final": final,
+    }
+    report_path = report_path or f"{dst}.tuning.json"
+    with open(report_path, "w") as f:
+        json.dump(report, f, indent=2)
+    return report
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    ap.add_argument("src", help="input file (any format chDB reads)")
+    ap.add_argument("dst", help="output .parquet path")
+    ap.add_argument("-q", "--query", action="append", required=True,
+                    help="a representative query; {file} is the Parquet file (repeatable)")
+    ap.add_argument("--sort-key", action="append",
+                    help="candidate ORDER BY expression (repeatable; default: suggested)")
+    ap.add_argument("--sample-rows", type=int, default=1_000_000)
+    ap.add_argument("--input-format", help="ClickHouse input format (default: from the extension)")
+    ap.add_argument("--size-weight", type=float, default=0.25,
+                    help="weight of file size vs query time in the score (default 0.25)")
+    ap.add_argument("--runs", type=int, default=3, help="timed runs per query per trial")
+    ap.add_argument("--report", help="report path (default: <dst>.tuning.json)")
+    args = ap.parse_args(argv)
+    tune(args.src, args.dst, args.query, sort_keys=args.sort_key, sample_rows=args.sample_rows,
+         input_format=args.input_format, size_weight=args.size_weight, runs=args.runs,
+         report_path=args.report)
+
+
+if __name__ == "__main__":
+    main()
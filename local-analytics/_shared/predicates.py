@@ -0,0 +1,154 @@
+"""Parse simple ``--where`` predicates and test them against min/max statistics.
+
+The footer inspectors (``orc-file-format/footer.py``,
+``what-is-parquet-file/parquet_footer.py``) answer the same question for
+different formats: which stripes, row groups or row-index groups can a reader
+skip because their statistics prove no row matches? The predicate language
+and the skip rule live here; each script only knows how to get a unit's
+statistics out of its format::
+
+    from predicates import parse_where, can_skip
+
+    terms = parse_where("id BETWEEN 500000 AND 510000 AND country IN ('GB', 'AU')")
+    # [("id", "between", ("500000", "510000")), ("country", "in", ["'GB'", "'AU'"])]
+    skip = any(can_skip(op, raw, *min_max[col]) for col, op, raw in terms)
+
+Supported: ``col op value`` (``= == != <> < <= > >=``), ``col BETWEEN a AND b``
+and ``col IN (a, b, ...)``, joined with ``AND``. A quoted literal is a single
+token, so the spaces or ``AND`` inside ``'2026-01-02 00:00:00'`` or
+``'A AND B'`` never split a term. Values stay raw SQL literals until they are
+compared; ``coerce`` parses them into the type of the statistics (int, float,
+Decimal, str, bytes, date, datetime). A literal that cannot be parsed or
+compared with the statistics raises ``ValueError``.
+
+``python3 -m doctest predicates.py`` runs the examples in ``parse_where``.
+"""
+import datetime
+import decimal
+import re
+
+# A quoted literal is one token, spaces and "AND" inside it included.
+_TOKEN = re.compile(r"\s*('[^']*'|<=|>=|<>|!=|==|=|<|>|\(|\)|,|[-\w.:]+)")
+_OPS = {"=", "==", "!=", "<>", "<", "<=", ">", ">="}
+_USAGE = "use col op value, col BETWEEN a AND b or col IN (...), joined with AND"
+
+
+def _tokens(where):
+    tokens, pos = [], 0
+    while where[pos:].strip():
+        m = _TOKEN.match(where, pos)
+        if not m:
+            raise ValueError(f"cannot parse {where[pos:].strip()!r} in {where!r}: {_USAGE}")
+        tokens.append(m.group(1))
+        pos = m.end()
+    return tokens
+
+
+def _is_value(token):
+    return token.startswith("'") or re.fullmatch(r"[-\w.:]+", token) is not None
+
+
+def parse_where(where):
+    """
+    ``"a = 1 AND b IN ('x', 'y')"`` -> [(column, op, raw value(s)), ...].
+
+    >>> parse_where("event_time BETWEEN '2026-01-02 00:00:00' AND '2026-01-03'")
+    [('event_time', 'between', ("'2026-01-02 00:00:00'", "'2026-01-03'"))]
+    >>> parse_where("country = 'A AND B' and id IN (1, 2)")
+    [('country', '=', "'A AND B'"), ('id', 'in', ['1', '2'])]
+    """
+    tokens = _tokens(where)
+    terms, i = [], 0
+
+    def take(expect=None):
+        nonlocal i
+        token = tokens[i] if i < len(tokens) else None
+        ok = (token is not None and
+              (_is_value(token) if expect == "value" else
+               token.upper() == expect if expect else True))
+        if not ok:
+            found = repr(token) if token is not None else "the end"
+            raise ValueError(f"unsupported predicate {where!r} at {found}: {_USAGE}")
+        i += 1
+        return token
+
+    while True:
+        col = take()
+        if not re.fullmatch(r"[\w.]+", col):
+            raise ValueError(f"unsupported predicate {where!r}: {col!r} is not a column; {_USAGE}")
+        op = take().upper()
+        if op in _OPS:
+            terms.append((col, op, take("value")))
+        elif op == "BETWEEN":
+            lo = take("value")
+            take("AND")  # BETWEEN consumes its own AND
+            terms.append((col, "between", (lo, take("value"))))
+        elif op == "IN":
+            take("(")
+            values = [take("value")]
+            while (sep := take()) == ",":
+                values.append(take("value"))
+            if sep != ")":
+                raise ValueError(f"unsupported predicate {where!r} at {sep!r}: {_USAGE}")
+            terms.append((col, "in", values))
+        else:
+            raise ValueError(f"unsupported predicate {where!r} at {op!r}: {_USAGE}")
+        if i == len(tokens):
+            return terms
+        take("AND")
+
+
+def coerce(raw, like):
+    """Parse a SQL literal into the Python type of a statistics value."""
+    text = raw[1:-1] if raw.startswith("'") else raw
+    if isinstance(like, datetime.datetime):
+        v = datetime.datetime.fromisoformat(text)
+        if like.tzinfo is not None and v.tzinfo is None:
+            v = v.replace(tzinfo=datetime.timezone.utc)
+        return v
+    if isinstance(like, datetime.date):
+        return datetime.date.fromisoformat(text[:10])
+    if isinstance(like, bool):
+        return text.lower() in ("1", "true")
+    if isinstance(like, int):
+        return int(text)
+    if isinstance(like, float):
+        return float(text)
+    if isinstance(like, decimal.Decimal):
+        try:
+            return decimal.Decimal(text)
+        except decimal.InvalidOperation:
+            raise ValueError(f"invalid decimal literal {raw!r}") from None
+    if isinstance(like, bytes):
+        return text.encode()
+    return text
+
+
+def can_skip(op, raw, lo, hi, empty=False):
+    """
+    True if a unit whose values lie in [lo, hi] has no row with ``col op raw``.
+    ``empty`` means every value is NULL, so no comparison is true; ``lo``/``hi``
+    of None (no statistics) never allow a skip.
+    """
+    if empty:
+        return True
+    if lo is None or hi is None:
+        return False
+    try:
+        return _excluded(op, raw, lo, hi)
+    except TypeError:
+        raise ValueError(f"cannot compare {raw!r} with {type(lo).__name__} statistics") from None
+
+
+def _excluded(op, raw, lo, hi):
+    if op == "between":
+        a, b = (coerce(r, lo) for r in raw)
+        return b < lo or a > hi
+    if op == "in":
+        return all(v < lo or v > hi for v in (coerce(r, lo) for r in raw))
+    v = coerce(raw, lo)
+    return {
+        "=": v < lo or v > hi, "==": v < lo or v > hi,
+        "!=": lo == hi == v, "<>": lo == hi == v,
+        "<": lo >= v, "<=": lo > v, ">": hi <= v, ">=": hi < v,
+    }[op]
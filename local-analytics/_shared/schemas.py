@@ -0,0 +1,247 @@
+"""A small schema registry for headerless formats (MsgPack, RowBinary, Npy).
+
+MsgPack and RowBinary files carry no column names or types, so every read
+needs a hand-written ``structure=`` string, and forgetting it costs a failed
+schema-inference attempt (``CANNOT_EXTRACT_TABLE_STRUCTURE``). The registry
+keeps those strings in one versioned place next to the data instead:
+
+``schemas.json`` (a sidecar file), or a ``schemas/`` directory with one
+``<dataset>.json`` per dataset::
+
+    {
+      "events": {
+        "format": "MsgPack",
+        "files": ["events*.msgpack"],
+        "versions": {
+          "1": "event_id UInt64, country String, event_type String, amount Float64"
+        }
+      }
+    }
+
+``files`` are glob patterns matched against the file name and against the
+path relative to the registry. Reads pick the latest version unless one is
+pinned::
+
+    from schemas import from_file
+
+    df = from_file("data/events_large.msgpack")          # structure looked up
+    df = from_file("data/events.msgpack", version=1)     # pinned
+
+``from_file`` finds the nearest ``schemas.json`` / ``schemas/`` by walking up
+from the data file's directory. ``SchemaRegistry.validate`` checks a file
+against its registered schema without scanning it -- the Npy header, the
+RowBinary row width, or a decode of the first few rows -- and reports which
+older version it matches when the latest one does not.
+"""
+import ast
+import fnmatch
+import json
+import os
+import pathlib
+
+import chdb
+from chdb.datastore import DataStore
+
+# Byte widths of fixed-size types, for the RowBinary whole-rows check.
+_FIXED_WIDTH = {
+    "Bool": 1, "UInt8": 1, "Int8": 1, "UInt16": 2, "Int16": 2, "Date": 2,
+    "UInt32": 4, "Int32": 4, "Float32": 4, "Date32": 4, "DateTime": 4,
+    "UInt64": 8, "Int64": 8, "Float64": 8, "UInt128": 16, "Int128": 16,
+    "UUID": 16, "UInt256": 32, "Int256": 32,
+}
+# NumPy dtype kind + item size -> ClickHouse type, for Npy headers.
+_NPY_TYPES = {
+    ("f", 4): "Float32", ("f", 8): "Float64",
+    ("i", 1): "Int8", ("i", 2): "Int16", ("i", 4): "Int32", ("i", 8): "Int64",
+    ("u", 1): "UInt8", ("u", 2): "UInt16", ("u", 4): "UInt32", ("u", 8): "UInt64",
+    ("b", 1): "Bool",
+}
+
+
+class SchemaDriftError(ValueError):
+    """A file no longer matches the schema registered for its dataset."""
+
+
+def split_structure(structure):
+    """Split ``"a UInt64, b Map(String, Int32)"`` into ``[(name, type), ...]``."""
+    parts, depth, current = [], 0, []
+    for ch in structure:
+        if ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+        if ch == "," and depth == 0:
+            parts.append("".join(current))
+            current = []
+        else:
+            current.append(ch)
+    parts.append("".join(current))
+    columns = []
+    for part in filter(str.strip, parts):
+        name, _, type_ = part.strip().partition(" ")
+        columns.append((name.strip("`"), type_.strip()))
+    return columns
+
+
+def _quote(s):
+    return str(s).replace("\\", "\\\\").replace("'", "\\'")
+
+
+def _npy_header(path):
+    """Return (ClickHouse element type, ndim) from a .npy header, without reading data."""
+    with open(path, "rb") as f:
+        magic = f.read(8)
+        if magic[:6] != b"\x93NUMPY":
+            raise SchemaDriftError(f"{path}: not a .npy file")
+        size_len = 2 if magic[6] == 1 else 4
+        header_len = int.from_bytes(f.read(size_len), "little")
+        header = ast.literal_eval(f.read(header_len).decode("latin1"))
+    descr = header["descr"]
+    if not isinstance(descr, str):
+        raise SchemaDriftError(f"{path}: structured dtypes are not supported by the Npy format")
+    kind, itemsize = descr[1], int(descr[2:])
+    type_ = "String" if kind in "SU" else _NPY_TYPES.get((kind, itemsize), descr)
+    return type_, len(header["shape"])
+
+
+class SchemaRegistry:
+    def __init__(self, source):
+        self.source = pathlib.Path(source)
+        self.root = self.source.parent  # "files" patterns are relative to this
+        if self.source.is_dir():
+            self.datasets = {p.stem: json.loads(p.read_text())
+                             for p in sorted(self.source.glob("*.json"))}
+        elif self.source.exists():
+            self.datasets = json.loads(self.source.read_text())
+        else:
+            self.datasets = {}
+
+    @classmethod
+    def discover(cls, path):
+        """The registry nearest to ``path``: ``schemas.json`` or ``schemas/``, walking up."""
+        here = pathlib.Path(path).resolve()
+        dirs = ([here] if here.is_dir() else []) + list(here.parents)
+        for d in dirs:
+            for candidate in (d / "schemas.json", d / "schemas"):
+                if candidate.exists():
+                    return cls(candidate)
+        raise LookupError(f"no schemas.json or schemas/ found above {path}")
+
+    # -- lookup -------------------------------------------------------------
+
+    def lookup(self, path_or_name):
+        """Return ``(dataset name, entry)`` for a dataset name or a data file path."""
+        if path_or_name in self.datasets:
+            return path_or_name, self.datasets[path_or_name]
+        path = pathlib.Path(path_or_name).resolve()
+        try:
+            rel = path.relative_to(self.root.resolve()).as_posix()
+        except ValueError:
+            rel = path.as_posix()
+        for name, entry in self.datasets.items():
+            for pattern in entry.get("files", []):
+                if fnmatch.fnmatch(path.name, pattern) or fnmatch.fnmatch(rel, pattern):
+                    return name, entry
+        raise LookupError(f"{path_or_name}: no dataset in {self.source} matches")
+
+    @staticmethod
+    def _version(entry, version):
+        versions = entry["versions"]
+        if version is None:
+            version = max(versions, key=int)
+        try:
+            return int(version), versions[str(version)]
+        except KeyError:
+            raise LookupError(f"no schema version {version}; have {', '.join(versions)}") from None
+
+    def structure(self, path_or_name, version=None):
+        """The registered structure string (latest version unless pinned)."""
+        _, entry = self.lookup(path_or_name)
+        return self._version(entry, version)[1]
+
+    def format(self, path_or_name):
+        return self.lookup(path_or_name)[1]["format"]
+
+    # -- reading ------------------------------------------------------------
+
+    def from_file(self, path, version=None, **kwargs):
+        """``DataStore.from_file`` with format and structure filled in from the registry."""
+        _, entry = self.lookup(path)
+        kwargs.setdefault("format", entry["format"])
+        kwargs.setdefault("structure", self._version(entry, version)[1])
+        return DataStore.from_file(str(path), **kwargs)
+
+    # -- drift --------------------------------------------------------------
+
+    def _problem(self, path, format, structure, sample_rows):
+        """Why ``path`` does not match ``structure``, or None if it does."""
+        columns = split_structure(structure)
+        if format == "Npy":
+            type_, ndim = _npy_header(path)
+            expected = type_
+            for _ in range(ndim - 1):
+                expected = f"Array({expected})"
+            if len(columns) != 1 or columns[0][1] != expected:
+                return f"Npy header says {expected}, registry says {structure!r}"
+            return None
+        if format == "RowBinary" and all(t in _FIXED_WIDTH for _, t in columns):
+            width = sum(_FIXED_WIDTH[t] for _, t in columns)
+            size = os.path.getsize(path)
+            if size % width:
+                return f"{size} bytes is not a whole number of {width}-byte rows"
+        try:
+            chdb.query(f"SELECT * FROM file('{_quote(path)}', '{format}', '{_quote(structure)}') "
+                       f"LIMIT {sample_rows} SETTINGS max_block_size = {sample_rows}", "Null")
+        except Exception as e:
+            return str(e).splitlines()[0]
+        return None
+
+    def validate(self, path, version=None, sample_rows=1000):
+        """Check ``path`` against its registered schema; return the version it matches.
+
+        Raises :class:`SchemaDriftError` if it matches none (or not the pinned one).
+        Only the header or the first ``sample_rows`` rows are read.
+        """
+        name, entry = self.lookup(path)
+        pinned, structure = self._version(entry, version)
+        problem = self._problem(path, entry["format"], structure, sample_rows)
+        if problem is None:
+            return pinned
+        if version is None:
+            for older in sorted((int(v) for v in entry["versions"]), reverse=True)[1:]:
+                if self._problem(path, entry["format"], entry["versions"][str(older)],
+                                 sample_rows) is None:
+                    raise SchemaDriftError(f"{path}: matches {name} v{older}, not the latest "
+                                           f"v{pinned}")
+        raise SchemaDriftError(f"{path}: does not match {name} v{pinned}: {problem}")
+
+    # -- writing ------------------------------------------------------------
+
+    def register(self, name, structure, format=None, files=None):
+        """Add ``structure`` as the next version of ``name`` (creating it) and save."""
+        entry = self.datasets.setdefault(name, {"format": format, "files": [], "versions": {}})
+        if format:
+            entry["format"] = format
+        for pattern in files or ():
+            if pattern not in entry["files"]:
+                entry["files"].append(pattern)
+        versions = entry["versions"]
+        latest = max(map(int, versions), default=0)
+        if latest and versions[str(latest)] == structure:
+            return latest
+        versions[str(latest + 1)] = structure
+        self.save()
+        return latest + 1
+
+    def save(self):
+        if self.source.is_dir():
+            for name, entry in self.datasets.items():
+                (self.source / f"{name}.json").write_text(json.dumps(entry, indent=2) + "\n")
+        else:
+            self.source.write_text(json.dumps(self.datasets, indent=2) + "\n")
+
+
+def from_file(path, version=None, registry=None, **kwargs):
+    """Read ``path`` with the schema from ``registry`` (default: the nearest one)."""
+    registry = registry or SchemaRegistry.discover(path)
+    return registry.from_file(path, version=version, **kwargs)
@@ -0,0 +1,105 @@
+"""Write a chDB query result to a file or file-like sink, block by block.
+
+``chdb.query(sql, ...).bytes()`` returns the whole encoded output as one
+Python ``bytes`` object, so converting a file that way holds all of it in
+memory before the first byte reaches disk::
+
+    dst.write_bytes(chdb.query("SELECT * FROM file('big.csv') FORMAT Avro").bytes())
+
+``write_query`` lets the engine write instead, one block at a time, so memory
+stays flat however large the input is::
+
+    from sink import write_query
+
+    write_query("SELECT * FROM file('big.csv')", "big.avro", "Avro")
+    with gzip.open("big.jsonl.gz", "wb") as f:          # any binary file-like
+        write_query(datastore, f, "JSONEachRow")
+
+A path sink is ``INTO OUTFILE``. A file-like sink is fed through a named pipe
+that the engine writes into and a thread copies out of in ``chunk_size``
+pieces, which works for every output format, including framed ones (Avro,
+Parquet, Arrow) whose blocks can't simply be concatenated.
+"""
+import os
+import shutil
+import tempfile
+import threading
+
+import chdb
+
+
+def _quote(s):
+    return str(s).replace("\\", "\\\\").replace("'", "\\'")
+
+
+def _into_outfile(sql, path, format, compression, settings):
+    query = f"SELECT * FROM ({sql}) INTO OUTFILE '{_quote(path)}' TRUNCATE"
+    if compression:
+        query += f" COMPRESSION '{compression}'"
+    query += f" FORMAT {format}"
+    if settings:
+        query += " SETTINGS " + ", ".join(
+            f"{k} = '{_quote(v)}'" if isinstance(v, str) else f"{k} = {v}"
+            for k, v in settings.items())
+    return query
+
+
+def write_query(source, sink, format, conn=None, compression=None, settings=None,
+                chunk_size=1 << 20):
+    """Run ``source`` and write its result to ``sink`` in ``format``; return bytes written.
+
+    ``source`` is a SELECT without a FORMAT clause, or a DataStore.
+    ``sink`` is a path or a binary file-like object with ``write``.
+    ``compression`` (``"zstd"``, ``"gzip"``, ...) compresses the output stream;
+    ``settings`` are extra ClickHouse settings, e.g. the output codec.
+    """
+    sql = source if isinstance(source, str) else source.to_sql()
+    run = conn.query if conn is not None else chdb.query
+
+    if isinstance(sink, (str, os.PathLike)):
+        run(_into_outfile(sql, sink, format, compression, settings))
+        return os.path.getsize(sink)
+
+    tmpdir = tempfile.mkdtemp(prefix="chdb-sink-")
+    fifo = os.path.join(tmpdir, "out")
+    os.mkfifo(fifo)
+    written = 0
+    failed = []
+
+    def copy():
+        nonlocal written
+        try:
+            with open(fifo, "rb") as pipe:
+                while True:
+                    chunk = pipe.read(chunk_size)
+                    if not chunk:
+                        return
+                    sink.write(chunk)
+                    written += len(chunk)
+        except BaseException as e:  # re-raised in the caller's thread
+            failed.append(e)
+
+    reader = threading.Thread(target=copy, daemon=True)
+    reader.start()
+    error = None
+    try:
+        run(_into_outfile(sql, fifo, format, compression, settings))
+    except Exception as e:
+        error = e
+    finally:
+        # If the query failed before opening the pipe, the reader is still
+        # blocked in open(); open and close the write end to release it.
+        if reader.is_alive():
+            try:
+                os.close(os.open(fifo, os.O_WRONLY | os.O_NONBLOCK))
+            except OSError:
+                pass
+        reader.join()
+        shutil.rmtree(tmpdir, ignore_errors=True)
+    # A failing sink closes the pipe early, which the engine reports as a
+    # broken pipe; the sink's own error is the useful one.
+    if failed:
+        raise failed[0]
+    if error is not None:
+        raise error
+    return written
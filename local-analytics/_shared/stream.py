@@ -0,0 +1,114 @@
+"""Stream a chDB query or DataStore as bounded-size batches.
+
+``DataStore.to_pandas()`` materializes the whole result before Python sees a
+row. For results larger than RAM, iterate instead::
+
+    import chdb.datastore as pd
+    from stream import iter_frames
+
+    d = pd.read_json("data/orders_large.jsonl", lines=True)
+    for chunk in iter_frames(d[d["status"] == "paid"], rows_per_batch=100_000):
+        ...  # a pandas.DataFrame of at most 100k rows
+
+``iter_batches`` yields ``pyarrow.RecordBatch`` objects instead. Both accept a
+DataStore (anything with ``to_sql()``) or a plain SQL string.
+
+Back-pressure: a background thread pulls batches from chDB's streaming result
+into a queue of at most ``prefetch`` batches. When the consumer falls behind,
+the queue fills, the producer blocks and chDB stops reading input, so memory
+stays at roughly ``(prefetch + 1) * rows_per_batch`` rows however large the
+source is. ``prefetch=0`` disables the thread and pulls synchronously.
+"""
+import queue
+import threading
+
+import chdb
+
+_END = object()
+_conn = None
+_conn_lock = threading.Lock()
+
+
+def _connection():
+    """One in-memory chDB connection shared by every stream in the process."""
+    global _conn
+    with _conn_lock:
+        if _conn is None:
+            _conn = chdb.connect(":memory:")
+        return _conn
+
+
+def _to_sql(source):
+    return source if isinstance(source, str) else source.to_sql()
+
+
+def _sliced(reader, rows_per_batch):
+    # chDB sizes Arrow batches by its own block size, which may overshoot the
+    # requested row count; re-slice so the bound is a hard one.
+    for batch in reader:
+        if batch.num_rows <= rows_per_batch:
+            yield batch
+            continue
+        for offset in range(0, batch.num_rows, rows_per_batch):
+            yield batch.slice(offset, rows_per_batch)
+
+
+def iter_batches(source, rows_per_batch=65_536, prefetch=2, conn=None):
+    """Yield ``pyarrow.RecordBatch`` objects of at most ``rows_per_batch`` rows."""
+    if rows_per_batch < 1:
+        raise ValueError("rows_per_batch must be >= 1")
+    conn = conn or _connection()
+    stream = conn.send_query(_to_sql(source), "Arrow")
+    batches = _sliced(stream.record_batch(rows_per_batch=rows_per_batch), rows_per_batch)
+
+    if prefetch <= 0:
+        try:
+            yield from batches
+        finally:
+            stream.close()
+        return
+
+    q = queue.Queue(maxsize=prefetch)
+    stop = threading.Event()
+
+    def put(item):
+        # Block while the queue is full, but wake up to notice a cancelled consumer.
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for batch in batches:
+                if not put(batch):
+                    return
+            put(_END)
+        except BaseException as e:  # surfaced to the consumer below
+            put(e)
+
+    producer = threading.Thread(target=produce, daemon=True)
+    producer.start()
+    try:
+        while True:
+            item = q.get()
+            if item is _END:
+                break
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        stop.set()
+        if producer.is_alive():
+            stream.cancel()
+        producer.join()
+        stream.close()
+
+
+def iter_frames(source, rows_per_batch=65_536, prefetch=2, conn=None):
+    """Like :func:`iter_batches`, but yield ``pandas.DataFrame`` chunks."""
+    for batch in iter_batches(source, rows_per_batch, prefetch, conn):
+        yield batch.to_pandas()
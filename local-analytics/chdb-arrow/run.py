@@ -6,10 +6,14 @@ https://clickhouse.com/resources/engineering/read-arrow-file-python
 
 Run ./generate.sh first to create data/events.arrow.
 """
-import time
+import pathlib
+import sys
 
 import chdb.datastore as pd
 
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent / "_shared"))
+from bench import Bench  # noqa: E402
+
 
 print("=== 1. Read an Arrow file into a DataFrame (types auto-inferred) ===")
 df = pd.read_feather("data/events.arrow")
@@ -46,18 +50,10 @@ def pyarrow_agg():
             .sort_values(ascending=False))
 
 
-def best_of_3(fn):
-    fn()  # warm
-    best = float("inf")
-    for _ in range(3):
-        t0 = time.perf_counter()
-        fn()
-        best = min(best, time.perf_counter() - t0)
-    return best
-
-
-pa_s = best_of_3(pyarrow_agg)
-ds_s = best_of_3(datastore_agg)
+bench = Bench("chdb-arrow")
+pa_s = bench.run("pyarrow_agg", pyarrow_agg).median
+ds_s = bench.run("datastore_agg", datastore_agg).median
 print(f"pyarrow + pandas:               {pa_s:.3f}s")
 print(f"import chdb.datastore as pd:    {ds_s:.3f}s")
 print(f"speedup:                        {pa_s / ds_s:.1f}x")
+bench.report()
@@ -6,10 +6,14 @@ https://clickhouse.com/resources/engineering/read-avro-file-python
 
 Run ./generate.sh first to create data/.
 """
-import time
+import pathlib
+import sys
 
 from chdb.datastore import DataStore
 
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent / "_shared"))
+from bench import Bench  # noqa: E402
+
 
 print("=== 1. Read an Avro file into a DataFrame (types auto-inferred) ===")
 df = DataStore.from_file("data/events.avro", format="Avro")
@@ -48,18 +52,10 @@ def fastavro_agg():
     return agg
 
 
-def best_of_3(fn):
-    fn()  # warm
-    best = float("inf")
-    for _ in range(3):
-        t0 = time.perf_counter()
-        fn()
-        best = min(best, time.perf_counter() - t0)
-    return best
-
-
-fa_s = best_of_3(fastavro_agg)
-ds_s = best_of_3(datastore_agg)
+bench = Bench("chdb-avro")
+fa_s = bench.run("fastavro_agg", fastavro_agg).median
+ds_s = bench.run("datastore_agg", datastore_agg).median
 print(f"fastavro (manual loop):         {fa_s:.3f}s")
 print(f"import chdb.datastore as pd:    {ds_s:.3f}s")
 print(f"speedup:                        {fa_s / ds_s:.1f}x")
+bench.report()
@@ -7,10 +7,14 @@ https://clickhouse.com/resources/engineering/read-bson-file-python
 Run ./generate.sh first to create data/.
 The perf contrast needs pymongo's bson decoder: pip install pymongo
 """
-import time
+import pathlib
+import sys
 
 from chdb.datastore import DataStore
 
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent / "_shared"))
+from bench import Bench  # noqa: E402
+
 
 print("=== 1. Read a BSON file into a DataFrame (schema auto-inferred) ===")
 df = DataStore.from_file("data/events.bson", format="BSONEachRow")
@@ -48,18 +52,10 @@ def pymongo_pandas_agg():
              .sort_values(ascending=False))
 
 
-def best_of_3(fn):
-    fn()  # warm
-    best = float("inf")
-    for _ in range(3):
-        t0 = time.perf_counter()
-        fn()
-        best = min(best, time.perf_counter() - t0)
-    return best
-
-
-py_s = best_of_3(pymongo_pandas_agg)
-ds_s = best_of_3(datastore_agg)
+bench = Bench("chdb-bson")
+py_s = bench.run("pymongo_pandas_agg", pymongo_pandas_agg).median
+ds_s = bench.run("datastore_agg", datastore_agg).median
 print(f"pymongo decode + pandas:        {py_s:.3f}s")
 print(f"import chdb.datastore:          {ds_s:.3f}s")
 print(f"speedup:                        {py_s / ds_s:.1f}x")
+bench.report()
@@ -6,10 +6,14 @@ https://clickhouse.com/resources/engineering/read-csv-file-python
 
 Run ./generate.sh first to create data/.
 """
-import time
+import pathlib
+import sys
 
 import chdb.datastore as pd
 
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent / "_shared"))
+from bench import Bench  # noqa: E402
+
 
 print("=== 1. Read a CSV into a DataFrame (types auto-inferred) ===")
 df = pd.read_csv("data/orders.csv")
@@ -50,18 +54,10 @@ def pandas_agg():
             .sort_values(ascending=False))
 
 
-def best_of_3(fn):
-    fn()  # warm
-    best = float("inf")
-    for _ in range(3):
-        t0 = time.perf_counter()
-        fn()
-        best = min(best, time.perf_counter() - t0)
-    return best
-
-
-pd_s = best_of_3(pandas_agg)
-ds_s = best_of_3(datastore_agg)
+bench = Bench("chdb-csv")
+pd_s = bench.run("pandas_agg", pandas_agg).median
+ds_s = bench.run("datastore_agg", datastore_agg).median
 print(f"import pandas as pd:            {pd_s:.3f}s")
 print(f"import chdb.datastore as pd:    {ds_s:.3f}s")
 print(f"speedup:                        {pd_s / ds_s:.1f}x")
+bench.report()
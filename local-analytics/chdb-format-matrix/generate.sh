@@ -0,0 +1,63 @@
+#!/usr/bin/env bash
+# Generate ONE canonical events dataset and write it in every format the chdb-*
+# readers cover, so the read numbers in run.py are directly comparable.
+# Everything is created locally with `clickhouse local`. Idempotent: re-running overwrites.
+set -euo pipefail
+cd "$(dirname "$0")"
+
+ROWS=${ROWS:-3000000}
+
+mkdir -p data
+
+# 1. The canonical dataset, generated once into Native (ClickHouse's own
+#    columnar format) so every other file is a lossless re-encoding of it.
+echo "Generating data/events.native ($ROWS rows)..."
+clickhouse local -q "
+SELECT
+  number                                                             AS id,
+  ['GB','AU','IN','US','DE'][(cityHash64(number) % 5) + 1]          AS country,
+  ['view','cart','purchase'][(cityHash64(number, 'e') % 3) + 1]     AS event_type,
+  toUInt16((cityHash64(number, 'q') % 10) + 1)                      AS quantity,
+  round((cityHash64(number, 'a') % 100000) / 100.0, 2)             AS amount,
+  toDateTime('2026-01-01 00:00:00') + (cityHash64(number, 't') % 7776000) AS event_time
+FROM numbers(${ROWS})
+INTO OUTFILE 'data/events.native' TRUNCATE FORMAT Native
+"
+
+convert() { # convert <file> <FORMAT> [SETTINGS ...]
+  echo "Writing data/$1..."
+  clickhouse local -q "
+  SELECT * FROM file('data/events.native', 'Native')
+  INTO OUTFILE 'data/$1' TRUNCATE FORMAT $2 ${3:-}"
+}
+
+# 2. Re-encode into every reader format.
+convert events.parquet Parquet
+convert events.arrow   Arrow
+convert events.feather Arrow      # Feather v2 is the Arrow IPC file format
+convert events.orc     ORC
+convert events.avro    Avro
+convert events.csv     CSVWithNames
+convert events.tsv     TSVWithNames
+convert events.json    JSONEachRow "SETTINGS output_format_json_array_of_rows = 1"
+convert events.jsonl   JSONEachRow
+convert events.ndjson  JSONEachRow
+convert events.bson    BSONEachRow "SETTINGS output_format_bson_string_as_string = 1"
+convert events.msgpack MsgPack
+
+# 3. Npy holds ONE numeric array per file, so the three columns the benchmark
+#    touches go into a 2-D Float64 matrix: [country_code, event_type_code, amount].
+#    Codes are 1-based positions in the same lists used above.
+echo "Writing data/events.npy..."
+clickhouse local -q "
+SELECT [
+  toFloat64(indexOf(['GB','AU','IN','US','DE'], country)),
+  toFloat64(indexOf(['view','cart','purchase'], event_type)),
+  amount
+] AS row
+FROM file('data/events.native', 'Native')
+INTO OUTFILE 'data/events.npy' TRUNCATE FORMAT Npy
+"
+
+echo "Generated:"
+ls -lh data
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""Cross-format read benchmark: one dataset, every format, chDB vs pandas.
+
+Runs the same filter + groupby (purchase revenue per country) through
+chdb.datastore and through the usual pandas reader for each format that the
+chdb-* examples cover, and prints a throughput table (rows/s, MB/s, peak RSS).
+
+Run ./generate.sh first to create data/. Pass format names to run a subset:
+
+    python3 run.py parquet csv jsonl
+    BENCH_RUNS=10 BENCH_JSON=matrix.ndjson python3 run.py
+"""
+import os
+import pathlib
+import sys
+
+import chdb
+import pandas as real_pd
+import chdb.datastore as pd
+from chdb.datastore import DataStore
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent / "_shared"))
+from bench import Bench  # noqa: E402
+
+DATA = pathlib.Path(__file__).parent / "data"
+
+# MsgPack carries no schema; these are the columns generate.sh wrote, in order.
+MSGPACK_SCHEMA = ("id UInt64, country String, event_type String, quantity UInt16, "
+                  "amount Float64, event_time DateTime")
+COUNTRIES = ["GB", "AU", "IN", "US", "DE"]
+EVENT_TYPES = ["view", "cart", "purchase"]
+# Import name -> pip package, for the "n/a" hint when an optional reader is missing.
+PIP_NAMES = {"bson": "pymongo"}
+
+
+def agg(d):
+    """The benchmark query. DataStore and pandas share the API, so it is one function."""
+    return (d[d["event_type"] == "purchase"]
+            .groupby("country")["amount"].sum()
+            .sort_values(ascending=False))
+
+
+def ds_agg(d):
+    return agg(d).to_pandas()
+
+
+# ---------------------------------------------------------------------------
+# Readers: (chdb.datastore, pandas) per format. A pandas reader that needs an
+# optional package raises ImportError and is reported as n/a.
+# ---------------------------------------------------------------------------
+
+def fastavro_frame(path):
+    import fastavro
+    with open(path, "rb") as f:
+        return real_pd.DataFrame.from_records(fastavro.reader(f))
+
+
+def bson_frame(path):
+    from bson import decode_file_iter
+    with open(path, "rb") as f:
+        return real_pd.DataFrame(decode_file_iter(f))
+
+
+def msgpack_frame(path):
+    import msgpack
+    names = [c.split()[0] for c in MSGPACK_SCHEMA.split(", ")]
+    with open(path, "rb") as f:
+        vals = list(msgpack.Unpacker(f, raw=False))
+    n = len(names)
+    return real_pd.DataFrame({name: vals[i::n] for i, name in enumerate(names)})
+
+
+def npy_datastore(path):
+    # A 2-D .npy reads as a single Array(Float64) column called "array".
+    return DataStore.run_sql(f"""
+        SELECT ['GB','AU','IN','US','DE'][toUInt8(array[1])] AS country,
+               sum(array[3]) AS amount
+        FROM file('{path}', 'Npy')
+        WHERE array[2] = {EVENT_TYPES.index("purchase") + 1}
+        GROUP BY country ORDER BY amount DESC
+    """).to_pandas()
+
+
+def npy_pandas(path):
+    import numpy as np
+    m = np.load(path)
+    p = real_pd.DataFrame({
+        "country": np.asarray(COUNTRIES)[m[:, 0].astype(int) - 1],
+        "event_type": np.asarray(EVENT_TYPES)[m[:, 1].astype(int) - 1],
+        "amount": m[:, 2],
+    })
+    return agg(p)
+
+
+FORMATS = {
+    "parquet": ("events.parquet",
+                lambda p: ds_agg(pd.read_parquet(p)),
+                lambda p: agg(real_pd.read_parquet(p))),
+    "arrow":   ("events.arrow",
+                lambda p: ds_agg(pd.read_feather(p)),
+                lambda p: agg(real_pd.read_feather(p))),
+    "feather": ("events.feather",
+                lambda p: ds_agg(pd.read_feather(p)),
+                lambda p: agg(real_pd.read_feather(p))),
+    "orc":     ("events.orc",
+                lambda p: ds_agg(pd.read_orc(p)),
+                lambda p: agg(real_pd.read_orc(p))),
+    "avro":    ("events.avro",
+                lambda p: ds_agg(DataStore.from_file(p, format="Avro")),
+                lambda p: agg(fastavro_frame(p))),
+    "csv":     ("events.csv",
+                lambda p: ds_agg(pd.read_csv(p)),
+                lambda p: agg(real_pd.read_csv(p))),
+    "tsv":     ("events.tsv",
+                lambda p: ds_agg(pd.read_csv(p, sep="\t")),
+                lambda p: agg(real_pd.read_csv(p, sep="\t"))),
+    "json":    ("events.json",
+                lambda p: ds_agg(pd.read_json(p)),
+                lambda p: agg(real_pd.read_json(p))),
+    "jsonl":   ("events.jsonl",
+                lambda p: ds_agg(pd.read_json(p, lines=True)),
+                lambda p: agg(real_pd.read_json(p, lines=True))),
+    "ndjson":  ("events.ndjson",
+                lambda p: ds_agg(pd.read_json(p, lines=True)),
+                lambda p: agg(real_pd.read_json(p, lines=True))),
+    "bson":    ("events.bson",
+                lambda p: ds_agg(DataStore.from_file(p, format="BSONEachRow")),
+                lambda p: agg(bson_frame(p))),
+    "msgpack": ("events.msgpack",
+                lambda p: ds_agg(DataStore.from_file(p, format="MsgPack",
+                                                     structure=MSGPACK_SCHEMA)),
+                lambda p: agg(msgpack_frame(p))),
+    "npy":     ("events.npy", npy_datastore, npy_pandas),
+}
+
+
+def main(selected):
+    unknown = [f for f in selected if f not in FORMATS]
+    if unknown:
+        sys.exit(f"unknown format(s): {', '.join(unknown)}; choose from {', '.join(FORMATS)}")
+    names = selected or list(FORMATS)
+
+    rows = int(chdb.query(f"SELECT count() FROM file('{DATA / 'events.native'}', 'Native')")
+               .bytes().strip())
+    bench = Bench("chdb-format-matrix")
+
+    print(f"=== Read + filter + groupby on the same {rows:,}-row dataset, per format ===")
+    print(f"{'format':<9}{'MB':>8}  {'reader':<15}{'median s':>9}{'rows/s':>14}"
+          f"{'MB/s':>9}{'peak RSS MiB':>14}")
+    for name in names:
+        filename, ds_fn, pd_fn = FORMATS[name]
+        path = str(DATA / filename)
+        mb = os.path.getsize(path) / 1e6
+        for reader, fn in (("chdb.datastore", ds_fn), ("pandas", pd_fn)):
+            try:
+                r = bench.run(f"{name}/{reader}", fn, path)
+            except ImportError as e:
+                print(f"{name:<9}{mb:>8.1f}  {reader:<15}{'n/a':>9}  (pip install {PIP_NAMES.get(e.name, e.name)})")
+                continue
+            print(f"{name:<9}{mb:>8.1f}  {reader:<15}{r.median:>9.3f}"
+                  f"{rows / r.median:>14,.0f}{mb / r.median:>9.1f}"
+                  f"{r.peak_rss_bytes / 2**20:>14.0f}")
+
+    print()
+    bench.report()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
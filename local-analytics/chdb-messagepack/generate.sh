@@ -31,5 +31,18 @@ FROM numbers(${LARGE_ROWS})
 INTO OUTFILE 'data/events_large.msgpack' TRUNCATE FORMAT MsgPack
 "
 
+# 3. The same feed after an upstream change: a channel column was added after country.
+#    Reading it with the old structure misaligns every value (schema drift).
+clickhouse local -q "
+SELECT
+  number AS event_id,
+  ['GB','AU','IN','US','DE'][(number % 5) + 1] AS country,
+  ['web','app'][(number % 2) + 1] AS channel,
+  ['purchase','view'][(number % 2) + 1] AS event_type,
+  round(randUniform(1, 100), 2) AS amount
+FROM numbers(${SMALL_ROWS})
+INTO OUTFILE 'data/events_drifted.msgpack' TRUNCATE FORMAT MsgPack
+"
+
 echo "Generated:"
 ls -lh data
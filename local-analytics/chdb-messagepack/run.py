@@ -6,12 +6,20 @@ https://clickhouse.com/resources/engineering/read-messagepack-file-python
 
 Run ./generate.sh first to create data/.
 """
+import pathlib
+import shutil
+import sys
+import tempfile
 import time
 from collections import defaultdict
 
 import chdb.datastore as pd
 import msgpack
 
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent / "_shared"))
+from bench import Bench  # noqa: E402
+from schemas import SchemaDriftError, SchemaRegistry, from_file  # noqa: E402
+
 # MsgPack carries NO schema. You MUST pass the column list and types
 # via structure=, in the same order the file was written.
 SCHEMA = "event_id UInt64, country String, event_type String, amount Float64"
@@ -41,7 +49,38 @@ print("\n=== 4. Hand off to real pandas when you need it ===")
 pdf = df.to_pandas()
 print(type(pdf))
 
-print("\n=== 5. Performance: chDB DataStore vs the msgpack library, on a 3M-row file ===")
+print("\n=== 5. Keep the structure in a schema registry instead of in code ===")
+# schemas.json next to this script maps file globs to versioned structures, so
+# reads need neither structure= nor a failed inference attempt first.
+events = from_file("data/events.msgpack")
+print(events[events["event_type"] == "purchase"].groupby("country")["amount"].sum())
+
+registry = SchemaRegistry.discover("data/events_large.msgpack")
+t0 = time.perf_counter()
+version = registry.validate("data/events_large.msgpack")
+print(f"events_large.msgpack matches events v{version} "
+      f"(checked in {(time.perf_counter() - t0) * 1000:.1f} ms, first 1000 rows only)")
+try:
+    registry.validate("data/events_drifted.msgpack")
+except SchemaDriftError as e:
+    print(f"drift: {e}")
+
+# Register the new layout as v2 (in a scratch copy, to keep schemas.json as shipped).
+scratch = pathlib.Path(tempfile.mkdtemp()) / "schemas.json"
+shutil.copy("schemas.json", scratch)
+v2 = SchemaRegistry(scratch)
+v2.register("events", "event_id UInt64, country String, channel String, "
+                      "event_type String, amount Float64")
+print(f"events_drifted.msgpack matches events v{v2.validate('data/events_drifted.msgpack')}")
+try:
+    v2.validate("data/events.msgpack")
+except SchemaDriftError as e:
+    print(f"drift: {e}")
+old = from_file("data/events.msgpack", version=1, registry=v2)  # pin the old version
+print(f"pinned v1 read: {len(old.to_pandas())} rows")
+shutil.rmtree(scratch.parent)
+
+print("\n=== 6. Performance: chDB DataStore vs the msgpack library, on a 3M-row file ===")
 
 
 def datastore_agg():
@@ -78,18 +117,10 @@ def msgpack_lib_agg():
     return agg
 
 
-def best_of_3(fn):
-    fn()  # warm
-    best = float("inf")
-    for _ in range(3):
-        t0 = time.perf_counter()
-        fn()
-        best = min(best, time.perf_counter() - t0)
-    return best
-
-
-lib_s = best_of_3(msgpack_lib_agg)
-ds_s = best_of_3(datastore_agg)
+bench = Bench("chdb-messagepack")
+lib_s = bench.run("msgpack_lib_agg", msgpack_lib_agg).median
+ds_s = bench.run("datastore_agg", datastore_agg).median
 print(f"msgpack library (manual):           {lib_s:.3f}s")
 print(f"chdb.datastore (pandas, no SQL):    {ds_s:.3f}s")
 print(f"speedup:                            {lib_s / ds_s:.1f}x")
+bench.report()
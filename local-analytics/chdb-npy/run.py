@@ -6,10 +6,18 @@ https://clickhouse.com/resources/engineering/read-npy-file-python
 
 Run ./generate.sh first to create data/.
 """
-import time
+import pathlib
+import sys
+import tempfile
 
+import chdb
+import numpy as np
 from chdb.datastore import DataStore
 
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent / "_shared"))
+from bench import Bench  # noqa: E402
+from npybridge import NpyTable  # noqa: E402
+
 
 print("=== 1. Read a .npy file into a DataFrame ===")
 # DataStore.from_file reads the array into a lazy, ClickHouse-backed object.
@@ -58,26 +66,85 @@ def datastore_mean():
 
 
 def numpy_mean():
-    import numpy as np
     v = np.load("data/large.npy")
     return v.mean()
 
 
-def best_of_3(fn):
-    fn()  # warm
-    best = float("inf")
-    for _ in range(3):
-        t0 = time.perf_counter()
-        fn()
-        best = min(best, time.perf_counter() - t0)
-    return best
-
-
-np_s = best_of_3(numpy_mean)
-ds_s = best_of_3(datastore_mean)
+bench = Bench("chdb-npy")
+np_s = bench.run("numpy_mean", numpy_mean).median
+ds_s = bench.run("datastore_mean", datastore_mean).median
 print(f"numpy.load + .mean():           {np_s:.3f}s")
 print(f"DataStore.from_file + .mean():  {ds_s:.3f}s")
 if ds_s < np_s:
     print(f"speedup:                        {np_s / ds_s:.1f}x")
 else:
     print(f"numpy faster by:                {ds_s / np_s:.1f}x")
+
+print("\n=== 7. NumPy bridge: zip .npy files by row inside the engine ===")
+# Section 4 decodes each file, copies it into pandas and aligns the frames on
+# their index. NpyTable memory-maps the files, exposes them to chDB as one
+# table (row i of each column is element i of each array) and returns the
+# result columns as NumPy arrays.
+t = NpyTable(reading="data/readings.npy", ok="data/flags.npy")
+out = t.query("SELECT reading, ok FROM {table}")
+print({name: col.tolist() for name, col in out.items()})
+good = t.query("SELECT avg(reading) AS mean_ok, count() AS n FROM {table} WHERE ok = 1")
+print(f"mean of flagged-ok readings: {good['mean_ok'][0]:.2f} over {good['n'][0]} rows")
+scaled = t.query("SELECT reading / 100 AS scaled FROM {table}")["scaled"]
+print(f"{type(scaled).__name__} {scaled.dtype}, owns its data: {scaled.flags.owndata}")
+
+print("\n=== 8. Where the crossover moves: masked mean of values where flag = 1 ===")
+# The same question four ways, at growing sizes. The pandas round-trip pays a
+# decode, two DataFrames and a join before aggregating; the bridge pays one
+# Arrow wrap of the mapped files; PASTE JOIN zips the files inside SQL.
+large_v, large_ok = np.load("data/large.npy"), np.load("data/large_flags.npy")
+sizes = [n for n in (10_000, 100_000, 1_000_000) if n < len(large_v)] + [len(large_v)]
+tmp = pathlib.Path(tempfile.mkdtemp(prefix="chdb-npy-"))
+
+
+def numpy_masked(v_path, ok_path):
+    v, ok = np.load(v_path), np.load(ok_path)
+    return float(v[ok == 1].mean())
+
+
+def pandas_join_masked(v_path, ok_path):
+    v = DataStore.from_file(str(v_path), format="Npy").to_pandas().rename(columns={"array": "v"})
+    ok = DataStore.from_file(str(ok_path), format="Npy").to_pandas().rename(columns={"array": "ok"})
+    j = v.join(ok)
+    return float(j.loc[j["ok"] == 1, "v"].mean())
+
+
+def bridge_masked(v_path, ok_path):
+    t = NpyTable(v=v_path, ok=ok_path)
+    return float(t.query("SELECT avg(v) AS m FROM {table} WHERE ok = 1")["m"][0])
+
+
+def paste_join_masked(v_path, ok_path):
+    return float(chdb.query(
+        f"SELECT avg(a.array) FROM file('{v_path}', Npy) AS a "
+        f"PASTE JOIN file('{ok_path}', Npy) AS b WHERE b.array = 1", "CSV").bytes())
+
+
+methods = [("numpy", numpy_masked), ("pandas_join", pandas_join_masked),
+           ("npy_bridge", bridge_masked), ("paste_join", paste_join_masked)]
+timings = {}
+for n in sizes:
+    v_path, ok_path = tmp / f"v_{n}.npy", tmp / f"ok_{n}.npy"
+    np.save(v_path, large_v[:n])
+    np.save(ok_path, large_ok[:n])
+    answers = {name: fn(v_path, ok_path) for name, fn in methods}
+    assert np.allclose(list(answers.values()), answers["numpy"]), answers
+    for name, fn in methods:
+        timings[name, n] = bench.run(f"{name}_{n}", fn, v_path, ok_path).median
+for p in tmp.iterdir():
+    p.unlink()
+tmp.rmdir()
+
+print(f"{'rows':>10}" + "".join(f"{name:>14}" for name, _ in methods))
+for n in sizes:
+    print(f"{n:>10,}" + "".join(f"{timings[name, n] * 1000:>12.2f}ms" for name, _ in methods))
+for rival in ("pandas_join", "numpy"):
+    wins = [n for n in sizes if timings["npy_bridge", n] < timings[rival, n]]
+    print(f"npy_bridge beats {rival:<12} " + (f"from {wins[0]:,} rows" if wins
+                                                else f"at no size up to {sizes[-1]:,} rows"))
+bench.report()
@@ -6,11 +6,15 @@ https://clickhouse.com/resources/engineering/read-orc-file-python
 
 Run ./generate.sh first to create data/events.orc.
 """
-import time
+import pathlib
+import sys
 
 import chdb.datastore as pd
 import pandas
 
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent / "_shared"))
+from bench import Bench  # noqa: E402
+
 pandas.set_option("display.float_format", "{:.2f}".format)  # full decimals, not 1.00e+08
 
 
@@ -48,18 +52,10 @@ def pandas_agg():
             .sort_values(ascending=False))
 
 
-def best_of_3(fn):
-    fn()  # warm
-    best = float("inf")
-    for _ in range(3):
-        t0 = time.perf_counter()
-        fn()
-        best = min(best, time.perf_counter() - t0)
-    return best
-
-
-pd_s = best_of_3(pandas_agg)
-ds_s = best_of_3(datastore_agg)
+bench = Bench("chdb-orc")
+pd_s = bench.run("pandas_agg", pandas_agg).median
+ds_s = bench.run("datastore_agg", datastore_agg).median
 print(f"import pandas as pd:            {pd_s:.3f}s")
 print(f"import chdb.datastore as pd:    {ds_s:.3f}s")
 print(f"speedup:                        {pd_s / ds_s:.1f}x")
+bench.report()
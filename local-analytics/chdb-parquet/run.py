@@ -6,11 +6,16 @@ https://clickhouse.com/resources/engineering/read-parquet-file-python
 
 Run ./generate.sh first to create data/.
 """
-import time
+import pathlib
+import sys
 
 import pandas as _real_pd
 import chdb.datastore as pd
 
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent / "_shared"))
+from bench import Bench  # noqa: E402
+from stream import iter_frames  # noqa: E402
+
 _real_pd.set_option("display.float_format", "{:.2f}".format)
 
 print("=== 1. Read a Parquet file into a DataFrame (schema from metadata) ===")
@@ -47,18 +52,35 @@ def pandas_agg():
             .sort_values(ascending=False))
 
 
-def best_of_3(fn):
-    fn()  # warm
-    best = float("inf")
-    for _ in range(3):
-        t0 = time.perf_counter()
-        fn()
-        best = min(best, time.perf_counter() - t0)
-    return best
-
-
-pd_s = best_of_3(pandas_agg)
-ds_s = best_of_3(datastore_agg)
+bench = Bench("chdb-parquet")
+pd_s = bench.run("pandas_agg", pandas_agg).median
+ds_s = bench.run("datastore_agg", datastore_agg).median
 print(f"import pandas as pd:            {pd_s:.3f}s")
 print(f"import chdb.datastore as pd:    {ds_s:.3f}s")
 print(f"speedup:                        {pd_s / ds_s:.1f}x")
+
+print("\n=== 5. Stream the result in bounded chunks instead of materializing it ===")
+
+
+def materialized_agg():
+    d = pd.read_parquet("data/events.parquet")
+    pdf = d[d["event_type"] == "purchase"].to_pandas()
+    return pdf.groupby("country")["amount"].sum()
+
+
+def streamed_agg():
+    d = pd.read_parquet("data/events.parquet")
+    totals = {}
+    for chunk in iter_frames(d[d["event_type"] == "purchase"], rows_per_batch=100_000):
+        # Row-level Python work (.apply, model scoring, ...) sees <=100k rows at a time.
+        for country, v in chunk.groupby("country")["amount"].sum().items():
+            totals[country] = totals.get(country, 0.0) + v
+    return totals
+
+
+streamed = bench.run("streamed_agg", streamed_agg)
+full = bench.run("materialized_agg", materialized_agg)
+print(f"to_pandas() then groupby:       {full.median:.3f}s  +{full.rss_growth_bytes / 2**20:.0f} MiB RSS")
+print(f"iter_frames, 100k-row chunks:   {streamed.median:.3f}s  +{streamed.rss_growth_bytes / 2**20:.0f} MiB RSS")
+
+bench.report()
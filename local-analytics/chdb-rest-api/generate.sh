@@ -8,6 +8,8 @@ cd "$(dirname "$0")"
 
 SMALL_ROWS=${SMALL_ROWS:-5}
 LARGE_ROWS=${LARGE_ROWS:-2000000}
+PAGES=${PAGES:-100}
+PAGE_ROWS=${PAGE_ROWS:-1000}
 
 mkdir -p data
 
@@ -50,5 +52,20 @@ FROM numbers(${LARGE_ROWS})
 INTO OUTFILE 'data/orders_large.json' TRUNCATE FORMAT JSONEachRow
 "
 
+# 4. A paginated endpoint: PAGES pages of PAGE_ROWS rows each (default 100 x 1000),
+#    data/pages/orders_page1.json .. orders_page${PAGES}.json, for the concurrent
+#    multi-page read. run.py serves these with injected latency.
+rm -rf data/pages
+mkdir -p data/pages
+clickhouse local -q "
+INSERT INTO FUNCTION file('data/pages/orders_page{_partition_id}.json', 'JSONEachRow')
+PARTITION BY intDiv(id, ${PAGE_ROWS}) + 1
+SELECT
+  number                                                            AS id,
+  ['GB','AU','IN','US','DE'][(cityHash64(number) % 5) + 1]          AS country,
+  round((cityHash64(number,'a') % 100000) / 100.0, 2)               AS amount
+FROM numbers(${PAGES} * ${PAGE_ROWS})
+"
+
 echo "Generated:"
 ls -lh data
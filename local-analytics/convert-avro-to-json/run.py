@@ -3,20 +3,22 @@
 # Same SELECT ... FORMAT, in-process, written to a file. No server.
 # Run ./generate.sh first to create ./data/events.avro.
 import os
-import chdb
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "_shared"))
+from sink import write_query  # noqa: E402
 
 os.chdir(os.path.join(os.path.dirname(os.path.abspath(__file__)), "data"))
 
 # Convert Avro -> JSON Lines, casting the DateTime back from Avro's epoch int.
+# write_query streams the result to the file block by block (no .bytes() copy).
 sql = """
 SELECT event_id, event_type, country, amount, ts::DateTime AS ts
 FROM file('events.avro')
-FORMAT JSONEachRow
 """
-jsonl = chdb.query(sql).bytes()
-with open("events_chdb.jsonl", "wb") as f:
-    f.write(jsonl)
+write_query(sql, "events_chdb.jsonl", "JSONEachRow")
 
 print("== chDB: first 5 lines of events_chdb.jsonl ==")
-for line in jsonl.decode().splitlines()[:5]:
-    print(line)
+with open("events_chdb.jsonl") as f:
+    for _ in range(5):
+        print(f.readline().rstrip())
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""Convert whole directories between file formats with chDB, one process per core.
+
+Generalizes the convert-X-to-Y examples: each of those runs one
+
+    SELECT * FROM file('in.csv') INTO OUTFILE 'out.parquet' TRUNCATE FORMAT Parquet
+
+for one file. This tool runs that same query for every file matched by one or
+more input globs, in a process pool with one chDB instance per worker, and
+prints per-file progress and a throughput summary:
+
+    python3 convert.py 'data/drops/*.csv' --to parquet --out data/parquet
+    python3 convert.py 'data/drops/**/*.json' --to parquet --codec zstd --workers 8 --out out
+    python3 convert.py 'logs/*.tsv.gz' --to csv --codec zstd --level 9 --out out   # .csv.zst
+
+Re-running is cheap: an output whose mtime is at least its input's, written
+with the same target, codec and settings, is up to date and skipped
+(``--force`` reconverts). The parameters are kept next to each output in a
+hidden ``.<name>.params`` file. Outputs are written under a
+temporary name and renamed, so an interrupted run never leaves a truncated
+file that looks finished.
+"""
+import argparse
+import glob
+import json
+import multiprocessing
+import os
+import pathlib
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# Target name -> (ClickHouse output format, extension, codec setting, extra settings).
+# Columnar formats compress internally via their codec setting; text formats
+# get whole-file compression (INTO OUTFILE ... COMPRESSION) and a suffix instead.
+TARGETS = {
+    "parquet": ("Parquet", ".parquet", "output_format_parquet_compression_method", {}),
+    "orc":     ("ORC", ".orc", "output_format_orc_compression_method", {}),
+    "arrow":   ("Arrow", ".arrow", "output_format_arrow_compression_method", {}),
+    "avro":    ("Avro", ".avro", "output_format_avro_codec", {}),
+    "native":  ("Native", ".native", None, {}),
+    "csv":     ("CSVWithNames", ".csv", None, {}),
+    "tsv":     ("TSVWithNames", ".tsv", None, {}),
+    "json":    ("JSONEachRow", ".json", None, {"output_format_json_array_of_rows": 1}),
+    "jsonl":   ("JSONEachRow", ".jsonl", None, {}),
+    "ndjson":  ("JSONEachRow", ".ndjson", None, {}),
+}
+FILE_CODECS = {"gzip": ".gz", "zstd": ".zst", "lz4": ".lz4", "xz": ".xz", "bz2": ".bz2",
+               "brotli": ".br"}
+COMPRESSED_SUFFIXES = {".gz", ".zst", ".lz4", ".xz", ".bz2", ".br", ".zstd", ".gzip"}
+GLOB_CHARS = set("*?[")
+
+
+def quote(s):
+    return str(s).replace("\\", "\\\\").replace("'", "\\'")
+
+
+def glob_base(pattern):
+    """The directory part of a glob before its first wildcard."""
+    parts = pathlib.PurePath(pattern).parts
+    static = []
+    for part in parts[:-1]:
+        if GLOB_CHARS & set(part):
+            break
+        static.append(part)
+    return pathlib.Path(*static) if static else pathlib.Path(".")
+
+
+def plan(patterns, out_dir, target, codec):
+    """
+    (input, output) pairs; outputs mirror the inputs' paths under out_dir.
+    Inputs that differ only in extension (a.csv, a.json) would overwrite each
+    other's output, so they raise ValueError.
+    """
+    _, ext, codec_setting, _ = TARGETS[target]
+    if codec and codec_setting is None:
+        ext += FILE_CODECS[codec]
+    seen, jobs, sources = set(), [], {}
+    for pattern in patterns:
+        base = glob_base(pattern)
+        for src in sorted(glob.glob(pattern, recursive=True)):
+            src = pathlib.Path(src)
+            if not src.is_file() or src in seen:
+                continue
+            seen.add(src)
+            rel = src.relative_to(base)
+            stem = rel.name
+            if pathlib.PurePath(stem).suffix in COMPRESSED_SUFFIXES:
+                stem = pathlib.PurePath(stem).stem
+            stem = pathlib.PurePath(stem).stem
+            dst = pathlib.Path(out_dir) / rel.parent / (stem + ext)
+            if dst in sources:
+                raise ValueError(f"{sources[dst]} and {src} would both be written to {dst}; "
+                                 "convert them into different --out directories")
+            sources[dst] = src
+            jobs.append((src, dst))
+    return jobs
+
+
+def params_path(dst):
+    return dst.with_name(f".{dst.name}.params")
+
+
+def conversion_params(query_args):
+    """What an output depends on besides its input; max_threads only changes the speed."""
+    params = dict(query_args, settings=dict(query_args["settings"]))
+    params["settings"].pop("max_threads", None)
+    return json.dumps(params, sort_keys=True)
+
+
+def up_to_date(src, dst, params):
+    if not dst.exists() or dst.stat().st_mtime < src.stat().st_mtime:
+        return False
+    try:
+        return params_path(dst).read_text() == params
+    except FileNotFoundError:
+        return False
+
+
+def build_query(src, tmp, target, codec, level, input_format, structure, settings):
+    fmt, _, codec_setting, extra = TARGETS[target]
+    source = f"file('{quote(src)}'"
+    if input_format or structure:
+        source += f", '{input_format or 'auto'}'"
+        if structure:
+            source += f", '{quote(structure)}'"
+    source += ")"
+    all_settings = dict(extra)
+    compression = ""
+    if codec and codec_setting:
+        all_settings[codec_setting] = codec
+    elif codec:
+        compression = f" COMPRESSION '{codec}'" + (f" LEVEL {level}" if level is not None else "")
+    all_settings.update(settings)
+    sql = f"SELECT * FROM {source} INTO OUTFILE '{quote(tmp)}' TRUNCATE{compression} FORMAT {fmt}"
+    if all_settings:
+        sql += " SETTINGS " + ", ".join(
+            f"{k} = '{quote(v)}'" if isinstance(v, str) else f"{k} = {v}"
+            for k, v in all_settings.items())
+    return sql
+
+
+# -- worker side ---------------------------------------------------------------
+
+_conn = None
+
+
+def _init_worker():
+    # One chDB instance per worker process, created once and reused for every
+    # file that worker converts.
+    global _conn
+    import chdb
+    _conn = chdb.connect(":memory:")
+
+
+def convert_one(src, dst, query_args):
+    tmp = dst.with_name(f".{dst.name}.{os.getpid()}.tmp")
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    t0 = time.perf_counter()
+    try:
+        result = _conn.query(build_query(src, tmp, **query_args))
+        os.replace(tmp, dst)
+        params_path(dst).write_text(conversion_params(query_args))
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+    return {"rows": result.rows_read(), "seconds": time.perf_counter() - t0,
+            "in_bytes": src.stat().st_size, "out_bytes": dst.stat().st_size}
+
+
+# -- driver --------------------------------------------------------------------
+
+def parse_settings(pairs):
+    settings = {}
+    for pair in pairs:
+        key, sep, value = pair.partition("=")
+        if not sep:
+            raise ValueError(f"--setting expects key=value, got {pair!r}")
+        settings[key.strip()] = int(value) if value.strip().lstrip("-").isdigit() else value.strip()
+    return settings
+
+
+def main(argv=None):
+    cpus = os.cpu_count() or 1
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    ap.add_argument("inputs", nargs="+", help="input files or globs (** recurses)")
+    ap.add_argument("--to", required=True, choices=sorted(TARGETS), help="target format")
+    ap.add_argument("--out", required=True, help="output directory (input layout is mirrored)")
+    ap.add_argument("--codec", help="parquet/orc/arrow/avro codec (zstd, snappy, lz4, ...) or, "
+                                    f"for text targets, file compression ({', '.join(FILE_CODECS)})")
+    ap.add_argument("--level", type=int, help="compression level for text-target file compression")
+    ap.add_argument("--input-format", help="ClickHouse input format (default: from the extension)")
+    ap.add_argument("--structure", help="column structure, for headerless inputs like MsgPack or RowBinary")
+    ap.add_argument("--setting", action="append", default=[], metavar="KEY=VALUE",
+                    help="extra ClickHouse setting, e.g. output_format_parquet_row_group_size=1000000")
+    ap.add_argument("--workers", type=int, default=cpus, help=f"worker processes (default {cpus})")
+    ap.add_argument("--threads", type=int,
+                    help="max_threads per worker (default: cores / workers, at least 1)")
+    ap.add_argument("--force", action="store_true", help="reconvert even if outputs are up to date")
+    args = ap.parse_args(argv)
+
+    if args.codec and TARGETS[args.to][2] is None and args.codec not in FILE_CODECS:
+        ap.error(f"--codec for {args.to} is file compression: one of {', '.join(FILE_CODECS)}")
+    try:
+        settings = parse_settings(args.setting)
+    except ValueError as e:
+        ap.error(str(e))
+    settings.setdefault("max_threads", args.threads or max(1, cpus // args.workers))
+    query_args = dict(target=args.to, codec=args.codec, level=args.level,
+                      input_format=args.input_format, structure=args.structure, settings=settings)
+
+    try:
+        jobs = plan(args.inputs, args.out, args.to, args.codec)
+    except ValueError as e:
+        ap.error(str(e))
+    if not jobs:
+        print("no input files matched", file=sys.stderr)
+        return 1
+    params = conversion_params(query_args)
+    todo = [(s, d) for s, d in jobs if args.force or not up_to_date(s, d, params)]
+    skipped = len(jobs) - len(todo)
+    width = len(str(len(jobs)))
+    print(f"{len(jobs)} files, {skipped} up to date, {len(todo)} to convert "
+          f"with {args.workers} workers x {settings['max_threads']} threads")
+
+    done = failed = rows = in_bytes = out_bytes = 0
+    busy = 0.0
+    t0 = time.perf_counter()
+    # spawn, not fork: each worker gets a clean chDB instance rather than a
+    # copy of engine state that was never meant to be forked.
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(args.workers, mp_context=ctx, initializer=_init_worker) as pool:
+        futures = {pool.submit(convert_one, s, d, query_args): (s, d) for s, d in todo}
+        for future in as_completed(futures):
+            src, dst = futures[future]
+            done += 1
+            try:
+                r = future.result()
+            except Exception as e:
+                failed += 1
+                print(f"[{done:>{width}}/{len(todo)}] FAIL {src}: {str(e).splitlines()[0]}")
+                continue
+            rows += r["rows"]
+            in_bytes += r["in_bytes"]
+            out_bytes += r["out_bytes"]
+            busy += r["seconds"]
+            print(f"[{done:>{width}}/{len(todo)}] {src} -> {dst}  {r['rows']:,} rows  "
+                  f"{r['in_bytes'] / 1e6:.1f} -> {r['out_bytes'] / 1e6:.1f} MB  {r['seconds']:.2f}s")
+    wall = time.perf_counter() - t0
+
+    print(f"\nconverted {len(todo) - failed}, skipped {skipped}, failed {failed} in {wall:.2f}s")
+    if todo and wall > 0:
+        ratio = out_bytes / in_bytes if in_bytes else 0
+        print(f"{rows:,} rows, {in_bytes / 1e6:.1f} MB in -> {out_bytes / 1e6:.1f} MB out "
+              f"({ratio:.2f}x)")
+        print(f"throughput: {rows / wall:,.0f} rows/s, {in_bytes / 1e6 / wall:.1f} MB/s input; "
+              f"workers busy {busy / (wall * args.workers):.0%} of the time")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,32 @@
+#!/usr/bin/env bash
+# Generate a directory of "daily drops" for the batch converter, locally with
+# clickhouse local so nothing large is committed to git. Writes into ./data/
+# (gitignored):
+#   data/drops/orders_<date>.csv  - DAYS files of ROWS_PER_DAY rows each
+#                                   (default 60 x 500,000 rows, ~20 MB per file)
+# Idempotent: the directory is recreated on every run.
+set -euo pipefail
+cd "$(dirname "$0")"
+
+DAYS=${DAYS:-60}
+ROWS_PER_DAY=${ROWS_PER_DAY:-500000}
+
+rm -rf data/drops
+mkdir -p data/drops
+
+echo "Generating $DAYS daily drops of $ROWS_PER_DAY rows into data/drops/..."
+clickhouse local -q "
+INSERT INTO FUNCTION file('data/drops/orders_{_partition_id}.csv', 'CSVWithNames')
+PARTITION BY toString(order_date)
+SELECT
+  toDate('2026-01-01') + intDiv(number, ${ROWS_PER_DAY})                          AS order_date,
+  number + 1                                                                      AS order_id,
+  ['GB','US','DE','FR','IN','AU','BR','JP','CA','NL'][(rand(2) % 10) + 1]         AS country,
+  ['widget','gadget','gizmo','doohickey','sprocket'][(rand(3) % 5) + 1]          AS product,
+  round((rand(4) % 50000) / 100.0, 2)                                            AS revenue,
+  (rand(5) % 5 + 1)::UInt8                                                        AS quantity
+FROM numbers(${DAYS} * ${ROWS_PER_DAY})
+"
+
+echo
+echo "Generated $(ls data/drops | wc -l) files, $(du -sh data/drops | cut -f1) in data/drops/"
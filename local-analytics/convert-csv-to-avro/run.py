@@ -5,22 +5,62 @@ in-process). Run ./generate.sh first to create ./data/events.csv.
 chDB is the embedded ClickHouse engine for Python: no server, no import step.
 """
 import pathlib
+import sys
+
 import chdb
 
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent / "_shared"))
+from bench import rss_timeline  # noqa: E402
+from sink import write_query  # noqa: E402
+
 DATA = pathlib.Path(__file__).parent / "data"
 src = DATA / "events.csv"
 dst = DATA / "events_chdb.avro"
 
-# 1. Convert: read the CSV with file(), write Avro bytes, save to disk.
+# 1. Convert: read the CSV with file(), write Avro straight to disk. The engine
+#    writes block by block, so the encoded file never sits in Python memory.
 #    The Avro schema is derived from the types chDB infers from the CSV.
-avro_bytes = chdb.query(
-    f"SELECT * FROM file('{src}', 'CSVWithNames') FORMAT Avro"
-).bytes()
-dst.write_bytes(avro_bytes)
-print(f"wrote {dst.name} ({len(avro_bytes)} bytes)")
+size = write_query(f"SELECT * FROM file('{src}', 'CSVWithNames')", dst, "Avro")
+print(f"wrote {dst.name} ({size} bytes)")
 
 # 2. Read it straight back and confirm the round-trip.
 print(chdb.query(f"SELECT * FROM file('{dst}') ORDER BY amount DESC LIMIT 5"))
 
 # 3. Inspect the schema carried into the Avro file.
 print(chdb.query(f"DESCRIBE file('{dst}')"))
+
+# 4. Memory: .bytes() + write_bytes vs streaming, RSS over time on the large CSV.
+large = DATA / "events_large.csv"
+sql = f"SELECT * FROM file('{large}', 'CSVWithNames')"
+# Read the input with pread rather than mmap: mapped input pages count towards
+# RSS and would hide what each approach itself holds on to.
+PREAD = {"storage_file_read_method": "pread"}
+
+
+def via_bytes():
+    (DATA / "events_large_bytes.avro").write_bytes(chdb.query(
+        f"{sql} FORMAT Avro SETTINGS storage_file_read_method = 'pread'").bytes())
+
+
+def via_path():
+    write_query(sql, DATA / "events_large_chdb.avro", "Avro", settings=PREAD)
+
+
+def via_file_object():
+    with open(DATA / "events_large_fileobj.avro", "wb") as f:
+        write_query(sql, f, "Avro", settings=PREAD)
+
+
+print(f"RSS over time converting {large.name} ({large.stat().st_size / 2**20:.0f} MiB), MiB:")
+for name, fn in (("chdb.query(...).bytes()", via_bytes),
+                 ("write_query(sql, path)", via_path),
+                 ("write_query(sql, file)", via_file_object)):
+    samples = rss_timeline(fn, interval=0.05)
+    if not samples:
+        print("  (no live RSS source on this platform)")
+        break
+    base = samples[0][1]
+    step = max(1, len(samples) // 8)
+    points = "  ".join(f"{t:.1f}s:{(rss - base) / 2**20:+.0f}" for t, rss in samples[::step])
+    peak = max(rss for _, rss in samples) - base
+    print(f"  {name:<24} peak {peak / 2**20:+5.0f}   {points}")
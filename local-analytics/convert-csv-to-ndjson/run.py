@@ -6,17 +6,18 @@ file. chDB is ClickHouse as an in-process Python module, so the SQL is identical
 Run ./generate.sh first to create ./data/events.csv.
 """
 import os
+import sys
+
 import chdb
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "_shared"))
+from sink import write_query  # noqa: E402
+
 os.chdir(os.path.join(os.path.dirname(os.path.abspath(__file__)), "data"))
 
 # Convert: read the CSV, render every row as a JSON object, write NDJSON.
-ndjson = chdb.query(
-    "SELECT * FROM file('events.csv') FORMAT JSONEachRow"
-).bytes()
-
-with open("events_chdb.ndjson", "wb") as f:
-    f.write(ndjson)
+# The engine writes straight to the file, block by block.
+write_query("SELECT * FROM file('events.csv')", "events_chdb.ndjson", "JSONEachRow")
 
 print("wrote events_chdb.ndjson")
 print()
@@ -3,6 +3,8 @@
 Same ClickHouse SQL, in-process in Python, no server. Run ./generate.sh first.
 """
 import os
+import sys
+
 import chdb
 
 os.chdir(os.path.join(os.path.dirname(__file__), "data"))
@@ -23,3 +25,26 @@ SELECT country, count() AS orders, round(sum(revenue), 2) AS revenue
 FROM file('orders_chdb.parquet')
 GROUP BY country ORDER BY revenue DESC
 """, "CSV"))
+
+# "Optimize for reads": search sort key, row-group size, page size, dictionary
+# and codec on a 1M-row sample against the queries you will actually run, then
+# convert the full file with the winner. A JSON report of every trial is
+# written next to the output (orders_tuned.parquet.tuning.json).
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "_shared"))
+from bench import Bench  # noqa: E402
+from parquet_tune import tune  # noqa: E402
+
+QUERIES = [
+    "SELECT round(sum(revenue), 2) FROM {file} WHERE country = 'GB'",
+    "SELECT count() FROM {file} WHERE order_date = '2026-03-01'",
+    "SELECT product, count() FROM {file} WHERE country IN ('JP', 'NL') GROUP BY product",
+]
+tune("orders_large.csv", "orders_tuned.parquet", QUERIES)
+
+chdb.query("SELECT * FROM file('orders_large.csv') "
+           "INTO OUTFILE 'orders_default.parquet' TRUNCATE FORMAT Parquet")
+bench = Bench("convert-csv-to-parquet")
+for name in ("orders_default.parquet", "orders_tuned.parquet"):
+    sqls = [q.format(file=f"file('{name}')") for q in QUERIES]
+    r = bench.run(name, lambda: [chdb.query(s, "Null") for s in sqls])
+    print(f"{name:<24} {os.path.getsize(name) / 2**20:6.1f} MiB   queries {r.median * 1000:7.1f} ms")
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""Top-k similarity search over data/embeddings.npy, exact and approximate, with recall and latency.
+
+Run ./generate.sh first. Each query vector is a stored embedding plus a
+little noise; every path returns the k nearest rows by cosine distance:
+
+  numpy          exact: normalized matrix @ query, argpartition (the ground truth)
+  chdb_parquet   exact: ORDER BY cosineDistance(...) LIMIT k over a Parquet file
+  chdb_table     exact: the same over a MergeTree table, skip indexes off
+  chdb_hnsw      approximate: that table's vector_similarity (HNSW) index,
+                 persisted in data/vectors/ and reused on the next run
+
+    python3 search.py                          # 200,000 rows, 50 queries, k = 10
+    python3 search.py --rows 0 --k 20          # all rows (the index build dominates)
+    python3 search.py --ef 16,64,256 --json report.json
+
+Recall@k is |returned ∩ exact| / k against the NumPy result. Latency is per
+query, warm; the one-off costs (loading and normalizing the matrix, writing
+the Parquet file, building the index) are reported separately as setup.
+"""
+import argparse
+import json
+import os
+import statistics
+import time
+
+import chdb
+import numpy as np
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DATA = os.path.join(HERE, "data")
+
+
+def _vec(q):
+    return "[" + ",".join(f"{x:.7g}" for x in q) + "]"
+
+
+def _ids(result):
+    return [int(x) for x in result.bytes().split()]
+
+
+# -- paths -----------------------------------------------------------------------
+
+
+class NumpySearch:
+    def __init__(self, matrix):
+        t0 = time.perf_counter()
+        m = np.asarray(matrix, dtype=np.float32)
+        self.unit = m / np.linalg.norm(m, axis=1, keepdims=True)
+        self.setup_s = time.perf_counter() - t0
+
+    def search(self, q, k):
+        sims = self.unit @ (q / np.linalg.norm(q))
+        top = np.argpartition(-sims, k)[:k]
+        return top[np.argsort(-sims[top])].tolist()
+
+
+class ChdbParquetSearch:
+    """Full scan of a Parquet file of the first ``rows`` rows; ``_row_number`` is the .npy index."""
+
+    def __init__(self, npy, rows):
+        parquet = os.path.join(os.path.dirname(npy), f"embeddings_{rows}.parquet")
+        t0 = time.perf_counter()
+        if not os.path.exists(parquet) or os.path.getmtime(parquet) < os.path.getmtime(npy):
+            chdb.query(f"SELECT array AS embedding FROM file('{npy}') WHERE _row_number < {rows} "
+                       f"INTO OUTFILE '{parquet}' TRUNCATE FORMAT Parquet")
+        self.setup_s = time.perf_counter() - t0
+        self.source = f"file('{parquet}', Parquet)"
+
+    def search(self, q, k):
+        return _ids(chdb.query(
+            f"SELECT _row_number FROM {self.source} "
+            f"ORDER BY cosineDistance(embedding, {_vec(q)}) LIMIT {k}", "TSV"))
+
+
+class ChdbHnswSearch:
+    """MergeTree table with a vector_similarity index, kept in a chDB directory between runs."""
+
+    def __init__(self, npy, path, rows, dims, m, ef_construction, quantization):
+        self.conn = chdb.connect(path)
+        params = {"npy": npy, "mtime": os.path.getmtime(npy), "rows": rows, "m": m,
+                  "ef_construction": ef_construction, "quantization": quantization}
+        existing = self.conn.query(
+            "SELECT comment FROM system.tables WHERE database = currentDatabase() "
+            "AND name = 'embeddings'", "TSV").bytes().decode().strip()
+        t0 = time.perf_counter()
+        self.reused = existing == json.dumps(params, sort_keys=True)
+        if not self.reused:
+            self.conn.query("DROP TABLE IF EXISTS embeddings")
+            # GRANULARITY larger than the table: one HNSW graph per part, not per granule.
+            self.conn.query(f"""
+                CREATE TABLE embeddings (
+                    id UInt64,
+                    embedding Array(Float32),
+                    INDEX ann embedding TYPE vector_similarity(
+                        'hnsw', 'cosineDistance', {dims}, '{quantization}', {m}, {ef_construction})
+                        GRANULARITY 100000000
+                ) ENGINE = MergeTree ORDER BY id
+                COMMENT '{json.dumps(params, sort_keys=True)}'""")
+            self.conn.query(f"INSERT INTO embeddings SELECT _row_number, array FROM file('{npy}') "
+                            f"WHERE _row_number < {rows}")
+            # One part means one graph to search; merging rebuilds the index, so only if needed.
+            parts = int(self.conn.query("SELECT count() FROM system.parts WHERE active "
+                                        "AND database = currentDatabase() AND table = 'embeddings'",
+                                        "TSV").bytes())
+            if parts > 1:
+                self.conn.query("OPTIMIZE TABLE embeddings FINAL")
+        self.setup_s = time.perf_counter() - t0
+        self.ef = 64
+
+    def search(self, q, k):
+        return _ids(self.conn.query(
+            f"SELECT id FROM embeddings ORDER BY cosineDistance(embedding, {_vec(q)}) LIMIT {k} "
+            f"SETTINGS hnsw_candidate_list_size_for_search = {self.ef}", "TSV"))
+
+    def search_exact(self, q, k):
+        return _ids(self.conn.query(
+            f"SELECT id FROM embeddings ORDER BY cosineDistance(embedding, {_vec(q)}) LIMIT {k} "
+            "SETTINGS use_skip_indexes = 0", "TSV"))
+
+    def close(self):
+        self.conn.close()
+
+
+# -- measurement -----------------------------------------------------------------
+
+
+def measure(name, search, queries, truth, k, setup_s):
+    search(queries[0], k)  # warm-up: page cache, index load
+    latencies, recalls = [], []
+    for q, exact in zip(queries, truth):
+        t0 = time.perf_counter()
+        got = search(q, k)
+        latencies.append(time.perf_counter() - t0)
+        recalls.append(len(set(got) & set(exact)) / k)
+    latencies.sort()
+    return {
+        "path": name,
+        "setup_s": round(setup_s, 3),
+        "p50_ms": round(statistics.median(latencies) * 1000, 3),
+        "p95_ms": round(latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))] * 1000, 3),
+        "qps": round(len(latencies) / sum(latencies), 1),
+        f"recall@{k}": round(statistics.mean(recalls), 4),
+    }
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    ap.add_argument("--npy", default=os.path.join(DATA, "embeddings.npy"))
+    ap.add_argument("--rows", type=int, default=200_000,
+                    help="search the first N rows (0: all; default 200,000)")
+    ap.add_argument("--queries", type=int, default=50, help="number of query vectors")
+    ap.add_argument("--k", type=int, default=10)
+    ap.add_argument("--ef", default="16,64,256",
+                    help="HNSW candidate list sizes to try at search time (comma-separated)")
+    ap.add_argument("--m", type=int, default=16, help="HNSW max connections per layer")
+    ap.add_argument("--ef-construction", type=int, default=64,
+                    help="HNSW candidate list size while building")
+    ap.add_argument("--quantization", default="bf16", choices=["f64", "f32", "f16", "bf16", "i8", "b1"])
+    ap.add_argument("--index-dir", default=os.path.join(DATA, "vectors"),
+                    help="chDB directory that keeps the indexed table between runs")
+    ap.add_argument("--json", help="also write the report to this file")
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args(argv)
+
+    npy = os.path.abspath(args.npy)
+    matrix = np.load(npy, mmap_mode="r")
+    rows = len(matrix) if args.rows <= 0 else min(args.rows, len(matrix))
+    matrix = matrix[:rows]
+    dims = matrix.shape[1]
+    rng = np.random.default_rng(args.seed)
+    picks = rng.choice(rows, size=args.queries, replace=False)
+    queries = (matrix[picks] + rng.normal(0, 0.05, (args.queries, dims))).astype(np.float32)
+    print(f"{rows:,} x {dims} embeddings, {args.queries} queries, k = {args.k}")
+
+    exact = NumpySearch(matrix)
+    truth = [exact.search(q, args.k) for q in queries]
+    results = [measure("numpy", exact.search, queries, truth, args.k, exact.setup_s)]
+
+    parquet = ChdbParquetSearch(npy, rows)
+    results.append(measure("chdb_parquet", parquet.search, queries, truth, args.k, parquet.setup_s))
+
+    hnsw = ChdbHnswSearch(npy, os.path.abspath(args.index_dir), rows, dims, args.m,
+                          args.ef_construction, args.quantization)
+    print(f"HNSW index: {'reused' if hnsw.reused else 'built'} in {hnsw.setup_s:.1f}s "
+          f"({args.index_dir})")
+    results.append(measure("chdb_table", hnsw.search_exact, queries, truth, args.k, 0.0))
+    for i, ef in enumerate(int(x) for x in args.ef.split(",")):
+        hnsw.ef = ef
+        results.append(measure(f"chdb_hnsw ef={ef}", hnsw.search, queries, truth, args.k,
+                               hnsw.setup_s if i == 0 else 0.0))
+    hnsw.close()
+
+    recall = f"recall@{args.k}"
+    print(f"\n{'path':<20} {'setup s':>9} {'p50 ms':>9} {'p95 ms':>9} {'qps':>9} {recall:>10}")
+    for r in results:
+        print(f"{r['path']:<20} {r['setup_s']:>9.2f} {r['p50_ms']:>9.2f} {r['p95_ms']:>9.2f} "
+              f"{r['qps']:>9.1f} {r[recall]:>10.3f}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"rows": rows, "dims": dims, "queries": args.queries, "k": args.k,
+                       "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
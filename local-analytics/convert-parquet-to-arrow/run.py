@@ -5,17 +5,19 @@ Same ClickHouse SQL as run.sh, in-process via chDB. Run ./generate.sh first.
 Requires: pip install chdb
 """
 import os
+import sys
+
 import chdb
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "_shared"))
+from sink import write_query  # noqa: E402
+
 os.chdir(os.path.join(os.path.dirname(__file__), "data"))
 
-# Convert Parquet -> Arrow IPC. Same SELECT ... FORMAT Arrow, written to a file.
-arrow_bytes = chdb.query(
-    "SELECT * FROM file('events.parquet') FORMAT Arrow"
-).bytes()
-with open("events_chdb.arrow", "wb") as f:
-    f.write(arrow_bytes)
-print(f"wrote events_chdb.arrow ({len(arrow_bytes)} bytes)")
+# Convert Parquet -> Arrow IPC. Same SELECT ... FORMAT Arrow, streamed to a
+# file block by block instead of materialized with .bytes() first.
+size = write_query("SELECT * FROM file('events.parquet')", "events_chdb.arrow", "Arrow")
+print(f"wrote events_chdb.arrow ({size} bytes)")
 
 # Read it back and confirm the schema + row count survived the round trip.
 print("\nschema of the Arrow file:")
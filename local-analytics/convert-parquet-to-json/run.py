@@ -4,17 +4,22 @@
 Same SQL, in-process, no server. Run ./generate.sh first to create ./data/.
 """
 import os
+import sys
+
 import chdb
 
-os.chdir(os.path.join(os.path.dirname(__file__), "data"))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "_shared"))
+from sink import write_query  # noqa: E402
+
+os.chdir(os.path.join(os.path.dirname(os.path.abspath(__file__)), "data"))
 
-# 1. Convert Parquet -> JSONL (one object per line). chDB returns the bytes;
-#    write them to a file.
-out = chdb.query(
-    "SELECT * FROM file('events.parquet') ORDER BY event_id FORMAT JSONEachRow"
+# 1. Convert Parquet -> JSONL (one object per line). The engine writes
+#    straight to the file, block by block.
+write_query(
+    "SELECT * FROM file('events.parquet') ORDER BY event_id",
+    "events_chdb.jsonl",
+    "JSONEachRow",
 )
-with open("events_chdb.jsonl", "w") as f:
-    f.write(str(out))
 
 print("== events_chdb.jsonl, first 2 lines ==")
 with open("events_chdb.jsonl") as f:
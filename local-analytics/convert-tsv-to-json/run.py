@@ -5,19 +5,24 @@ Run ./generate.sh first to create ./data/events.tsv.
 Requires: pip install chdb
 """
 import os
+import sys
+
 import chdb
 
-os.chdir(os.path.join(os.path.dirname(__file__), "data"))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "_shared"))
+from sink import write_query  # noqa: E402
+
+os.chdir(os.path.join(os.path.dirname(os.path.abspath(__file__)), "data"))
 
 # 1. Convert TSV -> JSON (JSONEachRow = one object per line / NDJSON).
-#    chdb.query returns the JSONEachRow text; write it to a file.
+#    chdb.query returns the JSONEachRow text for a preview; files are written
+#    by the engine itself, block by block.
 ndjson = chdb.query("SELECT * FROM file('events.tsv') LIMIT 3", "JSONEachRow")
 print("== 1. TSV -> JSONEachRow (NDJSON) ==")
 print(str(ndjson).strip())
 
 # Write the full file out.
-with open("events_chdb.jsonl", "w") as f:
-    f.write(str(chdb.query("SELECT * FROM file('events.tsv')", "JSONEachRow")))
+write_query("SELECT * FROM file('events.tsv')", "events_chdb.jsonl", "JSONEachRow")
 
 # 2. Convert TSV -> a single JSON array.
 arr = chdb.query(
@@ -27,12 +32,12 @@ arr = chdb.query(
 )
 print("\n== 2. TSV -> single JSON array ==")
 print(str(arr).strip())
-with open("events_chdb.json", "w") as f:
-    f.write(str(chdb.query(
-        "SELECT * FROM file('events.tsv') "
-        "SETTINGS output_format_json_array_of_rows = 1",
-        "JSONEachRow",
-    )))
+write_query(
+    "SELECT * FROM file('events.tsv')",
+    "events_chdb.json",
+    "JSONEachRow",
+    settings={"output_format_json_array_of_rows": 1},
+)
 
 # 3. Transform on the way out, then write.
 print("\n== 3. Transform (filter + rename) -> JSON ==")
@@ -2,24 +2,467 @@
 # Crack the ORC footer with a standard ORC reader (pyarrow).
 # ClickHouse reads ORC data natively but has no ORC-metadata FORMAT,
 # so we use pyarrow.orc to expose the file's internal structure.
+#
+# With options it goes further than pyarrow does, decoding the ORC protobuf
+# metadata itself (file tail, stripe footers, row indexes):
+#
+#   python3 footer.py data/events.orc --stripes        # per-stripe + per-column sizes
+#   python3 footer.py data/events.orc --stats          # min/max/nulls, bloom filters
+#   python3 footer.py data/events.orc --row-index id   # per-row-group stats of a column
+#   python3 footer.py data/events.orc --where "id BETWEEN 500000 AND 510000" --columns revenue
+#
+# --where reports how many stripes and row groups min/max statistics let a
+# reader skip, estimates the bytes it must read, and compares that with what
+# chDB actually read for the same query.
+import argparse
+import datetime
+import os
+import pathlib
+import struct
 import sys
+import zlib
+
+import pyarrow as pa
 import pyarrow.orc as orc
 
-path = sys.argv[1] if len(sys.argv) > 1 else "data/events.orc"
-f = orc.ORCFile(path)
-
-print(f"rows:             {f.nrows}")
-print(f"stripes:          {f.nstripes}")
-print(f"row_index_stride: {f.row_index_stride}")
-print(f"row_index_groups: {f.nrows // f.row_index_stride}")
-print(f"compression:      {f.compression}")
-print(f"compression_block:{f.compression_size} bytes")
-print(f"writer:           {f.writer}")
-print(f"file_version:     {f.file_version}")
-print(f"content_length:   {f.content_length} bytes (stripe data)")
-print(f"footer_length:    {f.file_footer_length} bytes")
-print(f"postscript_length:{f.file_postscript_length} bytes")
-print(f"file_length:      {f.file_length} bytes total")
-print()
-print("schema:")
-print(f.schema)
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent / "_shared"))
+import predicates  # noqa: E402
+
+# -- minimal protobuf decoding -------------------------------------------------
+
+
+def _varint(buf, pos):
+    result = shift = 0
+    while True:
+        b = buf[pos]
+        pos += 1
+        result |= (b & 0x7F) << shift
+        if b < 0x80:
+            return result, pos
+        shift += 7
+
+
+def _zigzag(n):
+    return (n >> 1) ^ -(n & 1)
+
+
+def _message(buf):
+    """Decode one protobuf message into {field number: [raw values]}."""
+    fields, pos = {}, 0
+    while pos < len(buf):
+        key, pos = _varint(buf, pos)
+        field, wire = key >> 3, key & 7
+        if wire == 0:
+            value, pos = _varint(buf, pos)
+        elif wire == 1:
+            value, pos = buf[pos:pos + 8], pos + 8
+        elif wire == 2:
+            length, pos = _varint(buf, pos)
+            value, pos = buf[pos:pos + length], pos + length
+        elif wire == 5:
+            value, pos = buf[pos:pos + 4], pos + 4
+        else:
+            raise ValueError(f"unsupported protobuf wire type {wire}")
+        fields.setdefault(field, []).append(value)
+    return fields
+
+
+def _packed(buf):
+    out, pos = [], 0
+    while pos < len(buf):
+        value, pos = _varint(buf, pos)
+        out.append(value)
+    return out
+
+
+def _first(fields, n, default=None):
+    return fields[n][0] if n in fields else default
+
+
+# -- ORC tail, compression -------------------------------------------------------
+
+COMPRESSION = {0: "NONE", 1: "ZLIB", 2: "SNAPPY", 3: "LZO", 4: "LZ4", 5: "ZSTD"}
+KINDS = {0: "BOOLEAN", 1: "BYTE", 2: "SHORT", 3: "INT", 4: "LONG", 5: "FLOAT", 6: "DOUBLE",
+         7: "STRING", 8: "BINARY", 9: "TIMESTAMP", 10: "LIST", 11: "MAP", 12: "STRUCT",
+         13: "UNION", 14: "DECIMAL", 15: "DATE", 16: "VARCHAR", 17: "CHAR",
+         18: "TIMESTAMP_INSTANT"}
+STREAMS = {0: "PRESENT", 1: "DATA", 2: "LENGTH", 3: "DICTIONARY_DATA", 4: "DICTIONARY_COUNT",
+           5: "SECONDARY", 6: "ROW_INDEX", 7: "BLOOM_FILTER", 8: "BLOOM_FILTER_UTF8"}
+INDEX_STREAMS = {6, 7, 8}
+# Bytes per value once decoded (as ClickHouse holds it); strings and decimals vary.
+WIDTHS = {"BOOLEAN": 1, "BYTE": 1, "SHORT": 2, "INT": 4, "LONG": 8, "FLOAT": 4, "DOUBLE": 8,
+          "TIMESTAMP": 8, "TIMESTAMP_INSTANT": 8, "DATE": 4}
+
+
+def _decompress_chunk(codec, data, block_size):
+    if codec == "ZLIB":
+        return zlib.decompress(data, -15)
+    if codec == "ZSTD":
+        return pa.input_stream(pa.py_buffer(data), compression="zstd").read()
+    if codec == "SNAPPY":
+        size, _ = _varint(data, 0)  # snappy blocks start with the uncompressed length
+        return pa.Codec("snappy").decompress(data, decompressed_size=size, asbytes=True)
+    if codec == "LZ4":
+        return pa.Codec("lz4_raw").decompress(data, decompressed_size=block_size, asbytes=True)
+    raise NotImplementedError(f"{codec} decompression")
+
+
+def _decompress(codec, data, block_size):
+    """Undo ORC's chunked compression: 3-byte headers, each chunk maybe stored as-is."""
+    if codec == "NONE":
+        return bytes(data)
+    out, pos = [], 0
+    while pos < len(data):
+        header = data[pos] | data[pos + 1] << 8 | data[pos + 2] << 16
+        length, original = header >> 1, header & 1
+        chunk = data[pos + 3:pos + 3 + length]
+        out.append(bytes(chunk) if original else _decompress_chunk(codec, chunk, block_size))
+        pos += 3 + length
+    return b"".join(out)
+
+
+class OrcTail:
+    """Decoded PostScript, Footer and Metadata of an ORC file, plus lazy stripe reads.
+
+    Only the ranges that are decoded are read: the file tail once, then a
+    stripe footer and the row-index streams asked for, each with a seek.
+    """
+
+    # Enough for the postscript, footer and metadata of most files in one read;
+    # never below 256, the most a postscript and its length byte can take.
+    TAIL_GUESS = 16 * 1024
+
+    def __init__(self, path):
+        self.path = path
+        self.size = os.path.getsize(path)
+        # The last byte is the postscript length, and the postscript gives the
+        # footer and metadata lengths; read more of the tail only if the guess was short.
+        self.tail_start = max(0, self.size - self.TAIL_GUESS)
+        self.tail = self._pread(self.tail_start, self.size - self.tail_start)
+        ps_len = self.tail[-1]
+        ps = _message(self.tail[-1 - ps_len:-1])
+        self.codec = COMPRESSION[_first(ps, 2, 0)]
+        self.block_size = _first(ps, 3, 262144)
+        footer_len, metadata_len = _first(ps, 1), _first(ps, 5, 0)
+        footer_end = self.size - 1 - ps_len
+        metadata_start = footer_end - footer_len - metadata_len
+        if metadata_start < self.tail_start:
+            self.tail_start = metadata_start
+            self.tail = self._pread(metadata_start, self.size - metadata_start)
+        footer = _message(self._read(footer_end - footer_len, footer_len))
+        self.row_index_stride = _first(footer, 8, 0)
+        self.nrows = _first(footer, 6, 0)
+        self.stripes = [_message(s) for s in footer.get(3, [])]
+        self.types = [_message(t) for t in footer.get(4, [])]
+        self.file_stats = [_message(s) for s in footer.get(7, [])]
+        metadata = _message(self._read(metadata_start, metadata_len))
+        self.stripe_stats = [[_message(c) for c in _message(s).get(1, [])]
+                             for s in metadata.get(1, [])]
+        self.columns = self._column_names()
+
+    def _pread(self, offset, length):
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            return f.read(length)
+
+    def _read(self, offset, length):
+        """Decompressed bytes of one range, from the cached tail or with a seek."""
+        if offset >= self.tail_start:
+            raw = memoryview(self.tail)[offset - self.tail_start:offset - self.tail_start + length]
+        else:
+            raw = self._pread(offset, length)
+        return _decompress(self.codec, raw, self.block_size)
+
+    def _column_names(self):
+        """Column id -> dotted name, walking the type tree from the root struct."""
+        names = {0: ""}
+        for cid, t in enumerate(self.types):
+            subtypes = [s for b in t.get(2, []) for s in _packed(b)]
+            fields = [f.decode() for f in t.get(3, [])]
+            for i, sub in enumerate(subtypes):
+                child = fields[i] if i < len(fields) else str(i)
+                names[sub] = f"{names[cid]}.{child}" if names[cid] else child
+        return names
+
+    def kind(self, cid):
+        return KINDS.get(_first(self.types[cid], 1, -1), "?")
+
+    def column_id(self, name):
+        for cid, n in self.columns.items():
+            if n == name:
+                return cid
+        raise KeyError(f"no column {name!r}; have {', '.join(n for n in self.columns.values() if n)}")
+
+    def stripe(self, i, row_index_columns=()):
+        """
+        (rows, streams, row indexes) of stripe ``i``; streams are (kind, column, offset, length).
+        Row indexes are read and decoded only for the column ids in ``row_index_columns``.
+        """
+        s = self.stripes[i]
+        offset, index_len = _first(s, 1), _first(s, 2, 0)
+        data_len, footer_len = _first(s, 3, 0), _first(s, 4, 0)
+        footer = _message(self._read(offset + index_len + data_len, footer_len))
+        streams, pos = [], offset
+        for raw in footer.get(1, []):
+            st = _message(raw)
+            kind, column, length = _first(st, 1, 0), _first(st, 2, 0), _first(st, 3, 0)
+            streams.append((kind, column, pos, length))
+            pos += length
+        row_index = {}
+        for kind, column, pos, length in streams:
+            if kind == 6 and column in row_index_columns:
+                index = _message(self._read(pos, length))
+                row_index[column] = [_message(e) for e in index.get(1, [])]
+        return _first(s, 5, 0), streams, row_index
+
+
+# -- statistics ------------------------------------------------------------------
+
+EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+def stats_of(raw, kind):
+    """(number of values, has nulls, min, max) from a ColumnStatistics message."""
+    s = _message(raw) if isinstance(raw, (bytes, memoryview)) else raw
+    n, has_null = _first(s, 1, 0), bool(_first(s, 10, 0))
+    lo = hi = None
+    if 2 in s:
+        t = _message(s[2][0])
+        lo, hi = _zigzag(_first(t, 1, 0)), _zigzag(_first(t, 2, 0))
+    elif 3 in s:
+        t = _message(s[3][0])
+        lo, hi = (struct.unpack("<d", _first(t, k))[0] if k in t else None for k in (1, 2))
+    elif 4 in s:
+        t = _message(s[4][0])
+        lo = bytes(_first(t, 1, _first(t, 4, b""))).decode(errors="replace")
+        hi = bytes(_first(t, 2, _first(t, 5, b""))).decode(errors="replace")
+    elif 7 in s:
+        t = _message(s[7][0])
+        lo, hi = (datetime.date(1970, 1, 1) + datetime.timedelta(days=_zigzag(_first(t, k, 0)))
+                  for k in (1, 2))
+    elif 9 in s:
+        t = _message(s[9][0])
+        # Prefer the UTC bounds (fields 3/4); fall back to writer-local millis.
+        lo, hi = (EPOCH + datetime.timedelta(milliseconds=_zigzag(_first(t, k, _first(t, k - 2, 0))))
+                  for k in (3, 4))
+    if kind == "BOOLEAN":
+        lo = hi = None
+    return n, has_null, lo, hi
+
+
+# -- predicates ------------------------------------------------------------------
+
+
+def parse_where(where, tail):
+    """``"a = 1 AND b IN ('x','y')"`` -> [(column id, op, raw value(s)), ...]."""
+    return [(tail.column_id(col), op, raw) for col, op, raw in predicates.parse_where(where)]
+
+
+def can_skip(op, raw, stats):
+    """True if min/max statistics prove no row in the unit satisfies ``col op value``."""
+    n, _, lo, hi = stats
+    return predicates.can_skip(op, raw, lo, hi, empty=n == 0)
+
+
+# -- reports -------------------------------------------------------------------------
+
+
+def print_footer(path):
+    f = orc.ORCFile(path)
+
+    print(f"rows:             {f.nrows}")
+    print(f"stripes:          {f.nstripes}")
+    print(f"row_index_stride: {f.row_index_stride}")
+    print(f"row_index_groups: {f.nrows // f.row_index_stride}")
+    print(f"compression:      {f.compression}")
+    print(f"compression_block:{f.compression_size} bytes")
+    print(f"writer:           {f.writer}")
+    print(f"file_version:     {f.file_version}")
+    print(f"content_length:   {f.content_length} bytes (stripe data)")
+    print(f"footer_length:    {f.file_footer_length} bytes")
+    print(f"postscript_length:{f.file_postscript_length} bytes")
+    print(f"file_length:      {f.file_length} bytes total")
+    print()
+    print("schema:")
+    print(f.schema)
+
+
+def _leaf_columns(tail):
+    return [cid for cid in range(1, len(tail.types)) if tail.kind(cid) not in ("STRUCT",)]
+
+
+def print_stripes(tail):
+    print("\nstripes:")
+    print(f"  {'#':>3} {'offset':>10} {'rows':>10} {'index B':>10} {'data B':>12} {'footer B':>9}")
+    per_column = {}
+    for i, s in enumerate(tail.stripes):
+        print(f"  {i:>3} {_first(s, 1):>10} {_first(s, 5, 0):>10} {_first(s, 2, 0):>10} "
+              f"{_first(s, 3, 0):>12} {_first(s, 4, 0):>9}")
+        for kind, column, _, length in tail.stripe(i)[1]:
+            key = "index" if kind in INDEX_STREAMS else "data"
+            per_column.setdefault(column, {"index": 0, "data": 0})[key] += length
+    total = sum(v["data"] for v in per_column.values()) or 1
+    print("\ncolumn bytes (all stripes):")
+    print(f"  {'column':<16} {'type':<10} {'data B':>12} {'share':>6} {'index B':>9}")
+    for cid in _leaf_columns(tail):
+        v = per_column.get(cid, {"index": 0, "data": 0})
+        print(f"  {tail.columns[cid]:<16} {tail.kind(cid):<10} {v['data']:>12} "
+              f"{v['data'] / total:>6.1%} {v['index']:>9}")
+
+
+def _fmt(v):
+    if isinstance(v, float):
+        return f"{v:.6g}"
+    if isinstance(v, datetime.datetime):
+        return v.strftime("%Y-%m-%d %H:%M:%S")
+    return str(v)
+
+
+def print_stats(tail):
+    blooms = {}
+    for i in range(len(tail.stripes)):
+        for kind, column, _, _ in tail.stripe(i)[1]:
+            if kind in (7, 8):
+                blooms.setdefault(column, set()).add(i)
+    print("\ncolumn statistics (file level):")
+    print(f"  {'column':<16} {'values':>10} {'nulls':>6} {'min':>22} {'max':>22}  bloom filter")
+    for cid in _leaf_columns(tail):
+        n, has_null, lo, hi = stats_of(tail.file_stats[cid], tail.kind(cid))
+        nulls = tail.nrows - n if has_null else 0
+        bloom = f"{len(blooms[cid])}/{len(tail.stripes)} stripes" if cid in blooms else "no"
+        print(f"  {tail.columns[cid]:<16} {n:>10} {nulls:>6} {_fmt(lo):>22} {_fmt(hi):>22}  {bloom}")
+    if len(tail.stripe_stats) > 1:
+        print("\nper-stripe min/max:")
+        for i, stripe in enumerate(tail.stripe_stats):
+            cells = []
+            for cid in _leaf_columns(tail):
+                _, _, lo, hi = stats_of(stripe[cid], tail.kind(cid))
+                cells.append(f"{tail.columns[cid]}=[{_fmt(lo)}, {_fmt(hi)}]")
+            print(f"  stripe {i}: " + "  ".join(cells))
+
+
+def print_row_index(tail, column):
+    cid = tail.column_id(column)
+    kind = tail.kind(cid)
+    print(f"\nrow index for {column} ({kind}), stride {tail.row_index_stride}:")
+    print(f"  {'stripe':>6} {'group':>6} {'values':>8} {'nulls':>6} {'min':>22} {'max':>22}")
+    for i in range(len(tail.stripes)):
+        for g, entry in enumerate(tail.stripe(i, {cid})[2].get(cid, [])):
+            if 2 not in entry:
+                continue
+            n, has_null, lo, hi = stats_of(entry[2][0], kind)
+            print(f"  {i:>6} {g:>6} {n:>8} {'yes' if has_null else '':>6} "
+                  f"{_fmt(lo):>22} {_fmt(hi):>22}")
+
+
+def value_width(tail, cid):
+    """Average decoded bytes per value of a column, 0 for compound types."""
+    kind = tail.kind(cid)
+    if kind in WIDTHS:
+        return WIDTHS[kind]
+    if kind == "DECIMAL":
+        precision = _first(tail.types[cid], 5, 38)
+        return 4 if precision <= 9 else 8 if precision <= 18 else 16
+    stats = tail.file_stats[cid]
+    if kind in ("STRING", "VARCHAR", "CHAR", "BINARY"):
+        # String and binary statistics carry the total length (sint64); add an 8-byte offset.
+        field, total = (8, 1) if kind == "BINARY" else (4, 3)
+        total_len = _zigzag(_first(_message(stats[field][0]), total, 0)) if field in stats else 0
+        return 8 + total_len // max(_first(stats, 1, 0), 1)
+    return 0
+
+
+def explain(tail, where, columns):
+    """
+    Stripes / row groups skippable for ``where``, and the estimated bytes to
+    read: compressed, as stored on disk, and uncompressed, as decoded in memory.
+    """
+    terms = parse_where(where, tail)
+    term_cols = {cid for cid, _, _ in terms}
+    read_cols = term_cols | {tail.column_id(c) for c in columns}
+    stride = tail.row_index_stride or tail.nrows
+    kept_stripes = groups = kept_groups = kept_rows = 0
+    est_bytes = 0
+    for i, stripe_stats in enumerate(tail.stripe_stats):
+        rows = _first(tail.stripes[i], 5, 0)
+        n_groups = max(1, -(-rows // stride))
+        groups += n_groups
+        if any(can_skip(op, v, stats_of(stripe_stats[cid], tail.kind(cid))) for cid, op, v in terms):
+            continue  # skipped on stripe statistics: its footer is never read
+        _, streams, row_index = tail.stripe(i, term_cols)
+        kept_stripes += 1
+        keep = [True] * n_groups
+        for cid, op, v in terms:
+            for g, entry in enumerate(row_index.get(cid, [])):
+                if 2 in entry and can_skip(op, v, stats_of(entry[2][0], tail.kind(cid))):
+                    keep[g] = False
+        kept = sum(keep)
+        kept_groups += kept
+        stripe_rows = sum(min(stride, rows - g * stride) for g in range(n_groups) if keep[g])
+        kept_rows += stripe_rows
+        # Readers fetch whole streams per column; the row-group share is a lower
+        # bound that holds when compression chunks line up with row groups.
+        col_bytes = sum(length for kind, column, _, length in streams
+                        if column in read_cols and kind not in INDEX_STREAMS)
+        est_bytes += col_bytes * stripe_rows // max(rows, 1)
+    return {"stripes": len(tail.stripes), "stripes_kept": kept_stripes,
+            "row_groups": groups, "row_groups_kept": kept_groups,
+            "rows_kept": kept_rows, "bytes_compressed": est_bytes,
+            "bytes_uncompressed": kept_rows * sum(value_width(tail, c) for c in read_cols),
+            "read_columns": sorted(tail.columns[c] for c in read_cols)}
+
+
+def print_explain(tail, where, columns):
+    r = explain(tail, where, columns)
+    print(f"\npredicate: {where}")
+    print(f"  stripes:    {r['stripes_kept']}/{r['stripes']} read "
+          f"({r['stripes'] - r['stripes_kept']} skipped)")
+    print(f"  row groups: {r['row_groups_kept']}/{r['row_groups']} read "
+          f"({1 - r['row_groups_kept'] / max(r['row_groups'], 1):.1%} skipped)")
+    print(f"  rows:       {r['rows_kept']:,} of {tail.nrows:,}")
+    print(f"  estimated:  ~{r['bytes_compressed']:,} bytes compressed on disk, "
+          f"~{r['bytes_uncompressed']:,} bytes uncompressed, of columns {', '.join(r['read_columns'])}")
+    try:
+        import chdb
+    except ImportError:
+        print("  actual:     (pip install chdb to compare with what chDB reads)")
+        return
+    select = ", ".join(f"`{c}`" for c in r["read_columns"])
+    res = chdb.query(f"SELECT {select} FROM file('{tail.path}', 'ORC') WHERE {where}", "Null")
+    # storage_bytes_read is the compressed size of the stripes read, all columns,
+    # shared out over their rows; there is no per-column count to compare with.
+    print(f"  actual:     chDB read {res.storage_rows_read():,} rows, "
+          f"~{res.storage_bytes_read():,} bytes compressed on disk, all columns")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Inspect an ORC file's footer and metadata.")
+    ap.add_argument("path", nargs="?", default="data/events.orc")
+    ap.add_argument("--stripes", action="store_true", help="per-stripe and per-column sizes")
+    ap.add_argument("--stats", action="store_true",
+                    help="per-column min/max/null statistics and bloom filter presence")
+    ap.add_argument("--row-index", metavar="COLUMN", help="per-row-group statistics of a column")
+    ap.add_argument("--where", help="predicate to evaluate against stripe and row-group stats")
+    ap.add_argument("--columns", default="", help="other columns the query reads, comma-separated")
+    args = ap.parse_args()
+
+    print_footer(args.path)
+    if not (args.stripes or args.stats or args.row_index or args.where):
+        return
+    tail = OrcTail(args.path)
+    if args.stripes:
+        print_stripes(tail)
+    if args.stats:
+        print_stats(tail)
+    if args.row_index:
+        print_row_index(tail, args.row_index)
+    if args.where:
+        try:
+            print_explain(tail, args.where,
+                          [c.strip() for c in args.columns.split(",") if c.strip()])
+        except (KeyError, ValueError) as e:
+            ap.error(f"{e.args[0]} in {args.where!r}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+# Inspect Parquet footers and measure how well min/max statistics prune.
+#
+# Reads only the footer of each file (pyarrow.parquet metadata): row groups,
+# column chunk sizes, encodings, codecs, page index and bloom filter presence,
+# and per-row-group statistics. No column data is read, so it is cheap to run
+# over a whole directory before deciding to reprocess it.
+#
+#   python3 parquet_footer.py data/events.parquet
+#   python3 parquet_footer.py data/ --where "country = 'GB'" \
+#       --where "event_time BETWEEN '2026-03-01' AND '2026-03-31'"
+#   python3 parquet_footer.py data/ --where "id < 100000" --json > before.json
+#
+# Each --where is evaluated on its own: the fraction of row groups (and rows,
+# and compressed bytes) that min/max statistics prove cannot match, which is
+# what a reader's row-group pruning can skip. The --json output is stable
+# (sorted keys, no timings) so two writer configurations can be diffed.
+import argparse
+import datetime
+import decimal
+import json
+import pathlib
+import sys
+
+import pyarrow.parquet as pq
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent / "_shared"))
+from predicates import can_skip, parse_where  # noqa: E402
+
+# -- footer --------------------------------------------------------------------
+
+
+def _jsonable(v):
+    if isinstance(v, (datetime.datetime, datetime.date)):
+        return v.isoformat()
+    if isinstance(v, bytes):
+        return v.decode(errors="replace")
+    if isinstance(v, decimal.Decimal):
+        return str(v)  # exact, unlike a float
+    return v
+
+
+def _chunk(c):
+    s = c.statistics if c.is_stats_set else None
+    has_minmax = s is not None and s.has_min_max
+    return {
+        "compression": c.compression,
+        "encodings": sorted(c.encodings),
+        "compressed_bytes": c.total_compressed_size,
+        "uncompressed_bytes": c.total_uncompressed_size,
+        "num_values": c.num_values,
+        "has_dictionary_page": c.has_dictionary_page,
+        "has_column_index": c.has_column_index,
+        "has_offset_index": c.has_offset_index,
+        "has_bloom_filter": (c.bloom_filter_offset or 0) > 0,
+        "min": s.min if has_minmax else None,
+        "max": s.max if has_minmax else None,
+        "null_count": s.null_count if s is not None and s.has_null_count else None,
+    }
+
+
+def read_footer(path):
+    """One file's footer as a dict; min/max stay typed (for predicate checks)."""
+    md = pq.ParquetFile(path).metadata
+    row_groups = []
+    for i in range(md.num_row_groups):
+        rg = md.row_group(i)
+        columns = {rg.column(j).path_in_schema: _chunk(rg.column(j)) for j in range(rg.num_columns)}
+        row_groups.append({
+            "num_rows": rg.num_rows,
+            "compressed_bytes": sum(c["compressed_bytes"] for c in columns.values()),
+            "uncompressed_bytes": rg.total_byte_size,
+            "sorting_columns": [md.schema.column(s.column_index).path + (" DESC" if s.descending else "")
+                                for s in rg.sorting_columns],
+            "columns": columns,
+        })
+    schema = {md.schema.column(j).path: {"physical_type": md.schema.column(j).physical_type,
+                                         "logical_type": str(md.schema.column(j).logical_type)}
+              for j in range(md.num_columns)}
+    columns = {}
+    for name, types in schema.items():
+        chunks = [rg["columns"][name] for rg in row_groups if name in rg["columns"]]
+        compressed = sum(c["compressed_bytes"] for c in chunks)
+        uncompressed = sum(c["uncompressed_bytes"] for c in chunks)
+        columns[name] = {
+            **types,
+            "compressed_bytes": compressed,
+            "uncompressed_bytes": uncompressed,
+            "ratio": round(uncompressed / compressed, 2) if compressed else None,
+            "compression": sorted({c["compression"] for c in chunks}),
+            "encodings": sorted({e for c in chunks for e in c["encodings"]}),
+            "dictionary_row_groups": sum(c["has_dictionary_page"] for c in chunks),
+            "page_index_row_groups": sum(c["has_column_index"] and c["has_offset_index"]
+                                         for c in chunks),
+            "bloom_filter_row_groups": sum(c["has_bloom_filter"] for c in chunks),
+        }
+    return {
+        "path": str(path),
+        "size_bytes": pathlib.Path(path).stat().st_size,
+        "created_by": md.created_by,
+        "format_version": md.format_version,
+        "footer_bytes": md.serialized_size,
+        "num_rows": md.num_rows,
+        "num_row_groups": md.num_row_groups,
+        "columns": columns,
+        "row_groups": row_groups,
+    }
+
+
+def find_files(paths):
+    for p in map(pathlib.Path, paths):
+        if p.is_dir():
+            yield from sorted(p.rglob("*.parquet"))
+        else:
+            yield p
+
+
+# -- predicates ------------------------------------------------------------------
+
+def _skippable(op, raw, chunk):
+    """True if the chunk's min/max prove that no row satisfies ``col op value``."""
+    empty = chunk["null_count"] is not None and chunk["null_count"] == chunk["num_values"]
+    return can_skip(op, raw, chunk["min"], chunk["max"], empty)
+
+
+def skip_report(footers, where):
+    """Row groups, rows and bytes that ``where`` lets a reader skip, overall and per file."""
+    terms = parse_where(where)
+    known = {c for f in footers for c in f["columns"]}
+    for col, _, _ in terms:
+        if col not in known:
+            raise ValueError(f"unknown column {col!r} in {where!r}")
+    total = skipped = rows = rows_skipped = nbytes = bytes_skipped = 0
+    per_file = {}
+    for f in footers:
+        file_skipped = 0
+        for rg in f["row_groups"]:
+            total += 1
+            rows += rg["num_rows"]
+            nbytes += rg["compressed_bytes"]
+            try:
+                skip = any(col in rg["columns"] and _skippable(op, raw, rg["columns"][col])
+                           for col, op, raw in terms)
+            except ValueError as e:
+                raise ValueError(f"{e} in {where!r}") from None
+            if skip:
+                skipped += 1
+                file_skipped += 1
+                rows_skipped += rg["num_rows"]
+                bytes_skipped += rg["compressed_bytes"]
+        per_file[f["path"]] = {"row_groups": f["num_row_groups"],
+                               "row_groups_skippable": file_skipped}
+    return {
+        "where": where,
+        "row_groups": total,
+        "row_groups_skippable": skipped,
+        "skip_ratio": round(skipped / total, 4) if total else 0.0,
+        "rows_skippable": rows_skipped,
+        "row_skip_ratio": round(rows_skipped / rows, 4) if rows else 0.0,
+        "bytes_skippable": bytes_skipped,
+        "byte_skip_ratio": round(bytes_skipped / nbytes, 4) if nbytes else 0.0,
+        "files": per_file,
+    }
+
+
+# -- output ----------------------------------------------------------------------
+
+
+def _to_json(obj):
+    if isinstance(obj, dict):
+        return {k: _to_json(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [_to_json(v) for v in obj]
+    return _jsonable(obj)
+
+
+def print_text(footers, predicates, show_row_groups):
+    for f in footers:
+        print(f"{f['path']}: {f['num_rows']:,} rows, {f['num_row_groups']} row groups, "
+              f"{f['size_bytes']:,} bytes (footer {f['footer_bytes']:,})")
+        print(f"  created_by: {f['created_by']}")
+        print(f"  {'column':<14} {'type':<28} {'codec':<8} {'compressed':>12} {'ratio':>6}  "
+              f"{'encodings':<28} {'dict':>7} {'pgidx':>7} {'bloom':>7}")
+        n = f["num_row_groups"]
+        for name, c in f["columns"].items():
+            type_ = c["physical_type"] + ("" if c["logical_type"] == "None"
+                                          else f"/{c['logical_type'].split('(')[0]}")
+            print(f"  {name:<14} {type_:<28} {','.join(c['compression']):<8} "
+                  f"{c['compressed_bytes']:>12,} {c['ratio'] or 0:>6.2f}  "
+                  f"{','.join(c['encodings']):<28} "
+                  + " ".join(f"{str(c[k]) + '/' + str(n):>7}" for k in
+                             ("dictionary_row_groups", "page_index_row_groups",
+                              "bloom_filter_row_groups")))
+        if show_row_groups:
+            for i, rg in enumerate(f["row_groups"]):
+                print(f"  row group {i}: {rg['num_rows']:,} rows, {rg['compressed_bytes']:,} bytes"
+                      + (f", sorted by {', '.join(rg['sorting_columns'])}"
+                         if rg["sorting_columns"] else ""))
+                for name, c in rg["columns"].items():
+                    print(f"    {name:<14} min {_jsonable(c['min'])!s:<28} "
+                          f"max {_jsonable(c['max'])!s:<28} nulls {c['null_count']}")
+        print()
+    for p in predicates:
+        print(f"WHERE {p['where']}: {p['row_groups_skippable']}/{p['row_groups']} row groups "
+              f"skippable ({p['skip_ratio']:.1%}), {p['row_skip_ratio']:.1%} of rows, "
+              f"{p['byte_skip_ratio']:.1%} of compressed bytes")
+        if len(p["files"]) > 1:
+            for path, r in p["files"].items():
+                print(f"  {path}: {r['row_groups_skippable']}/{r['row_groups']}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Inspect Parquet footers and min/max pruning.")
+    ap.add_argument("paths", nargs="+", help="Parquet files or directories (searched recursively)")
+    ap.add_argument("--where", action="append", default=[],
+                    help="predicate to test against row-group statistics (repeatable)")
+    ap.add_argument("--row-groups", action="store_true", help="print per-row-group statistics")
+    ap.add_argument("--json", action="store_true", help="emit JSON instead of text")
+    args = ap.parse_args()
+
+    files = list(find_files(args.paths))
+    if not files:
+        ap.error("no .parquet files found")
+    footers = [read_footer(p) for p in files]
+    try:
+        predicates = [skip_report(footers, w) for w in args.where]
+    except ValueError as e:
+        ap.error(str(e))
+    if args.json:
+        doc = {
+            "files": footers,
+            "totals": {
+                "files": len(footers),
+                "rows": sum(f["num_rows"] for f in footers),
+                "row_groups": sum(f["num_row_groups"] for f in footers),
+                "bytes": sum(f["size_bytes"] for f in footers),
+            },
+            "predicates": predicates,
+        }
+        json.dump(_to_json(doc), sys.stdout, indent=2, sort_keys=True)
+        print()
+    else:
+        print_text(footers, predicates, args.row_groups)
+
+
+if __name__ == "__main__":
+    main()